@@ -1,4 +1,6 @@
-from django.db import models
+from functools import cached_property
+from django.db import connection, models
+from django.utils import timezone
 from django.conf import settings
 from products.models import Product
 
@@ -15,15 +17,28 @@ class Cart(models.Model):
             return f"Cart for {self.user.username}"
         return f"Anonymous Cart {self.session_key}"
 
+    @cached_property
+    def totals(self):
+        """
+        (total_items, total_price) computed in a single pass over the items.
+        Uses the prefetched items when the cart was loaded with them.
+        """
+        total_items = 0
+        total_price = 0
+        for item in self.items.all():
+            total_items += item.quantity
+            total_price += item.subtotal
+        return total_items, total_price
+
     @property
     def total_price(self):
         """Calculate total price of all items in cart"""
-        return sum(item.subtotal for item in self.items.all())
+        return self.totals[1]
 
     @property
     def total_items(self):
         """Calculate total number of items in cart"""
-        return sum(item.quantity for item in self.items.all())
+        return self.totals[0]
 
     class Meta:
         verbose_name = "Cart"
@@ -45,6 +60,37 @@ class CartItem(models.Model):
         """Calculate subtotal for this cart item"""
         return self.product.price * self.quantity
 
+    @classmethod
+    def upsert(cls, cart_id, product_id, quantity, increment=True):
+        """
+        Add ``quantity`` of a product to a cart (or set it, with
+        ``increment=False``) in one INSERT ... ON CONFLICT DO UPDATE.
+
+        The row is only written if the product is active and the resulting
+        quantity fits in Product.stock_quantity, checked in the same
+        statement. Works on PostgreSQL and SQLite (3.35+).
+
+        Returns the new quantity, or None if nothing was written.
+        """
+        qn = connection.ops.quote_name
+        item_table = qn(cls._meta.db_table)
+        product_table = qn(Product._meta.db_table)
+        new_quantity = f'{item_table}.quantity + excluded.quantity' if increment else 'excluded.quantity'
+        sql = (
+            f'INSERT INTO {item_table} (cart_id, product_id, quantity, added_at) '
+            f'SELECT %s, id, %s, %s FROM {product_table} '
+            f'WHERE id = %s AND is_active AND stock_quantity >= %s '
+            f'ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = {new_quantity} '
+            f'WHERE {new_quantity} <= ('
+            f'SELECT stock_quantity FROM {product_table} WHERE id = excluded.product_id) '
+            f'RETURNING quantity'
+        )
+        added_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [cart_id, quantity, added_at, product_id, quantity])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
     class Meta:
         verbose_name = "Cart Item"
         verbose_name_plural = "Cart Items"
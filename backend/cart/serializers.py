@@ -1,11 +1,19 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
+from products.models import Product
 from products.serializers import ProductListSerializer
 
 
+class CartProductSerializer(ProductListSerializer):
+    """Lightweight product representation for cart mutation responses"""
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'slug', 'price', 'stock_quantity', 'primary_image']
+
+
 class CartItemSerializer(serializers.ModelSerializer):
     """Cart item serializer"""
-    product = ProductListSerializer(read_only=True)
+    product = serializers.SerializerMethodField()
     product_id = serializers.IntegerField(write_only=True)
     subtotal = serializers.ReadOnlyField()
 
@@ -14,6 +22,10 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product', 'product_id', 'quantity', 'subtotal', 'added_at']
         read_only_fields = ['id', 'added_at']
 
+    def get_product(self, obj):
+        serializer_class = CartProductSerializer if self.context.get('compact') else ProductListSerializer
+        return serializer_class(obj.product, context=self.context).data
+
     def validate_quantity(self, value):
         if value < 1:
             raise serializers.ValidationError("Quantity must be at least 1.")
@@ -30,3 +42,41 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'items', 'total_price', 'total_items', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class CartAddItemSerializer(serializers.Serializer):
+    """Product and quantity for add_item"""
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class CartItemRefSerializer(serializers.Serializer):
+    """An item of the current cart (remove_item)"""
+    item_id = serializers.IntegerField()
+
+
+class CartItemQuantitySerializer(CartItemRefSerializer):
+    """New quantity for an item of the current cart (update_item)"""
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CartChangeSerializer(serializers.Serializer):
+    """A single item change in a batch cart update"""
+    OPERATIONS = [
+        ('add', 'Add quantity to the existing item'),
+        ('set', 'Set the item quantity (0 removes it)'),
+    ]
+
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
+    op = serializers.ChoiceField(choices=OPERATIONS, default='add')
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add' and attrs['quantity'] < 1:
+            raise serializers.ValidationError("Quantity must be at least 1.")
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    """Batch of cart item changes applied in one transaction"""
+    changes = CartChangeSerializer(many=True, allow_empty=False)
@@ -1,3 +1,88 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+from products.models import Category, Product, ProductImage
+from .models import Cart, CartItem
 
-# Create your tests here.
+
+class CartItemValidationTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Silk Robe', slug='silk-robe', price=Decimal('10.00'), stock_quantity=3, sku='ROBE-1'
+        )
+
+    def add(self, product_id, quantity=1):
+        return self.client.post(
+            '/api/cart/add_item/', {'product_id': product_id, 'quantity': quantity}, content_type='application/json'
+        )
+
+    def test_add_item(self):
+        self.assertEqual(self.add(self.product.id, 2).status_code, 200)
+        self.assertEqual(self.add(self.product.id + 1).status_code, 404)
+        self.assertEqual(self.add(self.product.id, 5).status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+
+    def test_non_numeric_values_are_rejected(self):
+        self.assertEqual(self.add('robe').status_code, 400)
+        self.assertEqual(self.add(self.product.id, 'two').status_code, 400)
+        self.assertEqual(self.add(self.product.id, 0).status_code, 400)
+        self.assertEqual(
+            self.client.patch(
+                '/api/cart/update_item/', {'item_id': 'first', 'quantity': 1}, content_type='application/json'
+            ).status_code,
+            400
+        )
+        self.assertEqual(self.client.delete('/api/cart/remove_item/?item_id=first').status_code, 400)
+        self.assertFalse(CartItem.objects.exists())
+
+
+class CartQueryCountTests(TestCase):
+    """The cart is serialized in a fixed number of queries, however many items it has"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('shopper', 'shopper@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.category = Category.objects.create(name='Robes')
+
+    def fill(self, count):
+        for number in range(count):
+            product = Product.objects.create(
+                name=f'Robe {number}', slug=f'robe-{number}', price=Decimal('10.00'),
+                stock_quantity=5, sku=f'ROBE-{number}', category=self.category
+            )
+            ProductImage.objects.create(product=product, image=f'products/robe-{number}.jpg', is_primary=True)
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+        self.extra = Product.objects.create(
+            name='Gown', slug='gown', price=Decimal('20.00'), stock_quantity=5, sku='GOWN-1', category=self.category
+        )
+        ProductImage.objects.create(product=self.extra, image='products/gown.jpg', is_primary=True)
+        return list(self.cart.items.order_by('id'))
+
+    def test_queries_do_not_grow_with_items(self):
+        items = self.fill(4)
+
+        # The cart, then the items with their products and categories, then the primary images
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/cart/')
+        self.assertEqual(len(response.data['items']), 4)
+        self.assertTrue(all(item['product']['primary_image'] for item in response.data['items']))
+
+        # Each change adds one write
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                '/api/cart/add_item/', {'product_id': self.extra.id, 'quantity': 1}, format='json'
+            )
+        self.assertEqual(len(response.data['items']), 5)
+        with self.assertNumQueries(4):
+            self.client.patch('/api/cart/update_item/', {'item_id': items[0].id, 'quantity': 3}, format='json')
+        with self.assertNumQueries(4):
+            response = self.client.delete(f'/api/cart/remove_item/?item_id={items[-1].id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 4)
+        # 3 + 2 + 2 robes and the gown
+        self.assertEqual(response.data['total_items'], 8)
+        self.assertEqual(Decimal(str(response.data['total_price'])), Decimal('90.00'))
@@ -3,9 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from .models import Cart, CartItem
-from .serializers import CartSerializer, CartItemSerializer
+from .serializers import (
+    CartSerializer, CartItemSerializer, CartBatchSerializer,
+    CartAddItemSerializer, CartItemRefSerializer, CartItemQuantitySerializer
+)
 from products.models import Product
+from products.serializers import ProductListSerializer
+
+
+class BatchChangeFailed(Exception):
+    """Raised inside the batch transaction to roll it back"""
+    def __init__(self, index, product_id):
+        super().__init__(index, product_id)
+        self.index = index
+        self.product_id = product_id
 
 
 class CartViewSet(viewsets.ModelViewSet):
@@ -33,63 +47,105 @@ class CartViewSet(viewsets.ModelViewSet):
             cart, created = Cart.objects.get_or_create(session_key=session_key)
         return cart
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['compact'] = self.request.query_params.get('compact') in ('1', 'true')
+        return context
+
+    def cart_response(self, cart, status=status.HTTP_200_OK):
+        """
+        Serialize the cart with items, products, categories and primary images
+        loaded in a fixed number of queries.
+        """
+        items = ProductListSerializer.setup_eager_loading(CartItem.objects.all(), prefix='product__')
+        prefetch_related_objects([cart], Prefetch('items', queryset=items))
+        serializer = self.get_serializer(cart)
+        return Response(serializer.data, status=status)
+
     def list(self, request):
         cart = self.get_cart()
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
+        return self.cart_response(cart)
+
+    def stock_error(self, product_id):
+        """Explain why an upsert wrote nothing (only runs on the failure path)"""
+        if not Product.objects.filter(id=product_id, is_active=True).exists():
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'error': 'Not enough stock available'}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'])
     def add_item(self, request):
+        # Validated before the raw upsert and the stock_error lookup
+        serializer = CartAddItemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_id = serializer.validated_data['product_id']
+        quantity = serializer.validated_data['quantity']
         cart = self.get_cart()
-        product_id = request.data.get('product_id')
-        quantity = request.data.get('quantity', 1)
 
-        try:
-            product = Product.objects.get(id=product_id, is_active=True)
-        except Product.DoesNotExist:
-            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        if CartItem.upsert(cart.id, product_id, quantity) is None:
+            return self.stock_error(product_id)
 
-        cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-        if not created:
-            cart_item.quantity += int(quantity)
-        else:
-            cart_item.quantity = int(quantity)
-        cart_item.save()
-
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.cart_response(cart)
 
     @action(detail=False, methods=['patch'])
     def update_item(self, request):
+        serializer = CartItemQuantitySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        item_id = serializer.validated_data['item_id']
+        quantity = serializer.validated_data['quantity']
         cart = self.get_cart()
-        item_id = request.data.get('item_id')
-        quantity = request.data.get('quantity')
 
-        try:
-            cart_item = CartItem.objects.get(id=item_id, cart=cart)
-            cart_item.quantity = int(quantity)
-            cart_item.save()
-            serializer = CartSerializer(cart)
-            return Response(serializer.data)
-        except CartItem.DoesNotExist:
-            return Response({'error': 'Cart item not found'}, status=status.HTTP_404_NOT_FOUND)
+        # Single UPDATE; the stock check is part of the WHERE clause
+        updated = CartItem.objects.filter(
+            id=item_id, cart=cart, product__stock_quantity__gte=quantity
+        ).update(quantity=quantity)
+        if not updated:
+            if not CartItem.objects.filter(id=item_id, cart=cart).exists():
+                return Response({'error': 'Cart item not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'error': 'Not enough stock available'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.cart_response(cart)
 
     @action(detail=False, methods=['delete'])
     def remove_item(self, request):
+        serializer = CartItemRefSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        item_id = serializer.validated_data['item_id']
         cart = self.get_cart()
-        item_id = request.query_params.get('item_id')
 
-        try:
-            cart_item = CartItem.objects.get(id=item_id, cart=cart)
-            cart_item.delete()
-            serializer = CartSerializer(cart)
-            return Response(serializer.data)
-        except CartItem.DoesNotExist:
+        deleted, _ = CartItem.objects.filter(id=item_id, cart=cart).delete()
+        if not deleted:
             return Response({'error': 'Cart item not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self.cart_response(cart)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Apply several item changes in one request and one transaction.
+        Body: {"changes": [{"product_id": 1, "quantity": 2, "op": "add"|"set"}, ...]}
+        If any change fails, none are applied.
+        """
+        cart = self.get_cart()
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            with transaction.atomic():
+                for index, change in enumerate(serializer.validated_data['changes']):
+                    product_id = change['product_id']
+                    if change['op'] == 'set' and change['quantity'] == 0:
+                        CartItem.objects.filter(cart=cart, product_id=product_id).delete()
+                        continue
+                    increment = change['op'] == 'add'
+                    if CartItem.upsert(cart.id, product_id, change['quantity'], increment=increment) is None:
+                        raise BatchChangeFailed(index, product_id)
+        except BatchChangeFailed as failure:
+            response = self.stock_error(failure.product_id)
+            response.data['index'] = failure.index
+            return response
+
+        return self.cart_response(cart)
 
     @action(detail=False, methods=['delete'])
     def clear(self, request):
         cart = self.get_cart()
         cart.items.all().delete()
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        return self.cart_response(cart)
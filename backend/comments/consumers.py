@@ -1,20 +1,68 @@
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from .db import comment_db
+from .groups import comment_group_name
 from .models import ProductComment
 from products.models import Product
 from .serializers import ProductCommentSerializer
 
-User = get_user_model()
+# Updates arriving within this many seconds go out as one frame
+BROADCAST_WINDOW = getattr(settings, 'COMMENT_BROADCAST_WINDOW', 0.05)
+# Updates a socket may have waiting before it is told to reload instead
+MAX_PENDING_UPDATES = getattr(settings, 'COMMENT_BROADCAST_MAX_PENDING', 100)
+RESYNC_FRAME = json.dumps({'action': 'resync'})
+
+
+def comment_event(action, comment=None, comment_id=None):
+    """
+    Group message for a comment update. The frame is encoded here, once,
+    rather than by each receiving socket.
+    """
+    return {
+        'type': 'comment_message',
+        'action': action,
+        'comment_id': comment_id if comment_id is not None else comment['id'],
+        'text': json.dumps({
+            'action': action,
+            'comment': comment,
+            'comment_id': comment_id
+        })
+    }
+
+
+def batch_frame(texts):
+    """One frame carrying several already-encoded updates, in order"""
+    return '{"action": "batch", "events": [' + ', '.join(texts) + ']}'
 
 
 class CommentConsumer(AsyncWebsocketConsumer):
-    """WebSocket consumer for real-time product comments"""
+    """
+    WebSocket consumer for real-time product comments
+
+    Group updates are queued per socket and flushed every BROADCAST_WINDOW
+    seconds, several at once as a "batch" frame. Waiting updates are merged
+    (a later edit of a comment replaces an earlier one, and deleting a
+    comment the socket has not been sent yet cancels it), and a socket that
+    falls more than MAX_PENDING_UPDATES behind gets a single "resync" frame
+    asking it to reload the comments.
+
+    Comment writes run on the bounded comment_db pool (see comments.db)
+    rather than the process's single database_sync_to_async thread.
+    """
 
     async def connect(self):
+        self.pending = {}
+        self.resync = False
+        self.flusher = None
+
         self.product_slug = self.scope['url_route']['kwargs']['product_slug']
-        self.room_group_name = f'product_comments_{self.product_slug}'
+        self.room_group_name = comment_group_name(self.product_slug)
+        # Resolved once per connection rather than on every message
+        self.product_id = await Product.objects.filter(
+            slug=self.product_slug
+        ).values_list('id', flat=True).afirst()
 
         # Join room group
         await self.channel_layer.group_add(
@@ -25,6 +73,8 @@ class CommentConsumer(AsyncWebsocketConsumer):
         await self.accept()
 
     async def disconnect(self, close_code):
+        if self.flusher:
+            self.flusher.cancel()
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -54,17 +104,19 @@ class CommentConsumer(AsyncWebsocketConsumer):
             }))
             return
 
-        comment = await self.save_comment(user, content, parent_id)
+        if self.product_id is None:
+            await self.send(text_data=json.dumps({
+                'error': 'Product not found.'
+            }))
+            return
+
+        comment = await comment_db.run(self.save_comment, user.id, content, parent_id)
 
         if comment:
             # Send message to room group
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {
-                    'type': 'comment_message',
-                    'action': 'new',
-                    'comment': comment
-                }
+                comment_event('new', comment=comment)
             )
 
     async def edit_comment(self, data):
@@ -75,16 +127,12 @@ class CommentConsumer(AsyncWebsocketConsumer):
         if not user or not user.is_authenticated:
             return
 
-        comment = await self.update_comment(comment_id, user.id, content)
+        comment = await comment_db.run(self.update_comment, comment_id, user.id, content)
 
         if comment:
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {
-                    'type': 'comment_message',
-                    'action': 'edit',
-                    'comment': comment
-                }
+                comment_event('edit', comment=comment)
             )
 
     async def delete_comment(self, data):
@@ -94,40 +142,84 @@ class CommentConsumer(AsyncWebsocketConsumer):
         if not user or not user.is_authenticated:
             return
 
-        success = await self.remove_comment(comment_id, user.id)
+        # Only allow superuser to delete any comment. The user is the
+        # snapshot JWTAuthMiddleware resolved, so this needs no query
+        if not user.is_superuser:
+            return
+
+        # A single statement, so the async ORM is enough here
+        deleted, _ = await ProductComment.objects.filter(
+            id=comment_id, product_id=self.product_id
+        ).adelete()
+        success = deleted > 0
 
         if success:
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {
-                    'type': 'comment_message',
-                    'action': 'delete',
-                    'comment_id': comment_id
-                }
+                comment_event('delete', comment_id=comment_id)
             )
 
     # Receive message from room group
     async def comment_message(self, event):
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'action': event['action'],
-            'comment': event.get('comment'),
-            'comment_id': event.get('comment_id')
-        }))
-
-    @database_sync_to_async
-    def save_comment(self, user, content, parent_id):
+        text = event.get('text')
+        if text is None:
+            # Sent by a replica still running the previous version
+            text = json.dumps({
+                'action': event['action'],
+                'comment': event.get('comment'),
+                'comment_id': event.get('comment_id')
+            })
+        comment_id = event.get('comment_id')
+        if comment_id is None and event.get('comment'):
+            comment_id = event['comment'].get('id')
+        self.queue_update(event['action'], comment_id, text)
+
+        if self.flusher is None or self.flusher.done():
+            self.flusher = asyncio.ensure_future(self.flush_updates())
+
+    def queue_update(self, action, comment_id, text):
+        if self.resync:
+            return
+        if action == 'delete' and self.pending.pop(('new', comment_id), None):
+            # The socket never saw the comment, so it needs neither message
+            self.pending.pop(('edit', comment_id), None)
+            return
+        if action == 'delete':
+            self.pending.pop(('edit', comment_id), None)
+        # Re-assigning an edit keeps its place in the queue
+        self.pending[(action, comment_id)] = text
+        if len(self.pending) > MAX_PENDING_UPDATES:
+            self.pending.clear()
+            self.resync = True
+
+    async def flush_updates(self):
+        await asyncio.sleep(BROADCAST_WINDOW)
+        # Updates that arrive while a slow socket is being sent to wait for
+        # the next frame, where they can still be merged
+        while self.pending or self.resync:
+            if self.resync:
+                self.resync = False
+                text = RESYNC_FRAME
+            else:
+                texts = list(self.pending.values())
+                self.pending.clear()
+                text = texts[0] if len(texts) == 1 else batch_frame(texts)
+            await self.send(text_data=text)
+
+    # Run on comment_db's threads, which also serialize the reply (the
+    # serializer queries the author and replies)
+    def save_comment(self, user_id, content, parent_id):
         try:
-            product = Product.objects.get(slug=self.product_slug)
-            parent_comment = None
-            if parent_id:
-                parent_comment = ProductComment.objects.get(id=parent_id)
+            if parent_id and not ProductComment.objects.filter(
+                id=parent_id, product_id=self.product_id
+            ).exists():
+                raise ProductComment.DoesNotExist(f'No comment {parent_id} on this product')
 
             comment = ProductComment.objects.create(
-                user=user,
-                product=product,
+                user_id=user_id,
+                product_id=self.product_id,
                 content=content,
-                parent_comment=parent_comment
+                parent_comment_id=parent_id or None
             )
 
             serializer = ProductCommentSerializer(comment)
@@ -136,10 +228,9 @@ class CommentConsumer(AsyncWebsocketConsumer):
             print(f"Error saving comment: {e}")
             return None
 
-    @database_sync_to_async
     def update_comment(self, comment_id, user_id, content):
         try:
-            comment = ProductComment.objects.get(id=comment_id, user_id=user_id)
+            comment = ProductComment.objects.get(id=comment_id, user_id=user_id, product_id=self.product_id)
             comment.content = content
             comment.is_edited = True
             comment.save()
@@ -148,15 +239,3 @@ class CommentConsumer(AsyncWebsocketConsumer):
             return serializer.data
         except ProductComment.DoesNotExist:
             return None
-
-    @database_sync_to_async
-    def remove_comment(self, comment_id, user_id):
-        try:
-            comment = ProductComment.objects.get(id=comment_id)
-            # Only allow superuser to delete any comment
-            if User.objects.get(id=user_id).is_superuser:
-                comment.delete()
-                return True
-            return False
-        except ProductComment.DoesNotExist:
-            return False
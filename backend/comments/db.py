@@ -0,0 +1,91 @@
+"""
+Bounded thread pool for CommentConsumer's database work
+
+database_sync_to_async runs every call on the process's single
+thread-sensitive thread, so on a busy Daphne process all comment writes
+queue behind each other (and behind any other sync work). Comment writes
+run here instead, on COMMENT_DB_WORKERS threads that each keep their own
+database connection, so the pool size also caps the connections used.
+
+The executor reports its queue depth, how long calls waited for a thread
+and how long they ran (see websocket_metrics in comments.views).
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from slutton_backend.metrics import LatencyHistogram
+
+DB_WORKERS = getattr(settings, 'COMMENT_DB_WORKERS', 8)
+
+
+class DatabaseExecutor:
+    def __init__(self, max_workers=DB_WORKERS):
+        self.max_workers = max_workers
+        self.wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='comment-db'
+                    )
+        return self._executor
+
+    async def run(self, func, *args):
+        """Await ``func(*args)`` on a pool thread"""
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            self.wait.observe(started - submitted)
+            close_old_connections()
+            error = False
+            try:
+                return func(*args)
+            except Exception:
+                error = True
+                raise
+            finally:
+                close_old_connections()
+                self.run_time.observe(time.perf_counter() - started, error=error)
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            self._queued += 1
+        future = self.executor.submit(call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call cancelled before it started never leaves the queue itself
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def metrics(self):
+        with self._lock:
+            queued, running = self._queued, self._running
+        return {
+            'workers': self.max_workers,
+            'queue_depth': queued,
+            'running': running,
+            'wait': self.wait.snapshot(),
+            'run': self.run_time.snapshot(),
+        }
+
+
+comment_db = DatabaseExecutor()
@@ -0,0 +1,25 @@
+"""
+Channel layer group names for live product comments
+
+With the Redis channel layer every group lives on one shard, chosen by a
+consistent hash of its name, so each product's comment group is an
+independent unit that the configured CHANNEL_REDIS_URLS spread across
+Redis hosts, and any Daphne replica can publish to it.
+
+Group names must be ASCII alphanumerics, hyphens, underscores or periods
+and shorter than 100 characters. The WebSocket route accepts any ``\\w``
+slug, so names that would break those rules are replaced by a hash.
+"""
+import hashlib
+import re
+
+GROUP_PREFIX = 'product_comments_'
+MAX_GROUP_NAME_LENGTH = 99
+VALID_GROUP_NAME = re.compile(r'^[a-zA-Z\d\-_.]+$')
+
+
+def comment_group_name(product_slug):
+    name = f'{GROUP_PREFIX}{product_slug}'
+    if len(name) <= MAX_GROUP_NAME_LENGTH and VALID_GROUP_NAME.match(name):
+        return name
+    return f'{GROUP_PREFIX}{hashlib.sha1(product_slug.encode()).hexdigest()}'
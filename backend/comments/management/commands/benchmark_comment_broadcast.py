@@ -0,0 +1,128 @@
+"""
+Management command to benchmark live comment broadcast to many sockets
+Run: python manage.py benchmark_comment_broadcast --sockets 1000 10000
+
+For each socket count, that many CommentConsumer connections join one
+product's group in this process and a burst of comments is broadcast to
+it. Reports how long until every socket had every comment, the delivery
+latency per comment and how many frames each socket received (bursts are
+coalesced, see CommentConsumer). Uses the configured channel layer; the
+product slug is synthetic and no comments are written to the database.
+"""
+import asyncio
+import json
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from comments import consumers
+
+BENCHMARK_PRODUCT_SLUG = 'comment-broadcast-benchmark'
+CONNECT_BATCH = 500
+
+
+class Command(BaseCommand):
+    help = 'Benchmark comment broadcast latency with 1k and 10k sockets per product'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sockets',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Socket counts to benchmark (default: 1000 10000)',
+        )
+        parser.add_argument(
+            '--updates',
+            type=int,
+            default=20,
+            help='Comments broadcast in each burst (default: 20)',
+        )
+        parser.add_argument(
+            '--window',
+            type=float,
+            help=f'Coalescing window in seconds (default: {consumers.BROADCAST_WINDOW}, 0 sends each update alone)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30.0,
+            help='Seconds to wait for a socket to receive a frame (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        if options['window'] is not None:
+            consumers.BROADCAST_WINDOW = options['window']
+        self.stdout.write(f'Coalescing window: {consumers.BROADCAST_WINDOW * 1000:.0f} ms')
+
+        for sockets in options['sockets']:
+            asyncio.run(self.run(sockets, options['updates'], options['timeout']))
+
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    async def run(self, sockets, updates, timeout):
+        from channels.layers import get_channel_layer
+        from channels.routing import URLRouter
+        from channels.testing import WebsocketCommunicator
+        from comments.groups import comment_group_name
+        from comments.routing import websocket_urlpatterns
+
+        application = URLRouter(websocket_urlpatterns)
+        communicators = [
+            WebsocketCommunicator(application, f'/ws/comments/{BENCHMARK_PRODUCT_SLUG}/')
+            for _ in range(sockets)
+        ]
+        for start in range(0, sockets, CONNECT_BATCH):
+            await asyncio.gather(*[
+                communicator.connect() for communicator in communicators[start:start + CONNECT_BATCH]
+            ])
+
+        async def drain(communicator):
+            latencies = []
+            frames = 0
+            while len(latencies) < updates:
+                try:
+                    payload = json.loads(await communicator.receive_from(timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+                received_at = time.perf_counter()
+                frames += 1
+                if payload['action'] == 'resync':
+                    break
+                for update in payload['events'] if payload['action'] == 'batch' else [payload]:
+                    latencies.append((received_at - update['comment']['sent_at']) * 1000)
+            return latencies, frames
+
+        try:
+            channel_layer = get_channel_layer()
+            receivers = asyncio.gather(*[drain(communicator) for communicator in communicators])
+
+            start = time.perf_counter()
+            for number in range(1, updates + 1):
+                await channel_layer.group_send(
+                    comment_group_name(BENCHMARK_PRODUCT_SLUG),
+                    consumers.comment_event('new', comment={
+                        'id': number, 'content': f'Benchmark comment {number}', 'sent_at': time.perf_counter()
+                    })
+                )
+            results = await receivers
+            elapsed = time.perf_counter() - start
+        finally:
+            for start in range(0, sockets, CONNECT_BATCH):
+                await asyncio.gather(*[
+                    communicator.disconnect() for communicator in communicators[start:start + CONNECT_BATCH]
+                ])
+
+        latencies = sorted(latency for socket_latencies, _ in results for latency in socket_latencies)
+        delivered = len(latencies)
+        frames = sum(socket_frames for _, socket_frames in results)
+        line = (
+            f'{sockets} sockets x {updates} comments: {delivered}/{sockets * updates} delivered'
+            f' in {elapsed:.2f} s | {frames / sockets:.1f} frames per socket'
+        )
+        if latencies:
+            line += (
+                f' | latency mean {statistics.mean(latencies):.2f} ms'
+                f', p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms'
+                f', max {latencies[-1]:.2f} ms'
+            )
+        self.stdout.write(line)
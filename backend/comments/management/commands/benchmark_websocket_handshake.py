@@ -0,0 +1,99 @@
+"""
+Management command to benchmark WebSocket handshakes through the ASGI stack
+Run: python manage.py benchmark_websocket_handshake --handshakes 5000 --concurrency 200
+
+Each handshake goes through slutton_backend.asgi.application (origin
+check, JWT authentication, routing and CommentConsumer.connect) and is
+closed again straight away. A share of them come from a disallowed origin,
+and --token exercises the authenticated path. Uses the configured channel
+layer and a synthetic product slug.
+"""
+import asyncio
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+
+BENCHMARK_PRODUCT_SLUG = 'websocket-handshake-benchmark'
+ALLOWED_ORIGIN = b'https://louisslutton.com'
+REJECTED_ORIGIN = b'https://example.com'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark WebSocket handshake throughput through the ASGI application'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--handshakes',
+            type=int,
+            default=5000,
+            help='Handshakes to perform (default: 5000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help='Handshakes in flight at once (default: 200)',
+        )
+        parser.add_argument(
+            '--rejected',
+            type=float,
+            default=0.1,
+            help='Share of handshakes from a disallowed origin (default: 0.1)',
+        )
+        parser.add_argument(
+            '--token',
+            help='JWT access token to authenticate with',
+        )
+
+    def handle(self, *args, **options):
+        from comments.middleware import handshake_counters
+
+        before = handshake_counters.snapshot()
+        timings, outcomes, elapsed = asyncio.run(self.run(options))
+        after = handshake_counters.snapshot()
+
+        timings.sort()
+        self.stdout.write(
+            f'{len(timings)} handshakes, concurrency {options["concurrency"]}, in {elapsed:.2f} s'
+            f' | {len(timings) / elapsed:.0f} handshakes/s'
+            f' | mean {statistics.mean(timings):.2f} ms'
+            f', p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms'
+            f', max {timings[-1]:.2f} ms'
+        )
+        self.stdout.write(
+            f'Accepted {outcomes[True]}, refused {outcomes[False]}'
+            f' | counters: allowed +{after["allowed"] - before["allowed"]}'
+            f', rejected +{after["rejected"] - before["rejected"]}'
+        )
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    async def run(self, options):
+        from channels.testing import WebsocketCommunicator
+        from slutton_backend.asgi import application
+
+        path = f'/ws/comments/{BENCHMARK_PRODUCT_SLUG}/'
+        if options['token']:
+            path += f'?token={options["token"]}'
+        rng = random.Random(0)
+        origins = [
+            REJECTED_ORIGIN if rng.random() < options['rejected'] else ALLOWED_ORIGIN
+            for _ in range(options['handshakes'])
+        ]
+        slots = asyncio.Semaphore(options['concurrency'])
+        outcomes = {True: 0, False: 0}
+
+        async def handshake(origin):
+            async with slots:
+                communicator = WebsocketCommunicator(application, path, headers=[(b'origin', origin)])
+                start = time.perf_counter()
+                connected, _ = await communicator.connect()
+                took = (time.perf_counter() - start) * 1000
+                outcomes[connected] += 1
+                if connected:
+                    await communicator.disconnect()
+                return took
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*[handshake(origin) for origin in origins])
+        return list(timings), outcomes, time.perf_counter() - start
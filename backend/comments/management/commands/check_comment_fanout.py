@@ -0,0 +1,255 @@
+"""
+Management command to check live comments across separate server processes
+Run: python manage.py check_comment_fanout --start-redis
+
+Several listener processes each open WebSocket connections to
+CommentConsumer for one product, the way separate Daphne replicas would,
+and another process broadcasts comments to that product's group exactly as
+CommentConsumer does after saving one. The check passes only if every
+socket in every listener receives every comment.
+
+The channel layer is the configured Redis one, the Redis URLs given with
+--redis-url, or a throwaway redis-server started with --start-redis. The
+in-memory layer cannot cross processes, which is what this guards against.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import statistics
+import subprocess
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+CHECK_PRODUCT_SLUG = 'comment-fanout-check'
+REDIS_LAYER = 'channels_redis.core.RedisChannelLayer'
+
+
+def _setup(layer):
+    """Django setup for a spawned process, using ``layer`` as the default channel layer"""
+    import django
+
+    django.setup()
+    settings.CHANNEL_LAYERS = {'default': layer}
+
+
+def listen(layer, sockets, messages, timeout, ready, results):
+    _setup(layer)
+    results.put((os.getpid(), asyncio.run(_listen(sockets, messages, timeout, ready))))
+
+
+async def _listen(sockets, messages, timeout, ready):
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+    from comments.routing import websocket_urlpatterns
+
+    application = URLRouter(websocket_urlpatterns)
+    communicators = [
+        WebsocketCommunicator(application, f'/ws/comments/{CHECK_PRODUCT_SLUG}/')
+        for _ in range(sockets)
+    ]
+    for communicator in communicators:
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError('CommentConsumer refused the connection')
+    ready.put(os.getpid())
+
+    async def drain(communicator):
+        latencies = []
+        while len(latencies) < messages:
+            try:
+                payload = json.loads(await communicator.receive_from(timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+            if payload['action'] == 'resync':
+                break
+            received_at = time.time()
+            for update in payload['events'] if payload['action'] == 'batch' else [payload]:
+                latencies.append((received_at - update['comment']['sent_at']) * 1000)
+        return latencies
+
+    try:
+        return await asyncio.gather(*[drain(communicator) for communicator in communicators])
+    finally:
+        for communicator in communicators:
+            await communicator.disconnect()
+
+
+def publish(layer, messages):
+    _setup(layer)
+    asyncio.run(_publish(messages))
+
+
+async def _publish(messages):
+    from channels.layers import get_channel_layer
+    from comments.consumers import comment_event
+    from comments.groups import comment_group_name
+
+    channel_layer = get_channel_layer()
+    for number in range(1, messages + 1):
+        await channel_layer.group_send(
+            comment_group_name(CHECK_PRODUCT_SLUG),
+            comment_event(
+                'new', comment={'id': number, 'content': f'Fan-out check {number}', 'sent_at': time.time()}
+            )
+        )
+
+
+class Command(BaseCommand):
+    help = 'Check that comments broadcast in one process reach sockets in others'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=3,
+            help='Listener processes, standing in for server replicas (default: 3)',
+        )
+        parser.add_argument(
+            '--sockets',
+            type=int,
+            default=5,
+            help='WebSocket connections per listener process (default: 5)',
+        )
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=20,
+            help='Comments to broadcast (default: 20)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10.0,
+            help='Seconds to wait for each message or process (default: 10)',
+        )
+        parser.add_argument(
+            '--redis-url',
+            help='Comma-separated Redis URLs to use instead of CHANNEL_LAYERS',
+        )
+        parser.add_argument(
+            '--start-redis',
+            action='store_true',
+            help='Run against a temporary local redis-server',
+        )
+
+    def handle(self, *args, **options):
+        redis_server = None
+        try:
+            if options['start_redis']:
+                redis_server, hosts = self.start_redis(options['timeout'])
+            elif options['redis_url']:
+                hosts = [url.strip() for url in options['redis_url'].split(',') if url.strip()]
+            else:
+                hosts = None
+
+            layer = self.channel_layer(hosts)
+            self.stdout.write(f"Channel layer: {layer['BACKEND']} {layer['CONFIG'].get('hosts')}")
+            self.run_check(layer, options)
+        finally:
+            if redis_server:
+                redis_server.terminate()
+                redis_server.wait()
+
+    def channel_layer(self, hosts):
+        if hosts:
+            config = {**getattr(settings, 'CHANNEL_REDIS_CONFIG', {}), 'hosts': hosts}
+            layer = {'BACKEND': REDIS_LAYER, 'CONFIG': config}
+        else:
+            layer = settings.CHANNEL_LAYERS['default']
+            if layer['BACKEND'] != REDIS_LAYER:
+                raise CommandError(
+                    f"{layer['BACKEND']} only reaches sockets in the same process. "
+                    f"Set CHANNEL_REDIS_URLS, or pass --redis-url or --start-redis."
+                )
+        # Keep check traffic apart from live groups on a shared Redis
+        return {**layer, 'CONFIG': {**layer.get('CONFIG', {}), 'prefix': 'comment-fanout-check'}}
+
+    def start_redis(self, timeout):
+        import redis
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        try:
+            process = subprocess.Popen(
+                ['redis-server', '--port', str(port), '--save', '', '--appendonly', 'no'],
+                stdout=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise CommandError('redis-server is not installed; pass --redis-url instead')
+
+        url = f'redis://127.0.0.1:{port}'
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                redis.Redis.from_url(url).ping()
+                return process, [url]
+            except redis.ConnectionError:
+                if time.monotonic() > deadline:
+                    process.terminate()
+                    raise CommandError(f'redis-server did not start on port {port}')
+                time.sleep(0.1)
+
+    def run_check(self, layer, options):
+        context = multiprocessing.get_context('spawn')
+        ready = context.Queue()
+        results = context.Queue()
+        listeners = [
+            context.Process(
+                target=listen,
+                args=(layer, options['sockets'], options['messages'], options['timeout'], ready, results)
+            )
+            for _ in range(options['processes'])
+        ]
+        for process in listeners:
+            process.start()
+
+        try:
+            for _ in listeners:
+                ready.get(timeout=options['timeout'] * 3)
+
+            publisher = context.Process(target=publish, args=(layer, options['messages']))
+            publisher.start()
+            publisher.join(options['timeout'])
+            self.stdout.write(
+                f"Publisher pid {publisher.pid} sent {options['messages']} comment(s) to "
+                f"{options['processes'] * options['sockets']} socket(s) in "
+                f"{options['processes']} listener process(es)"
+            )
+
+            received = [results.get(timeout=options['timeout'] * 2) for _ in listeners]
+        except queue.Empty:
+            raise CommandError('A listener process did not report back in time')
+        finally:
+            for process in listeners:
+                process.join(options['timeout'])
+                if process.is_alive():
+                    process.terminate()
+
+        failed = False
+        latencies = []
+        for pid, sockets in received:
+            counts = [len(socket_latencies) for socket_latencies in sockets]
+            latencies.extend(latency for socket_latencies in sockets for latency in socket_latencies)
+            missing = sum(options['messages'] - count for count in counts)
+            if missing:
+                failed = True
+                self.stdout.write(self.style.ERROR(f'Listener pid {pid}: {missing} message(s) missing {counts}'))
+            else:
+                self.stdout.write(f'Listener pid {pid}: all {len(counts)} socket(s) received every comment')
+
+        if latencies:
+            latencies.sort()
+            self.stdout.write(
+                f'Delivery latency | mean {statistics.mean(latencies):.2f} ms'
+                f', p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms'
+                f', max {latencies[-1]:.2f} ms'
+            )
+        if failed:
+            raise CommandError('Comments did not reach every process')
+
+        self.stdout.write(self.style.SUCCESS('\nDone! Comments reached every process'))
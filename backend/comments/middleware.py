@@ -1,24 +1,112 @@
 """
 JWT Authentication middleware for WebSocket connections
+
+The token is decoded and verified once, and the user it names is resolved
+to a UserSnapshot through a short-lived in-process cache, so a reconnect
+storm after a deploy costs one query per user rather than one per socket.
+Concurrent handshakes for the same uncached user share a single query.
+Entries are dropped when the user is saved or deleted in this process (see
+comments.signals); other processes see changes within
+WEBSOCKET_USER_CACHE_TTL seconds.
+
+OriginValidatorMiddleware checks the Origin header of each handshake
+against one compiled regex, remembering recent origins in an LRU. Outcomes
+are counted, and a sample of them is logged through a queue, so the event
+loop never waits on stdout during a connection burst.
 """
+import asyncio
+import atexit
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import parse_qs
 from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from jwt import decode as jwt_decode
-from django.conf import settings
 from django.contrib.auth import get_user_model
+from products.cache import LRUCache
 
 User = get_user_model()
 
+USER_CACHE_TTL = getattr(settings, 'WEBSOCKET_USER_CACHE_TTL', 60)
+USER_CACHE_SIZE = getattr(settings, 'WEBSOCKET_USER_CACHE_SIZE', 10000)
+# Log one in this many allowed / rejected handshakes
+ALLOWED_LOG_SAMPLE = getattr(settings, 'WEBSOCKET_ALLOWED_LOG_SAMPLE', 100)
+REJECTED_LOG_SAMPLE = getattr(settings, 'WEBSOCKET_REJECTED_LOG_SAMPLE', 10)
+ORIGIN_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The fields WebSocket consumers need, in place of a User instance"""
+    id: int
+    username: str
+    is_staff: bool
+    is_superuser: bool
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @property
+    def pk(self):
+        return self.id
+
+
+user_cache = LRUCache(USER_CACHE_SIZE)
+_loading = {}
+
+
+def forget_user(user_id):
+    user_cache.delete(user_id)
+
 
 @database_sync_to_async
-def get_user(user_id):
-    try:
-        return User.objects.get(id=user_id)
-    except User.DoesNotExist:
+def load_user(user_id):
+    row = User.objects.filter(id=user_id, is_active=True).values(
+        'id', 'username', 'is_staff', 'is_superuser'
+    ).first()
+    return UserSnapshot(**row) if row else None
+
+
+async def get_user(user_id):
+    """UserSnapshot for ``user_id``, or AnonymousUser if there is no active user"""
+    cached = user_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    task = _loading.get(user_id)
+    if task is None:
+        task = asyncio.ensure_future(load_user(user_id))
+        _loading[user_id] = task
+        task.add_done_callback(lambda _: _loading.pop(user_id, None))
+    snapshot = await asyncio.shield(task)
+
+    if snapshot is None:
         return AnonymousUser()
+    user_cache.set(user_id, (time.monotonic() + USER_CACHE_TTL, snapshot))
+    return snapshot
+
+
+def get_token(scope):
+    """Token from the ``token`` query parameter or an ``Authorization: Bearer`` header"""
+    params = parse_qs(scope.get('query_string', b'').decode())
+    if params.get('token'):
+        return params['token'][0]
+
+    headers = dict(scope.get('headers', []))
+    auth_header = headers.get(b'authorization', b'').decode()
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
 
 
 class JWTAuthMiddleware(BaseMiddleware):
@@ -27,37 +115,13 @@ class JWTAuthMiddleware(BaseMiddleware):
     """
 
     async def __call__(self, scope, receive, send):
-        # Get token from query string
-        query_string = scope.get('query_string', b'').decode()
-        token = None
-
-        # Parse query string for token parameter
-        if query_string:
-            params = dict(param.split('=') for param in query_string.split('&') if '=' in param)
-            token = params.get('token')
-
-        # If no token in query string, check headers
-        if not token:
-            headers = dict(scope.get('headers', []))
-            auth_header = headers.get(b'authorization', b'').decode()
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        token = get_token(scope)
 
         # Authenticate user
         if token:
             try:
-                # Validate token
-                UntypedToken(token)
-
-                # Decode token to get user_id
-                decoded_data = jwt_decode(
-                    token,
-                    settings.SECRET_KEY,
-                    algorithms=["HS256"]
-                )
-                user_id = decoded_data.get('user_id')
-
-                # Get user from database
+                # Verifies the signature and expiry, and decodes the claims
+                user_id = UntypedToken(token)[api_settings.USER_ID_CLAIM]
                 scope['user'] = await get_user(user_id)
             except (InvalidToken, TokenError, KeyError):
                 scope['user'] = AnonymousUser()
@@ -65,3 +129,137 @@ class JWTAuthMiddleware(BaseMiddleware):
             scope['user'] = AnonymousUser()
 
         return await super().__call__(scope, receive, send)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler whose QueueListener thread is started by the first record
+    (and stopped at exit), so processes that never log a handshake, such
+    as management commands, start no thread.
+    """
+
+    def __init__(self, handler):
+        super().__init__(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue, handler)
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    def enqueue(self, record):
+        if not self._started:
+            with self._start_lock:
+                if not self._started:
+                    self.listener.start()
+                    atexit.register(self.stop)
+                    self._started = True
+        super().enqueue(record)
+
+    def stop(self):
+        """Flush the queued records and stop the listener thread, if it runs"""
+        with self._start_lock:
+            if self._started:
+                self.listener.stop()
+                self._started = False
+
+
+def queue_logger(name):
+    """
+    Logger whose records are written by a background thread. Handlers
+    configured in settings.LOGGING are used as they are.
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        logger.addHandler(LazyQueueHandler(handler))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+handshake_logger = queue_logger('websocket.handshake')
+
+
+class HandshakeCounters:
+    """Thread-safe allowed / rejected handshake totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def record(self, allowed):
+        """Count one handshake and return the new total for its outcome"""
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+                return self.allowed
+            self.rejected += 1
+            return self.rejected
+
+    def snapshot(self):
+        with self._lock:
+            return {'allowed': self.allowed, 'rejected': self.rejected}
+
+
+handshake_counters = HandshakeCounters()
+
+
+class OriginValidatorMiddleware(BaseMiddleware):
+    """
+    Custom middleware to validate WebSocket origins
+    Allows connections from Vercel deployments and production domains
+    """
+    ALLOWED_ORIGIN_PATTERNS = [
+        r'^https://louisslutton\.com$',
+        r'^https://www\.louisslutton\.com$',
+        r'^https://.*\.vercel\.app$',
+        r'^https://.*\.railway\.app$',
+        r'^http://localhost:\d+$',  # For local development
+    ]
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.allowed_origin = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.ALLOWED_ORIGIN_PATTERNS)
+        )
+        self.seen_origins = LRUCache(ORIGIN_CACHE_SIZE)
+
+    def is_allowed(self, origin):
+        # Connections without an Origin header are not from a browser
+        if not origin:
+            return True
+        allowed = self.seen_origins.get(origin)
+        if allowed is None:
+            allowed = self.allowed_origin.match(origin) is not None
+            self.seen_origins.set(origin, allowed)
+        return allowed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            headers = dict(scope.get("headers", []))
+            origin = headers.get(b"origin", b"").decode()
+            allowed = self.is_allowed(origin)
+
+            # Log the first handshake of each outcome and every sample-th after it
+            total = handshake_counters.record(allowed)
+            if (total - 1) % (ALLOWED_LOG_SAMPLE if allowed else REJECTED_LOG_SAMPLE) == 0:
+                self.log_handshake(allowed, origin, scope.get('path', ''))
+
+            if not allowed:
+                await send({
+                    "type": "websocket.close",
+                    "code": 403,
+                })
+                return
+
+        return await super().__call__(scope, receive, send)
+
+    def log_handshake(self, allowed, origin, path):
+        counters = handshake_counters.snapshot()
+        handshake_logger.log(
+            logging.INFO if allowed else logging.WARNING,
+            'websocket_handshake outcome=%s origin=%r path=%s allowed_total=%d rejected_total=%d',
+            'allowed' if allowed else 'rejected', origin, path,
+            counters['allowed'], counters['rejected'],
+            extra={'handshake': {'allowed': allowed, 'origin': origin, 'path': path, **counters}}
+        )
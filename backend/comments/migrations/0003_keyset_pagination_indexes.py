@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0002_initial"),
+        ("products", "0004_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productcomment",
+            index=models.Index(
+                fields=["product", "parent_comment", "-created_at"],
+                name="comment_product_created_idx",
+            ),
+        ),
+    ]
@@ -20,3 +20,6 @@ class ProductComment(models.Model):
         verbose_name = "Product Comment"
         verbose_name_plural = "Product Comments"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'parent_comment', '-created_at'], name='comment_product_created_idx'),
+        ]
@@ -0,0 +1,16 @@
+"""
+Comments signal receivers: drop cached WebSocket user snapshots
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from .middleware import forget_user
+
+User = get_user_model()
+
+
+def forget_saved_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+post_save.connect(forget_saved_user, sender=User, dispatch_uid='websocket_user_cache_save')
+post_delete.connect(forget_saved_user, sender=User, dispatch_uid='websocket_user_cache_delete')
@@ -1,3 +1,183 @@
-from django.test import TestCase
+import logging
+from decimal import Decimal
+from unittest import mock
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from products.models import Product
+from slutton_backend.asgi import application
+from . import middleware
+from .consumers import comment_event
+from .db import DatabaseExecutor
+from .groups import MAX_GROUP_NAME_LENGTH, VALID_GROUP_NAME, comment_group_name
+from .middleware import LazyQueueHandler, OriginValidatorMiddleware, user_cache
+from .models import ProductComment
 
-# Create your tests here.
+User = get_user_model()
+
+PRODUCT_SLUG = 'silk-robe'
+
+
+def comment(comment_id, content='Lovely'):
+    return {'id': comment_id, 'content': content}
+
+
+class CommentGroupTests(SimpleTestCase):
+    def test_group_names(self):
+        self.assertEqual(comment_group_name(PRODUCT_SLUG), 'product_comments_silk-robe')
+        for slug in ('ropa-de-señora', 'x' * 200):
+            name = comment_group_name(slug)
+            self.assertLessEqual(len(name), MAX_GROUP_NAME_LENGTH)
+            self.assertTrue(VALID_GROUP_NAME.match(name))
+
+
+class ConsumerTestCase(TransactionTestCase):
+    """
+    Drives the full ASGI WebSocket stack. Comment writes run on the
+    comment_db threads, which need committed data, hence TransactionTestCase.
+    """
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user('commenter', 'commenter@example.com', 'password')
+        self.product = Product.objects.create(
+            name='Silk Robe', slug=PRODUCT_SLUG, price=Decimal('10.00'), stock_quantity=3, sku='ROBE-1'
+        )
+
+    def communicator(self, token=None, origin='http://localhost:3000'):
+        path = f'/ws/comments/{PRODUCT_SLUG}/'
+        if token:
+            path += f'?token={token}'
+        return WebsocketCommunicator(application, path, headers=[(b'origin', origin.encode())])
+
+    async def connected(self, **kwargs):
+        communicator = self.communicator(**kwargs)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def broadcast(self, *events):
+        channel_layer = get_channel_layer()
+        for event in events:
+            await channel_layer.group_send(comment_group_name(PRODUCT_SLUG), event)
+
+
+class BroadcastTests(ConsumerTestCase):
+    async def test_burst_arrives_as_one_batch_frame(self):
+        communicator = await self.connected()
+
+        await self.broadcast(*[comment_event('new', comment=comment(number)) for number in (1, 2, 3)])
+
+        frame = await communicator.receive_json_from()
+        self.assertEqual(frame['action'], 'batch')
+        self.assertEqual([event['comment']['id'] for event in frame['events']], [1, 2, 3])
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_waiting_updates_are_merged(self):
+        communicator = await self.connected()
+
+        await self.broadcast(
+            comment_event('new', comment=comment(1)),
+            comment_event('edit', comment=comment(2, 'First')),
+            comment_event('edit', comment=comment(2, 'Second')),
+            comment_event('delete', comment_id=1),
+        )
+
+        frame = await communicator.receive_json_from()
+        self.assertEqual(frame['action'], 'edit')
+        self.assertEqual(frame['comment']['content'], 'Second')
+        await communicator.disconnect()
+
+    async def test_socket_that_falls_behind_is_asked_to_resync(self):
+        communicator = await self.connected()
+
+        with mock.patch('comments.consumers.MAX_PENDING_UPDATES', 3):
+            await self.broadcast(*[comment_event('new', comment=comment(number)) for number in range(5)])
+            self.assertEqual(await communicator.receive_json_from(), {'action': 'resync'})
+
+        # Updates after the resync are sent normally
+        await self.broadcast(comment_event('new', comment=comment(9)))
+        self.assertEqual((await communicator.receive_json_from())['comment']['id'], 9)
+        await communicator.disconnect()
+
+
+class AuthenticationTests(ConsumerTestCase):
+    async def test_valid_token_can_comment(self):
+        communicator = await self.connected(token=str(AccessToken.for_user(self.user)))
+
+        await communicator.send_json_to({'action': 'new_comment', 'content': 'Lovely'})
+
+        frame = await communicator.receive_json_from()
+        self.assertEqual(frame['action'], 'new')
+        self.assertEqual(frame['comment']['username'], 'commenter')
+        self.assertEqual(await ProductComment.objects.acount(), 1)
+        await communicator.disconnect()
+
+    async def test_invalid_token_connects_anonymously(self):
+        communicator = await self.connected(token='not-a-token')
+
+        await communicator.send_json_to({'action': 'new_comment', 'content': 'Lovely'})
+
+        self.assertEqual(
+            await communicator.receive_json_from(), {'error': 'You must be authenticated to comment.'}
+        )
+        self.assertEqual(await ProductComment.objects.acount(), 0)
+        await communicator.disconnect()
+
+    async def test_user_is_loaded_once_for_several_sockets(self):
+        token = str(AccessToken.for_user(self.user))
+
+        with mock.patch('comments.middleware.load_user', wraps=middleware.load_user) as load_user:
+            communicators = [await self.connected(token=token) for _ in range(3)]
+
+        self.assertEqual(load_user.call_count, 1)
+        for communicator in communicators:
+            await communicator.disconnect()
+
+
+class OriginTests(ConsumerTestCase):
+    async def test_rejected_origin_is_closed(self):
+        communicator = self.communicator(origin='https://louisslutton.com.example.net')
+
+        connected, code = await communicator.connect()
+
+        self.assertFalse(connected)
+        self.assertEqual(code, 403)
+
+    def test_allowed_origins(self):
+        validator = OriginValidatorMiddleware(None)
+        for origin in ('https://louisslutton.com', 'https://shop.vercel.app', 'http://localhost:3000', ''):
+            self.assertTrue(validator.is_allowed(origin), origin)
+        for origin in ('https://louisslutton.com.example.net', 'http://louisslutton.com', 'https://vercel.app'):
+            self.assertFalse(validator.is_allowed(origin), origin)
+
+
+class DatabaseExecutorTests(SimpleTestCase):
+    async def test_runs_calls_on_pool_threads_and_records_them(self):
+        executor = DatabaseExecutor(max_workers=2)
+
+        self.assertEqual(await executor.run(sum, [1, 2]), 3)
+        with self.assertRaises(ZeroDivisionError):
+            await executor.run(divmod, 1, 0)
+
+        metrics = executor.metrics()
+        self.assertEqual((metrics['queue_depth'], metrics['running']), (0, 0))
+        self.assertEqual((metrics['run']['count'], metrics['run']['errors']), (2, 1))
+        executor.executor.shutdown()
+
+
+class HandshakeLoggerTests(SimpleTestCase):
+    def test_listener_starts_with_the_first_record(self):
+        handler = LazyQueueHandler(logging.NullHandler())
+        logger = logging.getLogger('websocket.handshake.test')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        self.assertIsNone(handler.listener._thread)
+        logger.warning('rejected')
+        self.assertIsNotNone(handler.listener._thread)
+        handler.stop()
+        self.assertIsNone(handler.listener._thread)
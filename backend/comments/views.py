@@ -1,14 +1,22 @@
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from .db import comment_db
+from .middleware import handshake_counters
 from .models import ProductComment
 from .serializers import ProductCommentSerializer
 from products.models import Product
+from slutton_backend.pagination import OptionalCursorPagination
 
 
 class ProductCommentViewSet(viewsets.ModelViewSet):
     serializer_class = ProductCommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = OptionalCursorPagination
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         product_slug = self.kwargs.get('product_slug')
@@ -20,3 +28,16 @@ class ProductCommentViewSet(viewsets.ModelViewSet):
         product_slug = self.kwargs.get('product_slug')
         product = get_object_or_404(Product, slug=product_slug)
         serializer.save(user=self.request.user, product=product)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def websocket_metrics(request):
+    """
+    Live comment metrics for the process serving this request: handshake
+    outcomes and the comment database pool's queue depth and wait times
+    """
+    return Response({
+        'handshakes': handshake_counters.snapshot(),
+        'db_executor': comment_db.metrics(),
+    })
@@ -8,20 +8,9 @@ from datetime import date
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'slutton_backend.settings')
 django.setup()
 
-from trivia.models import DailyTrivia, TriviaQuestion
+from trivia.materialize import fixed_source, materialize_days
 
-# Delete existing trivia for today
 today = date.today()
-DailyTrivia.objects.filter(date=today).delete()
-print(f'Deleted existing trivia for {today}')
-
-# Create new trivia
-trivia = DailyTrivia.objects.create(
-    date=today,
-    theme="Seductive Secrets & Passionate History",
-    description="Explore the witty, sensual, and intriguing world of sexual adult knowledge with 15 captivating questions",
-    is_active=True
-)
 
 questions_data = [
     # EASY QUESTIONS (10 points each)
@@ -221,12 +210,17 @@ questions_data = [
     },
 ]
 
-# Create questions
+# Replace today's trivia with these questions
+(trivia,), _ = materialize_days(
+    [today],
+    fixed_source(
+        theme="Seductive Secrets & Passionate History",
+        description="Explore the witty, sensual, and intriguing world of sexual adult knowledge with 15 captivating questions",
+        questions=questions_data
+    ),
+    force=True
+)
 for q_data in questions_data:
-    TriviaQuestion.objects.create(
-        daily_trivia=trivia,
-        **q_data
-    )
     print(f"Created question {q_data['order']}: {q_data['question_text'][:60]}...")
 
 print(f'\nCreated trivia game for {today}')
@@ -9,24 +9,11 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'slutton_backend.settings')
 django.setup()
 
 from datetime import date
-from trivia.models import DailyTrivia, TriviaQuestion
+from trivia.materialize import fixed_source, materialize_days
 
 def create_sample_trivia():
     today = date.today()
 
-    # Check if already exists
-    if DailyTrivia.objects.filter(date=today).exists():
-        print(f"Trivia already exists for {today}")
-        return
-
-    # Create DailyTrivia
-    daily_trivia = DailyTrivia.objects.create(
-        date=today,
-        theme="Sensual Knowledge",
-        description="Test your knowledge with today's tantalizing trivia questions",
-        is_active=True
-    )
-
     # Sample questions
     questions = [
         {
@@ -166,21 +153,20 @@ def create_sample_trivia():
         }
     ]
 
-    # Create questions
-    for q_data in questions:
-        TriviaQuestion.objects.create(
-            daily_trivia=daily_trivia,
-            order=q_data["order"],
-            question_text=q_data["question_text"],
-            question_type=q_data["question_type"],
-            difficulty=q_data["difficulty"],
-            options=q_data["options"],
-            correct_answer=q_data["correct_answer"],
-            explanation=q_data["explanation"]
+    created, _ = materialize_days(
+        [today],
+        fixed_source(
+            theme="Sensual Knowledge",
+            description="Test your knowledge with today's tantalizing trivia questions",
+            questions=questions
         )
+    )
+    if not created:
+        print(f"Trivia already exists for {today}")
+        return
 
     print(f"✅ Created daily trivia for {today} with 15 questions")
-    print(f"Theme: {daily_trivia.theme}")
+    print(f"Theme: {created[0].theme}")
 
 if __name__ == "__main__":
     create_sample_trivia()
@@ -25,6 +25,18 @@ if [ "$RUN_PASSWORD_RESET" = "true" ]; then
     python reset_superuser.py
 fi
 
+# Background worker that applies Stripe webhook events to orders
+if [ "$RUN_STRIPE_WORKER" != "false" ]; then
+    echo "Starting Stripe event worker..."
+    python manage.py process_stripe_events &
+fi
+
+# Background worker that runs queued trivia / memory image generation
+if [ "$RUN_GENERATION_WORKER" != "false" ]; then
+    echo "Starting generation job worker..."
+    python manage.py process_generation_jobs &
+fi
+
 echo "Starting Daphne (ASGI server for WebSocket support)..."
 echo "PORT is set to: $PORT"
 # Use PORT from Railway, default to 8000 if not set
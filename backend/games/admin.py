@@ -72,8 +72,8 @@ class DailyMemoryImagesAdmin(admin.ModelAdmin):
 
         for daily_images in queryset:
             try:
-                # Generate new images
-                image_data = generator.generate_daily_images(daily_images.date)
+                # Generate new images, skipping cached replies
+                image_data = generator.generate_daily_images(daily_images.date, use_cache=False)
 
                 # Update existing record
                 daily_images.theme = image_data['theme']
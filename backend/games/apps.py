@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class GamesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "games"
+
+    def ready(self):
+        from slutton_backend.jobs import register_kind
+        from .jobs import MemoryImagesJobKind
+
+        register_kind('memory_images', MemoryImagesJobKind())
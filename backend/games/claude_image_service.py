@@ -5,6 +5,7 @@ import anthropic
 import os
 import json
 from datetime import date
+from slutton_backend.claude_cache import cached_completion
 
 
 class ClaudeImageGenerator:
@@ -15,10 +16,13 @@ class ClaudeImageGenerator:
             api_key=os.environ.get('ANTHROPIC_API_KEY')
         )
 
-    def generate_daily_images(self, image_date=None):
+    def generate_daily_images(self, image_date=None, use_cache=True):
         """
         Generate 8 sensual/risky image URLs for Memory Match game
 
+        A reply cached for the same prompt and date is reused unless
+        ``use_cache`` is False (see slutton_backend.claude_cache).
+
         Returns:
             dict: {
                 'theme': str,
@@ -75,45 +79,50 @@ IMPORTANT:
 Return ONLY valid JSON, no other text."""
 
         try:
-            message = self.client.messages.create(
+            return cached_completion(
+                self.client,
+                prompt,
+                image_date,
+                self.parse_response,
+                use_cache=use_cache,
                 model="claude-sonnet-4-5-20250929",
                 max_tokens=2000,
-                temperature=1.0,  # More creative
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
+                temperature=1.0  # More creative
             )
 
-            # Extract JSON from response
-            response_text = message.content[0].text.strip()
+        except anthropic.RateLimitError:
+            # Left unwrapped so callers can back off (see slutton_backend.jobs)
+            raise
+        except anthropic.APIError as e:
+            raise Exception(f"Claude API error: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON response from Claude: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error generating images: {str(e)}")
 
-            # Remove markdown code blocks if present
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                # Remove first line (```json) and last line (```)
-                response_text = '\n'.join(lines[1:-1])
+    def parse_response(self, response_text):
+        """Parse and validate a Claude reply; raises ValueError"""
+        response_text = response_text.strip()
 
-            # Parse JSON
-            image_data = json.loads(response_text)
+        # Remove markdown code blocks if present
+        if response_text.startswith('```'):
+            lines = response_text.split('\n')
+            # Remove first line (```json) and last line (```)
+            response_text = '\n'.join(lines[1:-1])
 
-            # Validate structure
-            if not all(key in image_data for key in ['theme', 'description', 'images']):
-                raise ValueError("Missing required keys in Claude response")
+        # Parse JSON
+        image_data = json.loads(response_text)
 
-            if len(image_data['images']) != 8:
-                raise ValueError(f"Expected 8 images, got {len(image_data['images'])}")
+        # Validate structure
+        if not all(key in image_data for key in ['theme', 'description', 'images']):
+            raise ValueError("Missing required keys in Claude response")
 
-            # Validate all URLs start with https://
-            for url in image_data['images']:
-                if not url.startswith('https://'):
-                    raise ValueError(f"Invalid image URL: {url}")
+        if len(image_data['images']) != 8:
+            raise ValueError(f"Expected 8 images, got {len(image_data['images'])}")
 
-            return image_data
+        # Validate all URLs start with https://
+        for url in image_data['images']:
+            if not url.startswith('https://'):
+                raise ValueError(f"Invalid image URL: {url}")
 
-        except anthropic.APIError as e:
-            raise Exception(f"Claude API error: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise Exception(f"Invalid JSON response from Claude: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error generating images: {str(e)}")
+        return image_data
@@ -0,0 +1,28 @@
+"""
+Memory game image generation jobs (see slutton_backend/jobs.py for the queue)
+"""
+from django.db import transaction
+from slutton_backend.jobs import JobKind
+from .models import DailyMemoryImages
+
+
+def save_memory_images(job, generator, image_data):
+    with transaction.atomic():
+        if job.force:
+            DailyMemoryImages.objects.filter(date=job.date).delete()
+        DailyMemoryImages.objects.create(
+            date=job.date,
+            theme=image_data['theme'],
+            description=image_data['description'],
+            images=image_data['images'],
+            is_active=True
+        )
+    return f"{image_data['theme']} ({len(image_data['images'])} images)"
+
+
+class MemoryImagesJobKind(JobKind):
+    def day_exists(self, day):
+        return DailyMemoryImages.objects.filter(date=day).exists()
+
+    def generate(self, job, generator, use_cache):
+        return save_memory_images(job, generator, generator.generate_daily_images(job.date, use_cache=use_cache))
@@ -3,8 +3,7 @@ Management command to generate daily memory game images using Claude AI
 """
 from django.core.management.base import BaseCommand
 from datetime import date, timedelta
-from games.models import DailyMemoryImages
-from games.claude_image_service import ClaudeImageGenerator
+from slutton_backend.jobs import enqueue_jobs, generate_now, write_job_results
 
 
 class Command(BaseCommand):
@@ -27,10 +26,19 @@ class Command(BaseCommand):
             action='store_true',
             help='Force regenerate even if images exist for the date',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Days generated concurrently (default: 4)',
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Only queue the jobs for the process_generation_jobs worker',
+        )
 
     def handle(self, *args, **options):
-        generator = ClaudeImageGenerator()
-
         # Determine date(s) to generate
         if options['date']:
             try:
@@ -43,58 +51,13 @@ class Command(BaseCommand):
         else:
             start_date = date.today()
 
-        days_ahead = options['days_ahead']
-        force = options['force']
-
-        # Generate for each day
-        success_count = 0
-        for day_offset in range(days_ahead + 1):
-            image_date = start_date + timedelta(days=day_offset)
-
-            # Check if already exists
-            if DailyMemoryImages.objects.filter(date=image_date).exists():
-                if not force:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'Images already exist for {image_date}. Use --force to regenerate.'
-                        )
-                    )
-                    continue
-                else:
-                    # Delete existing
-                    DailyMemoryImages.objects.filter(date=image_date).delete()
-                    self.stdout.write(
-                        self.style.WARNING(f'Deleted existing images for {image_date}')
-                    )
-
-            self.stdout.write(f'Generating images for {image_date}...')
+        dates = [start_date + timedelta(days=offset) for offset in range(options['days_ahead'] + 1)]
 
-            try:
-                # Generate images using Claude
-                image_data = generator.generate_daily_images(image_date)
-
-                # Create DailyMemoryImages
-                daily_images = DailyMemoryImages.objects.create(
-                    date=image_date,
-                    theme=image_data['theme'],
-                    description=image_data['description'],
-                    images=image_data['images'],
-                    is_active=True
-                )
-
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Created images for {image_date}: {image_data["theme"]} ({len(image_data["images"])} images)'
-                    )
-                )
-                success_count += 1
+        if options['queue']:
+            jobs = enqueue_jobs('memory_images', dates, force=options['force'])
+            self.stdout.write(self.style.SUCCESS(f'Queued {len(jobs)} image generation job(s)'))
+            return
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error generating images for {image_date}: {str(e)}')
-                )
-                continue
-
-        self.stdout.write(
-            self.style.SUCCESS(f'\nDone! Generated images for {success_count} day(s)')
-        )
+        self.stdout.write(f'Generating images for {len(dates)} day(s)...')
+        jobs = generate_now('memory_images', dates, force=options['force'], workers=options['workers'])
+        write_job_results(self, jobs)
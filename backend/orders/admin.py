@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, StripeEvent
 
 
 class OrderItemInline(admin.TabularInline):
@@ -32,3 +32,11 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'status', 'attempts', 'stripe_created', 'processed_at']
+    list_filter = ['status', 'event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['event_id', 'event_type', 'payload', 'stripe_created', 'received_at', 'processed_at']
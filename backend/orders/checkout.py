@@ -0,0 +1,125 @@
+"""
+Checkout: turn a cart into an order in a single transaction
+"""
+from django.db import transaction
+from django.db.models import Case, F, When
+from cart.models import CartItem
+from products.cache import bump_catalog_version
+from products.models import Product
+from .models import Order, OrderItem
+
+ADDRESS_FIELDS = [
+    'shipping_address_line1', 'shipping_address_line2', 'shipping_city',
+    'shipping_state', 'shipping_postal_code', 'shipping_country',
+    'billing_address_line1', 'billing_address_line2', 'billing_city',
+    'billing_state', 'billing_postal_code', 'billing_country',
+]
+
+CURRENCY = 'usd'
+
+ADDRESS_DEFAULTS = {
+    'shipping_address_line2': '',
+    'shipping_country': 'US',
+    'billing_address_line2': '',
+    'billing_country': 'US',
+}
+
+
+def to_cents(amount):
+    """Stripe amount (in cents) for a Decimal total"""
+    return int(amount * 100)
+
+
+class CheckoutError(Exception):
+    """Checkout could not be completed; nothing was written"""
+
+
+class EmptyCartError(CheckoutError):
+    def __init__(self):
+        super().__init__('Cart is empty')
+
+
+class InsufficientStockError(CheckoutError):
+    def __init__(self, product_name):
+        super().__init__(f'Not enough stock for {product_name}')
+        self.product_name = product_name
+
+
+def place_order(user, cart, address_data, payment_intent_id='', status='processing'):
+    """
+    Create an order from ``cart`` and reserve stock for it.
+
+    Runs in one transaction:
+    - locks the products in the cart (in primary key order, to avoid
+      deadlocks between concurrent checkouts) with select_for_update
+    - checks and decrements stock_quantity in a single UPDATE using F(),
+      which sends no signals, so the catalog cache version is bumped here
+    - bulk-creates the order items with name/sku/price snapshotted from
+      the locked rows
+    - clears the cart with one DELETE
+
+    Raises a CheckoutError subclass (and rolls back) on failure.
+    """
+    with transaction.atomic():
+        quantities = dict(CartItem.objects.filter(cart=cart).values_list('product_id', 'quantity'))
+        if not quantities:
+            raise EmptyCartError()
+
+        products = list(
+            Product.objects.select_for_update().filter(pk__in=quantities).order_by('pk')
+        )
+        for product in products:
+            if not product.is_active or product.stock_quantity < quantities[product.pk]:
+                raise InsufficientStockError(product.name)
+        if len(products) != len(quantities):
+            raise InsufficientStockError('a product that is no longer available')
+
+        Product.objects.filter(pk__in=quantities).update(
+            stock_quantity=F('stock_quantity') - Case(
+                *[When(pk=product_id, then=quantity) for product_id, quantity in quantities.items()]
+            )
+        )
+        bump_catalog_version()
+
+        order = Order.objects.create(
+            user=user,
+            total_amount=sum(product.price * quantities[product.pk] for product in products),
+            stripe_payment_intent_id=payment_intent_id,
+            status=status,
+            **{
+                field: address_data.get(field, ADDRESS_DEFAULTS.get(field))
+                for field in ADDRESS_FIELDS
+            }
+        )
+
+        # bulk_create skips OrderItem.save(), so snapshot the fields here
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=product,
+                product_name=product.name,
+                product_sku=product.sku,
+                quantity=quantities[product.pk],
+                unit_price=product.price,
+                total_price=product.price * quantities[product.pk],
+            )
+            for product in products
+        ])
+
+        CartItem.objects.filter(cart=cart).delete()
+
+    return order
+
+
+def release_stock(order):
+    """Return the stock reserved by ``order`` (e.g. when it is cancelled)"""
+    quantities = dict(
+        order.items.filter(product__isnull=False).values_list('product_id', 'quantity')
+    )
+    if quantities:
+        Product.objects.filter(pk__in=quantities).update(
+            stock_quantity=F('stock_quantity') + Case(
+                *[When(pk=product_id, then=quantity) for product_id, quantity in quantities.items()]
+            )
+        )
+        bump_catalog_version()
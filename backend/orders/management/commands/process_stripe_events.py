@@ -0,0 +1,57 @@
+"""
+Background worker that applies stored Stripe webhook events
+Run: python manage.py process_stripe_events
+"""
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from orders.webhooks import expire_unpaid_orders, process_pending_events
+
+
+class Command(BaseCommand):
+    help = 'Process pending Stripe webhook events (fulfils orders)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process due events once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep between polls when idle (default: 1)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Maximum events handled per poll (default: 100)',
+        )
+        parser.add_argument(
+            '--expire-after',
+            type=int,
+            default=60,
+            help='Cancel unpaid pending orders older than this many minutes (default: 60, 0 disables)',
+        )
+
+    def handle(self, *args, **options):
+        expire_after = timedelta(minutes=options['expire_after'])
+
+        while True:
+            processed = process_pending_events(limit=options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} Stripe event(s)')
+
+            if options['expire_after']:
+                expired = expire_unpaid_orders(expire_after)
+                if expired:
+                    self.stdout.write(
+                        self.style.WARNING(f'Cancelled {expired} unpaid order(s) and released their stock')
+                    )
+
+            if options['once']:
+                break
+            if processed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,252 @@
+"""
+Payment gateway abstraction
+
+Views talk to get_payment_gateway() instead of the global ``stripe`` module.
+StripePaymentGateway wraps a StripeClient with a persistent (per-thread
+pooled) HTTP session, bounded timeouts, automatic network retries, explicit
+idempotency keys, a circuit breaker and per-call latency histograms.
+FakePaymentGateway is an in-process stand-in so checkout can be load-tested
+offline (settings.PAYMENT_GATEWAY = 'orders.payments.FakePaymentGateway').
+"""
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from django.conf import settings
+from django.utils.module_loading import import_string
+import stripe
+from slutton_backend.metrics import LatencyHistogram
+
+
+class PaymentGatewayError(Exception):
+    """The payment provider could not complete the call"""
+
+
+class CircuitOpenError(PaymentGatewayError):
+    """Calls are short-circuited after repeated provider failures"""
+
+
+class WebhookVerificationError(Exception):
+    """The webhook payload or signature is invalid"""
+
+
+@dataclass
+class PaymentIntent:
+    id: str
+    client_secret: str
+    status: str
+    amount: int
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError('Payment provider temporarily unavailable')
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def end_call(self):
+        """Release the half-open trial even if the call ended without an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class PaymentGateway:
+    """Interface shared by the Stripe and fake gateways"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+
+    def create_payment_intent(self, amount, currency, metadata=None, idempotency_key=None):
+        raise NotImplementedError
+
+    def retrieve_payment_intent(self, payment_intent_id):
+        raise NotImplementedError
+
+    def construct_event(self, payload, sig_header):
+        raise NotImplementedError
+
+    def observe(self, operation, seconds, error=False):
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            with self._histograms_lock:
+                histogram = self.histograms.setdefault(operation, LatencyHistogram())
+        histogram.observe(seconds, error=error)
+
+    def metrics(self):
+        return {operation: histogram.snapshot() for operation, histogram in self.histograms.items()}
+
+
+class StripePaymentGateway(PaymentGateway):
+    # Errors that say nothing about the request itself count against the breaker
+    TRANSIENT_ERRORS = (
+        stripe.error.APIConnectionError,
+        stripe.error.APIError,
+        stripe.error.RateLimitError,
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            http_client=stripe.RequestsClient(timeout=settings.STRIPE_TIMEOUT_SECONDS),
+            max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.PAYMENT_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.PAYMENT_CIRCUIT_RESET_SECONDS,
+        )
+
+    def _call(self, operation, func, *args, **kwargs):
+        self.breaker.before_call()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except self.TRANSIENT_ERRORS as e:
+            self.breaker.record_failure()
+            self.observe(operation, time.perf_counter() - start, error=True)
+            raise PaymentGatewayError(str(e)) from e
+        except stripe.error.StripeError as e:
+            # The provider answered; the request was at fault
+            self.breaker.record_success()
+            self.observe(operation, time.perf_counter() - start, error=True)
+            raise PaymentGatewayError(str(e)) from e
+        except Exception:
+            # Any other error would otherwise leave a half-open trial in
+            # flight and keep the circuit open for good
+            self.breaker.end_call()
+            raise
+        # Releases the trial slot under the same lock that records the outcome
+        self.breaker.record_success()
+        self.observe(operation, time.perf_counter() - start)
+        return result
+
+    def _to_intent(self, intent):
+        return PaymentIntent(
+            id=intent.id,
+            client_secret=intent.client_secret,
+            status=intent.status,
+            amount=intent.amount,
+        )
+
+    def create_payment_intent(self, amount, currency, metadata=None, idempotency_key=None):
+        options = {'idempotency_key': idempotency_key} if idempotency_key else {}
+        intent = self._call(
+            'create_payment_intent',
+            self.client.payment_intents.create,
+            params={'amount': amount, 'currency': currency, 'metadata': metadata or {}},
+            options=options,
+        )
+        return self._to_intent(intent)
+
+    def retrieve_payment_intent(self, payment_intent_id):
+        intent = self._call('retrieve_payment_intent', self.client.payment_intents.retrieve, payment_intent_id)
+        return self._to_intent(intent)
+
+    def construct_event(self, payload, sig_header):
+        # Signature verification is local; no network call is made
+        try:
+            return stripe.Webhook.construct_event(payload, sig_header, self.webhook_secret)
+        except (ValueError, stripe.error.SignatureVerificationError) as e:
+            raise WebhookVerificationError(str(e)) from e
+
+
+class FakePaymentGateway(PaymentGateway):
+    """
+    In-process gateway for offline load tests and development.
+    Intents succeed immediately; webhook payloads are accepted unsigned.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._intents = {}
+        self._by_idempotency_key = {}
+
+    def create_payment_intent(self, amount, currency, metadata=None, idempotency_key=None):
+        start = time.perf_counter()
+        with self._lock:
+            intent = self._by_idempotency_key.get(idempotency_key) if idempotency_key else None
+            if intent is None:
+                intent_id = f'pi_fake_{uuid.uuid4().hex}'
+                intent = PaymentIntent(
+                    id=intent_id,
+                    client_secret=f'{intent_id}_secret_fake',
+                    status='succeeded',
+                    amount=amount,
+                )
+                self._intents[intent.id] = intent
+                if idempotency_key:
+                    self._by_idempotency_key[idempotency_key] = intent
+        self.observe('create_payment_intent', time.perf_counter() - start)
+        return intent
+
+    def retrieve_payment_intent(self, payment_intent_id):
+        start = time.perf_counter()
+        try:
+            return self._intents[payment_intent_id]
+        except KeyError:
+            raise PaymentGatewayError(f'No such payment_intent: {payment_intent_id}')
+        finally:
+            self.observe('retrieve_payment_intent', time.perf_counter() - start)
+
+    def construct_event(self, payload, sig_header):
+        try:
+            return json.loads(payload)
+        except ValueError as e:
+            raise WebhookVerificationError(str(e)) from e
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_payment_gateway():
+    """Process-wide gateway named by settings.PAYMENT_GATEWAY"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
@@ -1,3 +1,260 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from unittest import mock
+import stripe
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from cart.models import Cart, CartItem
+from products.cache import get_catalog_version
+from products.models import Product
+from .checkout import InsufficientStockError, place_order, release_stock
+from .models import Order, StripeEvent
+from .payments import CircuitOpenError, PaymentGatewayError, StripePaymentGateway
+from .webhooks import process_event, process_pending_events, record_event, wake_events_for_payment_intent
 
-# Create your tests here.
+User = get_user_model()
+
+ADDRESS = {
+    'shipping_address_line1': '1 Main St', 'shipping_city': 'Springfield',
+    'shipping_state': 'IL', 'shipping_postal_code': '62701',
+    'billing_address_line1': '1 Main St', 'billing_city': 'Springfield',
+    'billing_state': 'IL', 'billing_postal_code': '62701',
+}
+
+
+def stripe_event(event_id, event_type, payment_intent_id, created, amount=2000, user_id=None, currency='usd'):
+    """Stub of a verified Stripe event, as construct_event returns it"""
+    return {
+        'id': event_id,
+        'type': event_type,
+        'created': created,
+        'data': {'object': {
+            'id': payment_intent_id,
+            'amount': amount,
+            'currency': currency,
+            'metadata': {'user_id': str(user_id)},
+        }},
+    }
+
+
+class CheckoutFixtures:
+    def setUp(self):
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'password')
+        self.product = Product.objects.create(
+            name='Silk Robe', slug='silk-robe', price=Decimal('10.00'), stock_quantity=3, sku='ROBE-1'
+        )
+
+    def fill_cart(self, user, quantity=2):
+        cart, _ = Cart.objects.get_or_create(user=user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=quantity)
+        return cart
+
+    def stock(self):
+        self.product.refresh_from_db()
+        return self.product.stock_quantity
+
+
+class CheckoutTestCase(CheckoutFixtures, TestCase):
+    pass
+
+
+class CheckoutTests(CheckoutTestCase):
+    def test_stock_changes_invalidate_catalog_cache(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            order = place_order(self.user, self.fill_cart(self.user), ADDRESS)
+        self.assertNotEqual(get_catalog_version(), version)
+
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            release_stock(order)
+        self.assertNotEqual(get_catalog_version(), version)
+
+
+    def test_last_unit_is_sold_once(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_quantity=1)
+        rival = User.objects.create_user('rival', 'rival@example.com', 'password')
+        carts = [self.fill_cart(self.user, quantity=1), self.fill_cart(rival, quantity=1)]
+
+        place_order(self.user, carts[0], ADDRESS)
+        with self.assertRaises(InsufficientStockError):
+            place_order(rival, carts[1], ADDRESS)
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.stock(), 0)
+        # The failed checkout rolled back and left the rival's cart alone
+        self.assertTrue(CartItem.objects.filter(cart=carts[1]).exists())
+
+
+class ConcurrentCheckoutTests(CheckoutFixtures, TransactionTestCase):
+    # SQLite has no row locks; concurrent writers fail with "table is locked"
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_last_unit_is_sold_once(self):
+        Product.objects.filter(pk=self.product.pk).update(stock_quantity=1)
+        buyers = [self.user, User.objects.create_user('rival', 'rival@example.com', 'password')]
+        carts = [self.fill_cart(buyer, quantity=1) for buyer in buyers]
+        start = threading.Barrier(len(buyers))
+        outcomes = []
+
+        def checkout(buyer, cart):
+            try:
+                start.wait()
+                place_order(buyer, cart, ADDRESS)
+                outcomes.append('ordered')
+            except InsufficientStockError:
+                outcomes.append('out of stock')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=pair) for pair in zip(buyers, carts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['ordered', 'out of stock'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.stock(), 0)
+
+
+class StripeEventTests(CheckoutTestCase):
+    def place(self, payment_intent_id='pi_1'):
+        return place_order(
+            self.user, self.fill_cart(self.user), ADDRESS, payment_intent_id, status='pending'
+        )
+
+    def deliver(self, *events):
+        for event in events:
+            record_event(event)
+        process_pending_events()
+
+    def test_replayed_event_is_applied_once(self):
+        order = self.place()
+        event = stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, user_id=self.user.id)
+
+        self.deliver(event, event)
+        self.deliver(event)
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'processing')
+        self.assertEqual(StripeEvent.objects.get().status, 'processed')
+        self.assertEqual(self.stock(), 1)
+
+    def test_succeeded_before_order_exists_is_retried(self):
+        self.deliver(stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, user_id=self.user.id))
+        event = StripeEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('pending', 1))
+
+        order = self.place()
+        wake_events_for_payment_intent('pi_1')
+        process_pending_events()
+
+        order.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual(order.status, 'processing')
+        self.assertEqual(event.status, 'processed')
+
+    def test_out_of_order_delivery_is_applied_in_creation_order(self):
+        order = self.place()
+
+        self.deliver(
+            stripe_event('evt_2', 'payment_intent.canceled', 'pi_1', 200, user_id=self.user.id),
+            stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, user_id=self.user.id),
+        )
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'processing')
+        self.assertEqual(self.stock(), 1)
+
+    def test_events_before_a_failure_stay_applied(self):
+        order = self.place()
+        record_event(stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, user_id=self.user.id))
+        record_event(stripe_event('evt_2', 'payment_intent.canceled', 'pi_1', 200, user_id=self.user.id))
+
+        def process(event):
+            if event.event_id == 'evt_2':
+                raise DatabaseError('Connection lost')
+            process_event(event)
+
+        with mock.patch('orders.webhooks.process_event', side_effect=process):
+            with self.assertRaises(DatabaseError):
+                process_pending_events()
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'processing')
+        self.assertEqual(
+            dict(StripeEvent.objects.values_list('event_id', 'status')),
+            {'evt_1': 'processed', 'evt_2': 'pending'}
+        )
+
+    def test_payment_for_another_amount_is_rejected(self):
+        order = self.place()
+
+        self.deliver(stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, amount=500, user_id=self.user.id))
+
+        order.refresh_from_db()
+        event = StripeEvent.objects.get()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual(event.status, 'failed')
+        self.assertIn('500', event.last_error)
+        self.assertEqual(self.stock(), 3)
+
+    def test_payment_by_another_user_is_rejected(self):
+        other = User.objects.create_user('other', 'other@example.com', 'password')
+        order = self.place()
+
+        self.deliver(stripe_event('evt_1', 'payment_intent.succeeded', 'pi_1', 100, user_id=other.id))
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual(StripeEvent.objects.get().status, 'failed')
+
+    def test_failed_payment_releases_stock(self):
+        order = self.place()
+        self.assertEqual(self.stock(), 1)
+
+        self.deliver(stripe_event('evt_1', 'payment_intent.payment_failed', 'pi_1', 100, user_id=self.user.id))
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual(self.stock(), 3)
+
+
+@override_settings(
+    STRIPE_SECRET_KEY='sk_test_stub', PAYMENT_CIRCUIT_FAILURE_THRESHOLD=1, PAYMENT_CIRCUIT_RESET_SECONDS=0
+)
+class CircuitBreakerTests(TestCase):
+    def raising(self, error):
+        def call():
+            raise error
+        return call
+
+    def test_unexpected_error_in_trial_call_does_not_keep_circuit_open(self):
+        gateway = StripePaymentGateway()
+        with self.assertRaises(PaymentGatewayError):
+            gateway._call('test', self.raising(stripe.error.APIConnectionError('Down')))
+        self.assertEqual(gateway.breaker.state, 'half_open')
+
+        with self.assertRaises(KeyError):
+            gateway._call('test', self.raising(KeyError('amount')))
+
+        # The half-open trial slot was released, so this call is let through
+        self.assertEqual(gateway._call('test', lambda: 'ok'), 'ok')
+        self.assertEqual(gateway.breaker.state, 'closed')
+
+    def test_trial_slot_is_held_until_outcome_is_recorded(self):
+        gateway = StripePaymentGateway()
+        with self.assertRaises(PaymentGatewayError):
+            gateway._call('test', self.raising(stripe.error.APIConnectionError('Down')))
+        record_success = gateway.breaker.record_success
+
+        def racing_caller():
+            # Another request arriving after the trial returned, before its outcome is recorded
+            with self.assertRaises(CircuitOpenError):
+                gateway.breaker.before_call()
+            record_success()
+
+        with mock.patch.object(gateway.breaker, 'record_success', side_effect=racing_caller):
+            self.assertEqual(gateway._call('test', lambda: 'ok'), 'ok')
+        self.assertEqual(gateway.breaker.state, 'closed')
@@ -1,22 +1,26 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.conf import settings
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
-import stripe
-import json
-from .models import Order, OrderItem
+import hashlib
+from .checkout import CURRENCY, place_order, to_cents
+from .payments import CircuitOpenError, WebhookVerificationError, get_payment_gateway
+from .webhooks import record_event, wake_events_for_payment_intent
+from .models import Order
 from .serializers import OrderSerializer, OrderCreateSerializer
-from cart.models import Cart
+from cart.models import Cart, CartItem
+from slutton_backend.pagination import OptionalCursorPagination
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    ordering_fields = ['created_at', 'total_amount']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         return Order.objects.filter(user=self.request.user).prefetch_related('items')
@@ -29,68 +33,61 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
             else:
                 return Response({'error': 'Must be authenticated to checkout'}, status=status.HTTP_401_UNAUTHORIZED)
 
-            if not cart.items.exists():
+            items = list(CartItem.objects.filter(cart=cart).select_related('product').order_by('id'))
+            if not items:
                 return Response({'error': 'Cart is empty'}, status=status.HTTP_400_BAD_REQUEST)
 
-            amount = int(cart.total_price * 100)  # Convert to cents
+            total_price = sum(item.subtotal for item in items)
+            amount = to_cents(total_price)
 
-            intent = stripe.PaymentIntent.create(
+            # Same cart contents -> same key, so a retried request (or a
+            # gateway-level retry) reuses the intent instead of creating another
+            cart_state = ','.join(f'{item.id}:{item.product_id}:{item.quantity}' for item in items)
+            idempotency_key = hashlib.sha256(f'{cart.id}|{cart_state}|{amount}'.encode()).hexdigest()
+
+            intent = get_payment_gateway().create_payment_intent(
                 amount=amount,
-                currency='usd',
-                metadata={'user_id': request.user.id}
+                currency=CURRENCY,
+                metadata={'user_id': request.user.id},
+                idempotency_key=f'payment-intent-{idempotency_key}'
             )
 
             return Response({
                 'client_secret': intent.client_secret,
-                'amount': cart.total_price
+                'amount': total_price
             })
 
+        except CircuitOpenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'])
     def confirm_order(self, request):
+        """
+        Create the order and reserve stock without calling Stripe.
+        The order stays 'pending' until the payment_intent.succeeded webhook
+        is processed (see orders/webhooks.py).
+        """
         try:
             payment_intent_id = request.data.get('payment_intent_id')
             address_data = request.data
 
-            # Verify payment intent
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            if intent.status != 'succeeded':
-                return Response({'error': 'Payment not completed'}, status=status.HTTP_400_BAD_REQUEST)
-
-            cart = Cart.objects.get(user=request.user)
+            if not payment_intent_id:
+                return Response({'error': 'payment_intent_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Create order
-            order = Order.objects.create(
-                user=request.user,
-                total_amount=cart.total_price,
-                stripe_payment_intent_id=payment_intent_id,
-                shipping_address_line1=address_data.get('shipping_address_line1'),
-                shipping_address_line2=address_data.get('shipping_address_line2', ''),
-                shipping_city=address_data.get('shipping_city'),
-                shipping_state=address_data.get('shipping_state'),
-                shipping_postal_code=address_data.get('shipping_postal_code'),
-                shipping_country=address_data.get('shipping_country', 'US'),
-                billing_address_line1=address_data.get('billing_address_line1'),
-                billing_address_line2=address_data.get('billing_address_line2', ''),
-                billing_city=address_data.get('billing_city'),
-                billing_state=address_data.get('billing_state'),
-                billing_postal_code=address_data.get('billing_postal_code'),
-                billing_country=address_data.get('billing_country', 'US'),
-                status='processing'
-            )
+            # Retried requests for the same payment return the same order
+            existing_order = Order.objects.filter(
+                user=request.user, stripe_payment_intent_id=payment_intent_id
+            ).first()
+            if existing_order:
+                return Response(OrderSerializer(existing_order).data)
 
-            # Create order items from cart
-            for item in cart.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    quantity=item.quantity
-                )
+            cart = Cart.objects.get(user=request.user)
+            order = place_order(request.user, cart, address_data, payment_intent_id, status='pending')
 
-            # Clear cart
-            cart.items.all().delete()
+            # The webhook usually arrives before this request; apply it now
+            wake_events_for_payment_intent(payment_intent_id)
 
             serializer = OrderSerializer(order)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -98,26 +95,35 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def payment_metrics(self, request):
+        """Per-call payment gateway latency histograms and circuit state"""
+        gateway = get_payment_gateway()
+        breaker = getattr(gateway, 'breaker', None)
+        return Response({
+            'gateway': gateway.__class__.__name__,
+            'circuit': breaker.state if breaker else None,
+            'latency': gateway.metrics(),
+        })
+
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([])
 def stripe_webhook(request):
+    """
+    Verify and store the event, then acknowledge immediately.
+    The process_stripe_events worker applies it asynchronously.
+    """
     payload = request.body
     sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
 
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
-        )
-    except ValueError:
-        return HttpResponse(status=400)
-    except stripe.error.SignatureVerificationError:
+        event = get_payment_gateway().construct_event(payload, sig_header)
+    except WebhookVerificationError:
         return HttpResponse(status=400)
 
-    if event['type'] == 'payment_intent.succeeded':
-        payment_intent = event['data']['object']
-        # Handle successful payment
-        pass
+    # Replayed deliveries hit the unique event_id and are not stored twice
+    record_event(event)
 
     return HttpResponse(status=200)
@@ -0,0 +1,167 @@
+"""
+Asynchronous processing of Stripe webhook events
+
+The webhook view only verifies and stores events (StripeEvent); the
+process_stripe_events worker applies them here. Events are applied in
+Stripe creation order, and every handler is an idempotent state
+transition, so replayed or out-of-order deliveries are harmless. An event
+that arrives before its order exists (the client calls confirm_order after
+Stripe has already sent payment_intent.succeeded) is retried with backoff.
+
+confirm_order takes the payment intent id from the client, so a succeeded
+payment is only accepted if its amount, currency and user match the order.
+A handler that rejects a payment returns the reason; the order is
+cancelled, its stock released, and the event marked failed for review
+instead of being retried.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .checkout import CURRENCY, release_stock, to_cents
+from .models import Order, StripeEvent
+
+MAX_ATTEMPTS = getattr(settings, 'STRIPE_EVENT_MAX_ATTEMPTS', 10)
+RETRY_BASE_SECONDS = getattr(settings, 'STRIPE_EVENT_RETRY_BASE_SECONDS', 2)
+RETRY_MAX_SECONDS = 300
+
+
+class EventNotReady(Exception):
+    """The event refers to an order that does not exist yet"""
+
+
+def record_event(event):
+    """Store a verified Stripe event. Returns (StripeEvent, created)."""
+    return StripeEvent.objects.get_or_create(
+        event_id=event['id'],
+        defaults={
+            'event_type': event['type'],
+            'payload': event['data']['object'],
+            'stripe_created': datetime.fromtimestamp(event['created'], tz=dt_timezone.utc),
+        }
+    )
+
+
+def wake_events_for_payment_intent(payment_intent_id):
+    """Make deferred events for this payment intent due immediately"""
+    StripeEvent.objects.filter(
+        status='pending', payload__id=payment_intent_id
+    ).update(next_attempt_at=timezone.now())
+
+
+def _get_order(payment_intent):
+    order = Order.objects.select_for_update().filter(
+        stripe_payment_intent_id=payment_intent['id']
+    ).first()
+    if order is None:
+        raise EventNotReady(f"No order for payment intent {payment_intent['id']}")
+    return order
+
+
+def payment_mismatch(order, payment_intent):
+    """Why ``payment_intent`` cannot pay for ``order``, or None if it can"""
+    if payment_intent.get('amount') != to_cents(order.total_amount):
+        return f"Paid {payment_intent.get('amount')} cents for an order of {to_cents(order.total_amount)}"
+    if payment_intent.get('currency') != CURRENCY:
+        return f"Paid in {payment_intent.get('currency')}, not {CURRENCY}"
+    user_id = (payment_intent.get('metadata') or {}).get('user_id')
+    if str(user_id) != str(order.user_id):
+        return f"Payment intent is for user {user_id}, not the order's owner"
+    return None
+
+
+def cancel_order(order):
+    order.status = 'cancelled'
+    order.save(update_fields=['status', 'updated_at'])
+    release_stock(order)
+
+
+def handle_payment_intent_succeeded(payment_intent):
+    order = _get_order(payment_intent)
+    if order.status == 'cancelled':
+        return f"Payment succeeded for cancelled order {order.order_number}"
+    if order.status != 'pending':
+        return None
+    problem = payment_mismatch(order, payment_intent)
+    if problem:
+        cancel_order(order)
+        return problem
+    order.status = 'processing'
+    order.save(update_fields=['status', 'updated_at'])
+    return None
+
+
+def handle_payment_intent_closed(payment_intent):
+    """Cancelled or failed payment: give the reserved stock back"""
+    order = _get_order(payment_intent)
+    if order.status == 'pending':
+        cancel_order(order)
+    return None
+
+
+HANDLERS = {
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+    'payment_intent.canceled': handle_payment_intent_closed,
+    'payment_intent.payment_failed': handle_payment_intent_closed,
+}
+
+
+def process_event(event):
+    handler = HANDLERS.get(event.event_type)
+    if handler is None:
+        event.status = 'ignored'
+        event.processed_at = timezone.now()
+        event.save(update_fields=['status', 'processed_at'])
+        return
+
+    event.attempts += 1
+    try:
+        with transaction.atomic():
+            problem = handler(event.payload)
+    except Exception as e:
+        event.last_error = str(e)
+        if event.attempts >= MAX_ATTEMPTS:
+            event.status = 'failed'
+        else:
+            delay = min(RETRY_BASE_SECONDS * 2 ** (event.attempts - 1), RETRY_MAX_SECONDS)
+            event.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    else:
+        event.status = 'failed' if problem else 'processed'
+        event.processed_at = timezone.now()
+        event.last_error = problem or ''
+    event.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'processed_at'])
+
+
+def process_pending_events(limit=100):
+    """
+    Apply due events in Stripe creation order. Returns how many were handled.
+
+    Each event is locked and applied in its own transaction, so a slow
+    handler holds one row lock at a time and the events before it are
+    already committed. Events another worker has locked or handled since
+    they were listed are skipped.
+    """
+    due = StripeEvent.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+    handled = 0
+    for event_id in due.order_by('stripe_created', 'id').values_list('id', flat=True)[:limit]:
+        with transaction.atomic():
+            event = due.select_for_update(skip_locked=True).filter(id=event_id).first()
+            if event is None:
+                continue
+            process_event(event)
+        handled += 1
+    return handled
+
+
+def expire_unpaid_orders(max_age):
+    """Cancel pending orders never confirmed by Stripe and release their stock"""
+    expired = 0
+    cutoff = timezone.now() - max_age
+    for order_id in Order.objects.filter(status='pending', created_at__lt=cutoff).values_list('id', flat=True):
+        with transaction.atomic():
+            order = Order.objects.select_for_update().filter(id=order_id, status='pending').first()
+            if order is None:
+                continue
+            cancel_order(order)
+            expired += 1
+    return expired
@@ -0,0 +1,135 @@
+"""
+Versioned response cache for the product catalog API
+
+Cache keys embed a catalog version number that is bumped whenever catalog
+data changes (see products.signals / ratings.signals), so stale entries are
+never read again and simply age out. Lookups go through a small in-process
+LRU first and then the shared Django cache backend.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 15)
+CATALOG_LOCAL_CACHE_SIZE = getattr(settings, 'CATALOG_LOCAL_CACHE_SIZE', 256)
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LRUCache(CATALOG_LOCAL_CACHE_SIZE)
+
+
+def get_catalog_version():
+    """Current catalog version (stored in the shared cache)"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost key never rewinds to a version that
+        # the in-process tier may still hold entries for.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def _incr_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_catalog_version(**kwargs):
+    """
+    Invalidate every cached catalog response once the current transaction
+    commits (at once outside a transaction). Bumping earlier would let a
+    request in between cache pre-commit data under the new version.
+    Usable as a signal receiver.
+    """
+    transaction.on_commit(_incr_catalog_version)
+
+
+class CatalogCacheMixin:
+    """
+    Cache list/retrieve responses for anonymous GET requests.
+    Supports ETag / If-None-Match, answered without touching the database.
+    """
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
+
+    def _cache_key(self, request, version):
+        query = '&'.join(
+            f'{key}={value}'
+            for key, values in sorted(request.query_params.lists())
+            for value in sorted(values)
+        )
+        raw = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'catalog:v{version}:{self.basename}:{self.action}:{digest}'
+
+    def _cached_response(self, request, handler, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = self._cache_key(request, get_catalog_version())
+        etag = f'"{hashlib.md5(key.encode()).hexdigest()}"'
+
+        # Weak comparison, as If-None-Match requires (proxies that compress
+        # responses mark the ETag weak)
+        if_none_match = {
+            tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))
+        }
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        data = local_cache.get(key)
+        if data is None:
+            data = cache.get(key)
+            if data is None:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                data = response.data
+                cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+            local_cache.set(key, data)
+
+        return Response(data, headers={'ETag': etag})
@@ -0,0 +1,33 @@
+"""
+Management command to backfill the denormalized rating aggregates on Product
+Run: python manage.py backfill_rating_aggregates
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute Product.rating_sum and Product.rating_count from ProductRating'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of products updated per transaction (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        product_ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+
+        updated = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            with transaction.atomic():
+                updated += Product.refresh_rating_aggregates(product_ids=batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Done! Refreshed rating aggregates for {updated} product(s)')
+        )
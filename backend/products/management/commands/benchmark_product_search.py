@@ -0,0 +1,108 @@
+"""
+Management command to benchmark product search latency
+Run: python manage.py benchmark_product_search --sizes 1000 10000 100000
+
+Synthetic products are created inside a transaction that is rolled back at
+the end, so the command is safe to run against a development database.
+"""
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from products.cache import bump_catalog_version
+from products.models import Product
+from products.search import get_search_backend
+
+WORDS = [
+    'silk', 'satin', 'lace', 'velvet', 'leather', 'midnight', 'scarlet', 'golden',
+    'robe', 'corset', 'candle', 'perfume', 'massage', 'oil', 'blindfold', 'feather',
+    'champagne', 'rose', 'luxury', 'sensual', 'bold', 'soft', 'warm', 'vanilla',
+]
+QUERIES = ['silk', 'lac', 'midnight robe', 'scarlet', 'vanilla candle', 'champ', 'leather corset']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark product search (ranked backend vs. icontains) at several catalog sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Catalog sizes to benchmark (default: 1000 10000 100000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Times each query is run per size (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f'Search backend: {backend.__class__.__name__}')
+
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    self.create_products(size)
+                    # Prime the in-process index so the build is not timed
+                    list(backend.search(Product.objects.all(), 'warmup')[:1])
+
+                    ranked = self.measure(
+                        lambda q: list(backend.search(Product.objects.all(), q).values_list('id', flat=True)[:20]),
+                        options['repeat']
+                    )
+                    icontains = self.measure(
+                        lambda q: list(
+                            Product.objects.filter(Q(name__icontains=q) | Q(description__icontains=q))
+                            .values_list('id', flat=True)[:20]
+                        ),
+                        options['repeat']
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+
+            self.stdout.write(
+                f'{size:>7} products | ranked search: mean {ranked[0]:.2f} ms, p95 {ranked[1]:.2f} ms'
+                f' | icontains: mean {icontains[0]:.2f} ms, p95 {icontains[1]:.2f} ms'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    def create_products(self, size):
+        rng = random.Random(size)
+        batch = []
+        for i in range(size):
+            name = ' '.join(rng.sample(WORDS, 2)).title()
+            description = ' '.join(rng.choices(WORDS, k=30))
+            batch.append(Product(
+                name=name,
+                slug=f'bench-{size}-{i}',
+                description=description,
+                price=rng.randint(5, 500),
+                sku=f'BENCH-{size}-{i}',
+            ))
+        Product.objects.bulk_create(batch, batch_size=1000)
+        backend = get_search_backend()
+        backend.update_index(Product.objects.filter(sku__startswith=f'BENCH-{size}-').values('pk'))
+        # bulk_create sends no signals; force the in-process index to rebuild
+        bump_catalog_version()
+
+    def measure(self, run, repeat):
+        timings = []
+        for query in QUERIES:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run(query)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return statistics.mean(timings), timings[int(len(timings) * 0.95) - 1]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:10
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductRating = apps.get_model("ratings", "ProductRating")
+    ratings = (
+        ProductRating.objects.filter(product=models.OuterRef("pk"))
+        .order_by()
+        .values("product")
+    )
+    Product.objects.update(
+        rating_sum=Coalesce(
+            models.Subquery(
+                ratings.annotate(total=models.Sum("rating")).values("total")
+            ),
+            0,
+        ),
+        rating_count=Coalesce(
+            models.Subquery(
+                ratings.annotate(total=models.Count("id")).values("total")
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0001_initial"),
+        ("ratings", "0003_productrating_review"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 
 
@@ -38,6 +41,13 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized rating aggregates, maintained by ratings.signals
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Full-text search document (Postgres only, see products.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
@@ -45,18 +55,32 @@ class Product(models.Model):
 
     @property
     def average_rating(self):
-        """Calculate average rating for product"""
-        from ratings.models import ProductRating
-        ratings = ProductRating.objects.filter(product=self)
-        if ratings.exists():
-            return ratings.aggregate(models.Avg('rating'))['rating__avg']
+        """Average rating from the stored aggregates (no query)"""
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0
 
-    @property
-    def rating_count(self):
-        """Get total number of ratings"""
+    @classmethod
+    def refresh_rating_aggregates(cls, product_ids=None):
+        """
+        Recompute rating_sum/rating_count from ProductRating.
+        Runs as a single UPDATE with correlated subqueries.
+        """
         from ratings.models import ProductRating
-        return ProductRating.objects.filter(product=self).count()
+        ratings = ProductRating.objects.filter(product=models.OuterRef('pk')).order_by().values('product')
+        queryset = cls.objects.all()
+        if product_ids is not None:
+            queryset = queryset.filter(pk__in=product_ids)
+        return queryset.update(
+            rating_sum=Coalesce(
+                models.Subquery(ratings.annotate(total=models.Sum('rating')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                models.Subquery(ratings.annotate(total=models.Count('id')).values('total')),
+                0
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -65,6 +89,16 @@ class Product(models.Model):
         verbose_name = "Product"
         verbose_name_plural = "Products"
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over the catalog's ordering fields
+            # (id breaks ties, see slutton_backend.pagination.KeysetPagination)
+            models.Index(fields=['is_active', '-created_at', '-id'], name='product_active_created_idx'),
+            models.Index(fields=['is_active', 'price', 'id'], name='product_active_price_idx'),
+            models.Index(fields=['is_active', 'name', 'id'], name='product_active_name_idx'),
+            # Full-text and trigram search (Postgres only, see products.search)
+            GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+            GinIndex(OpClass('name', name='gin_trgm_ops'), name='product_name_trgm_gin'),
+        ]
 
 
 class ProductImage(models.Model):
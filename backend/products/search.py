@@ -0,0 +1,208 @@
+"""
+Pluggable full-text search for the product catalog
+
+- PostgresSearchBackend: stored SearchVectorField with a GIN index, prefix
+  tsquery matching and a trigram-similarity fallback for typos.
+- InMemorySearchBackend: an in-process inverted index over the same fields,
+  used on SQLite during development. It is rebuilt lazily whenever the
+  catalog version (see products.cache) changes.
+
+Both return results ranked best-first and treat every term as a prefix, so
+they can serve typeahead queries. The in-memory backend only returns the
+best PRODUCT_SEARCH_MAX_RESULTS (default 500) matches, which keeps its
+CASE/IN clauses small; the Postgres backend is not capped.
+
+Ranked results have no column for keyset pagination to seek on, so
+searches without an explicit ``ordering`` are always paged by number.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+from .cache import get_catalog_version
+
+SEARCH_CONFIG = getattr(settings, 'PRODUCT_SEARCH_CONFIG', 'english')
+SEARCH_MAX_RESULTS = getattr(settings, 'PRODUCT_SEARCH_MAX_RESULTS', 500)
+TRIGRAM_THRESHOLD = getattr(settings, 'PRODUCT_SEARCH_TRIGRAM_THRESHOLD', 0.3)
+
+# Field weights, mirroring setweight('A') / setweight('B') on Postgres
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class PostgresSearchBackend:
+    """Full-text search over Product.search_vector (GIN indexed)"""
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        # Tokens are plain word characters, so they are safe in a raw tsquery
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=SEARCH_CONFIG
+        )
+        return queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            search_similarity=TrigramSimilarity('name', query),
+        ).filter(
+            Q(search_vector=search_query) | Q(search_similarity__gte=TRIGRAM_THRESHOLD)
+        ).order_by('-search_rank', '-search_similarity')
+
+    def update_index(self, product_ids):
+        from django.contrib.postgres.search import SearchVector
+        from .models import Product
+
+        Product.objects.filter(pk__in=product_ids).update(
+            search_vector=(
+                SearchVector('name', weight='A', config=SEARCH_CONFIG)
+                + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+            )
+        )
+
+
+class InMemoryIndex:
+    """Inverted index: token -> {product_id: score}"""
+
+    def __init__(self, rows):
+        postings = defaultdict(lambda: defaultdict(float))
+        for product_id, name, description in rows:
+            for token in tokenize(name):
+                postings[token][product_id] += NAME_WEIGHT
+            for token in tokenize(description):
+                postings[token][product_id] += DESCRIPTION_WEIGHT
+        self.postings = {token: dict(scores) for token, scores in postings.items()}
+        self.tokens = sorted(self.postings)
+
+    def _match(self, term):
+        """Scores for every token starting with ``term``; exact hits count double"""
+        scores = defaultdict(float)
+        start = bisect.bisect_left(self.tokens, term)
+        for token in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            boost = 2.0 if token == term else 1.0
+            for product_id, score in self.postings[token].items():
+                scores[product_id] += score * boost
+        return scores
+
+    def search(self, terms, limit):
+        results = None
+        for term in terms:
+            scores = self._match(term)
+            if results is None:
+                results = scores
+            else:
+                # AND semantics, like ' & ' in the Postgres tsquery
+                results = {pid: results[pid] + score for pid, score in scores.items() if pid in results}
+            if not results:
+                return []
+        ranked = sorted(results.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked[:limit]]
+
+
+class InMemorySearchBackend:
+    """In-process search for SQLite development databases (best SEARCH_MAX_RESULTS only)"""
+
+    def __init__(self):
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_index(self):
+        from .models import Product
+
+        version = get_catalog_version()
+        if self._index is None or self._version != version:
+            with self._lock:
+                if self._index is None or self._version != version:
+                    rows = Product.objects.values_list('id', 'name', 'description').iterator()
+                    self._index = InMemoryIndex(rows)
+                    self._version = version
+        return self._index
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+
+        product_ids = self.get_index().search(terms, SEARCH_MAX_RESULTS)
+        if not product_ids:
+            return queryset.none()
+
+        # A single raw CASE is far cheaper to build than hundreds of When()s
+        column = f'"{queryset.model._meta.db_table}"."id"'
+        rank = RawSQL(
+            f'CASE {column} ' + ' '.join(['WHEN %s THEN %s'] * len(product_ids)) + ' END',
+            [value for position, product_id in enumerate(product_ids) for value in (product_id, position)]
+        )
+        return queryset.filter(pk__in=product_ids).annotate(search_rank=rank).order_by('search_rank')
+
+    def update_index(self, product_ids):
+        # The index is rebuilt on the next search after a catalog version bump
+        pass
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Backend named by settings.PRODUCT_SEARCH_BACKEND, or chosen from the
+    database vendor when unset.
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgresSearchBackend()
+        else:
+            _backend = InMemorySearchBackend()
+    return _backend
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for DRF's SearchFilter on products.
+    Results are ranked unless the client asks for an explicit ``ordering``.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    @classmethod
+    def is_ranked(cls, request):
+        """Whether the results for ``request`` are in search rank order"""
+        return bool(
+            request.query_params.get(cls.search_param, '').strip()
+            and not request.query_params.get(cls.ordering_param)
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        ordering = queryset.query.order_by
+        results = get_search_backend().search(queryset, query)
+        if not self.is_ranked(request):
+            results = results.order_by(*ordering)
+        return results
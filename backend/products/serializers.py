@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 from .models import Category, Product, ProductImage, ProductVideo
 
 
@@ -50,8 +51,27 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'price', 'category_name',
                   'stock_quantity', 'primary_image', 'average_rating', 'rating_count', 'created_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset, prefix=''):
+        """
+        Load everything the list representation needs in a fixed number of
+        queries. ``prefix`` is the lookup path to the product when the
+        queryset is for a related model (e.g. ``'product__'``).
+        """
+        return queryset.select_related(f'{prefix}category').prefetch_related(
+            Prefetch(
+                f'{prefix}images',
+                queryset=ProductImage.objects.filter(is_primary=True),
+                to_attr='primary_images'
+            )
+        )
+
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
+        primary_images = getattr(obj, 'primary_images', None)
+        if primary_images is None:
+            primary = obj.images.filter(is_primary=True).first()
+        else:
+            primary = primary_images[0] if primary_images else None
         if primary:
             request = self.context.get('request')
             return request.build_absolute_uri(primary.image.url) if request else primary.image.url
@@ -0,0 +1,17 @@
+"""
+Catalog signal receivers: cache versioning and search indexing
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import bump_catalog_version
+from .models import Category, Product, ProductImage, ProductVideo
+from .search import get_search_backend
+
+for model in (Category, Product, ProductImage, ProductVideo):
+    post_save.connect(bump_catalog_version, sender=model, dispatch_uid=f'catalog_version_save_{model.__name__}')
+    post_delete.connect(bump_catalog_version, sender=model, dispatch_uid=f'catalog_version_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=Product)
+def update_product_search_index(sender, instance, **kwargs):
+    get_search_backend().update_index([instance.pk])
@@ -1,3 +1,122 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from .cache import get_catalog_version, local_cache
+from .models import Category, Product, ProductImage
 
-# Create your tests here.
+
+def create_product(number, **fields):
+    fields = {
+        'name': f'Product {number}', 'slug': f'product-{number}', 'price': Decimal('10.00'),
+        'stock_quantity': 3, 'sku': f'SKU-{number}', **fields
+    }
+    return Product.objects.create(**fields)
+
+
+class CatalogCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+
+class ProductListQueryTests(CatalogCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='Robes', slug='robes')
+
+    def add_products(self, count):
+        for number in range(Product.objects.count(), count):
+            product = create_product(number, category=self.category)
+            ProductImage.objects.bulk_create([
+                ProductImage(product=product, image=f'products/{number}-{order}.jpg', is_primary=order == 0, order=order)
+                for order in range(3)
+            ])
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        for count in (5, 20):
+            self.add_products(count)
+            local_cache.clear()
+            cache.clear()
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/products/')
+            self.assertEqual(len(response.data['results']), count)
+            self.assertTrue(all(product['primary_image'] for product in response.data['results']))
+
+
+class CatalogVersionTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_version_is_bumped_after_commit(self):
+        version = get_catalog_version()
+        with transaction.atomic():
+            create_product(1)
+            self.assertEqual(get_catalog_version(), version)
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_rolled_back_change_keeps_version(self):
+        version = get_catalog_version()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            create_product(1)
+            raise RuntimeError()
+        self.assertEqual(get_catalog_version(), version)
+
+
+class CatalogETagTests(CatalogCacheTestCase):
+    def test_only_matching_etag_is_not_modified(self):
+        create_product(1)
+        etag = self.client.get('/api/products/')['ETag']
+
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get('/api/products/', HTTP_IF_NONE_MATCH=f'"other", W/{etag}').status_code, 304
+        )
+        # A header that merely contains the current tag does not match it
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=f'"stale{etag}"').status_code, 200)
+
+
+class ProductSearchPaginationTests(CatalogCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        create_product(1, description='Warm silk lining')
+        create_product(2, name='Silk Robe')
+        # Newest first, so cursor ordering would put this one on top
+        create_product(3, description='Silk trim')
+
+    def names(self, response):
+        return [product['name'] for product in response.data['results']]
+
+    def test_cursor_mode_keeps_rank_order_for_searches(self):
+        ranked = self.names(self.client.get('/api/products/', {'search': 'silk'}))
+        response = self.client.get('/api/products/', {'search': 'silk', 'pagination': 'cursor'})
+
+        self.assertEqual(ranked[0], 'Silk Robe')
+        self.assertEqual(self.names(response), ranked)
+        self.assertIn('count', response.data)
+
+    def test_cursor_mode_applies_to_ordered_searches(self):
+        response = self.client.get('/api/products/', {'search': 'silk', 'ordering': 'name', 'pagination': 'cursor'})
+
+        self.assertEqual(self.names(response), ['Product 1', 'Product 3', 'Silk Robe'])
+        self.assertNotIn('count', response.data)
+
+
+class KeysetPaginationTests(CatalogCacheTestCase):
+    def test_pages_through_equal_prices_without_gaps(self):
+        ids = {create_product(number).id for number in range(7)}
+
+        for ordering, tiebreak in (('price', 'ASC'), ('-price', 'DESC')):
+            seen = []
+            url = f'/api/products/?pagination=cursor&page_size=2&ordering={ordering}'
+            with CaptureQueriesContext(connection) as queries:
+                while url:
+                    response = self.client.get(url)
+                    seen.extend(product['id'] for product in response.data['results'])
+                    url = response.data['next']
+            self.assertEqual(len(seen), len(ids))
+            self.assertEqual(set(seen), ids)
+            # SQLite happens to return ties in id order; other databases need it spelled out
+            self.assertIn(f'"products_product"."id" {tiebreak}', queries[0]['sql'])
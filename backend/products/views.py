@@ -3,26 +3,39 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
+from slutton_backend.pagination import OptionalCursorPagination
+from .cache import CatalogCacheMixin
 from .models import Category, Product, ProductVideo
+from .search import ProductSearchFilter
 from .serializers import CategorySerializer, ProductListSerializer, ProductDetailSerializer, ProductVideoSerializer
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Product.objects.filter(is_active=True).select_related('category').prefetch_related('images', 'videos')
+class ProductViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Product.objects.filter(is_active=True).select_related('category')
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = OptionalCursorPagination
     lookup_field = 'slug'
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
     filterset_fields = ['category__slug', 'price']
-    search_fields = ['name', 'description']
     ordering_fields = ['price', 'created_at', 'name']
     ordering = ['-created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            return ProductListSerializer.setup_eager_loading(queryset)
+        return queryset.prefetch_related('images', 'videos')
+
+    def allows_cursor_pagination(self, request):
+        # Ranked search results are paged by number (see OptionalCursorPagination)
+        return not ProductSearchFilter.is_ranked(request)
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
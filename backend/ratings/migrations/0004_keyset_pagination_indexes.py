@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0004_keyset_pagination_indexes"),
+        ("ratings", "0003_productrating_review"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productrating",
+            index=models.Index(
+                fields=["product", "-created_at"], name="rating_product_created_idx"
+            ),
+        ),
+    ]
@@ -24,3 +24,6 @@ class ProductRating(models.Model):
         verbose_name_plural = "Product Ratings"
         unique_together = ['user', 'product']  # One rating per user per product
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', '-created_at'], name='rating_product_created_idx'),
+        ]
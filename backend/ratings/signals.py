@@ -0,0 +1,17 @@
+"""
+Keep Product.rating_sum / Product.rating_count in sync with ProductRating
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from products.cache import bump_catalog_version
+from products.models import Product
+from .models import ProductRating
+
+
+@receiver(post_save, sender=ProductRating)
+@receiver(post_delete, sender=ProductRating)
+def update_product_rating_aggregates(sender, instance, **kwargs):
+    Product.refresh_rating_aggregates(product_ids=[instance.product_id])
+    # Aggregates are written with a queryset update, which sends no
+    # Product signals, so invalidate the catalog cache here.
+    bump_catalog_version()
@@ -1,3 +1,61 @@
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from products.models import Product
+from .models import ProductRating
 
-# Create your tests here.
+User = get_user_model()
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Silk Robe', slug='silk-robe', price=Decimal('10.00'), stock_quantity=3, sku='ROBE-1'
+        )
+        self.users = [
+            User.objects.create_user(f'rater{number}', f'rater{number}@example.com', 'password')
+            for number in range(3)
+        ]
+
+    def rate(self, user, rating):
+        return ProductRating.objects.create(user=user, product=self.product, rating=rating)
+
+    def assertAggregates(self, rating_sum, rating_count, average):
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (rating_sum, rating_count))
+        self.assertAlmostEqual(self.product.average_rating, average)
+
+    def test_signals_keep_aggregates_in_sync(self):
+        self.assertAggregates(0, 0, 0)
+
+        first = self.rate(self.users[0], 5)
+        self.rate(self.users[1], 2)
+        self.assertAggregates(7, 2, 3.5)
+
+        first.rating = 3
+        first.save()
+        self.assertAggregates(5, 2, 2.5)
+
+        first.delete()
+        self.assertAggregates(2, 1, 2)
+
+    def test_backfill_repairs_drifted_aggregates(self):
+        self.rate(self.users[0], 4)
+        self.rate(self.users[1], 5)
+        self.rate(self.users[2], 3)
+        other = Product.objects.create(
+            name='Lace Gown', slug='lace-gown', price=Decimal('20.00'), stock_quantity=1, sku='GOWN-1'
+        )
+        # Written behind the signals' back, e.g. by a raw import
+        Product.objects.filter(pk=self.product.pk).update(rating_sum=40, rating_count=9)
+        Product.objects.filter(pk=other.pk).update(rating_sum=5, rating_count=1)
+
+        out = StringIO()
+        call_command('backfill_rating_aggregates', batch_size=1, stdout=out)
+
+        self.assertIn('2 product(s)', out.getvalue())
+        self.assertAggregates(12, 3, 4)
+        other.refresh_from_db()
+        self.assertEqual((other.rating_sum, other.rating_count, other.average_rating), (0, 0, 0))
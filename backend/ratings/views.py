@@ -2,14 +2,19 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from .models import ProductRating
 from .serializers import ProductRatingSerializer
 from products.models import Product
+from slutton_backend.pagination import OptionalCursorPagination
 
 
 class ProductRatingViewSet(viewsets.ModelViewSet):
     serializer_class = ProductRatingSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = OptionalCursorPagination
+    ordering_fields = ['created_at', 'rating']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         product_slug = self.kwargs.get('product_slug')
@@ -17,11 +22,22 @@ class ProductRatingViewSet(viewsets.ModelViewSet):
             return ProductRating.objects.filter(product__slug=product_slug)
         return ProductRating.objects.all()
 
+    # Rating writes run in a transaction so the aggregate refresh in
+    # ratings.signals commits (or rolls back) together with the rating row.
+    @transaction.atomic
     def perform_create(self, serializer):
         product_slug = self.kwargs.get('product_slug')
         product = get_object_or_404(Product, slug=product_slug)
         serializer.save(user=self.request.user, product=product)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
     def create(self, request, *args, **kwargs):
         product_slug = self.kwargs.get('product_slug')
         product = get_object_or_404(Product, slug=product_slug)
@@ -32,7 +48,7 @@ class ProductRatingViewSet(viewsets.ModelViewSet):
             # Update existing rating
             serializer = self.get_serializer(existing_rating, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            self.perform_update(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return super().create(request, *args, **kwargs)
@@ -0,0 +1,117 @@
+"""
+On-disk cache for Claude completions
+
+Responses are content-addressed by (model, prompt, date, sampling
+parameters), so repeated admin regenerations, job retries and concurrent
+requests for the same day reuse one paid call. Entries live as JSON files
+in settings.CLAUDE_CACHE_DIR, expire after CLAUDE_CACHE_TTL seconds and are
+evicted least-recently-used beyond CLAUDE_CACHE_MAX_ENTRIES. A response is
+only stored once the caller's parser accepts it, so a malformed reply is
+never replayed. Concurrent identical calls in one process share a lock, so
+only one of them reaches the API.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+
+CLAUDE_CACHE_DIR = getattr(settings, 'CLAUDE_CACHE_DIR', Path(settings.BASE_DIR) / '.claude_cache')
+CLAUDE_CACHE_TTL = getattr(settings, 'CLAUDE_CACHE_TTL', 60 * 60)
+CLAUDE_CACHE_MAX_ENTRIES = getattr(settings, 'CLAUDE_CACHE_MAX_ENTRIES', 200)
+
+
+class ClaudeResponseCache:
+    def __init__(self, directory=CLAUDE_CACHE_DIR, ttl=CLAUDE_CACHE_TTL, max_entries=CLAUDE_CACHE_MAX_ENTRIES):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def key(self, **parts):
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f'{key}.json'
+
+    def lock(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+            if time.time() - entry['created'] > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            # mtime records the last use, for LRU eviction
+            os.utime(path)
+            return entry['text']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key, text):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'created': time.time(), 'text': text}, f)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        now = time.time()
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            # Unused for longer than the TTL, so certainly expired
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+
+response_cache = ClaudeResponseCache()
+
+
+def completion_key(prompt, cache_date, **params):
+    return response_cache.key(prompt=prompt, date=cache_date, **params)
+
+
+def cached_completion(client, prompt, cache_date, parse, use_cache=True, **params):
+    """
+    ``parse(text)`` of a Claude reply to ``prompt``, served from the cache when
+    possible. ``params`` are passed to messages.create (model, max_tokens...).
+    With ``use_cache=False`` the API is always called, and the new reply
+    replaces the cached one.
+    """
+    key = completion_key(prompt, cache_date, **params)
+    with response_cache.lock(key):
+        if use_cache:
+            text = response_cache.get(key)
+            if text is not None:
+                try:
+                    return parse(text)
+                except ValueError:
+                    pass
+
+        message = client.messages.create(
+            messages=[{"role": "user", "content": prompt}],
+            **params
+        )
+        text = message.content[0].text
+        result = parse(text)
+        response_cache.set(key, text)
+        return result
@@ -0,0 +1,259 @@
+"""
+Queued content generation, shared by the apps that generate daily content
+
+Jobs are GenerationJob rows (settings.GENERATION_JOB_MODEL), one per kind
+and date. The process_generation_jobs worker claims due jobs with SKIP
+LOCKED, so several workers can share the queue, and runs each claimed batch
+on a bounded thread pool: the slow part is waiting on the Claude API, so
+dates are generated concurrently. Failed jobs are retried with exponential
+backoff; rate-limited jobs wait at least as long as the API's retry-after
+header.
+
+This module knows nothing about what a kind produces. Each app registers a
+JobKind for its kinds from its AppConfig.ready() (see trivia/jobs.py and
+games/jobs.py), so apps queue and run jobs without importing each other.
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import anthropic
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+MAX_ATTEMPTS = getattr(settings, 'GENERATION_JOB_MAX_ATTEMPTS', 5)
+RETRY_BASE_SECONDS = getattr(settings, 'GENERATION_JOB_RETRY_BASE_SECONDS', 30)
+RETRY_MAX_SECONDS = 60 * 30
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_AFTER = timedelta(minutes=15)
+
+GENERATORS = getattr(settings, 'GENERATION_JOB_GENERATORS', {
+    'trivia': 'trivia.claude_service.ClaudeTriviaGenerator',
+    'memory_images': 'games.claude_image_service.ClaudeImageGenerator',
+})
+
+kinds = {}
+
+
+class ContentExists(Exception):
+    """Content for the date already exists and the job is not forced"""
+
+
+class JobKind:
+    """
+    What one kind of job produces. ``generate`` saves a day and returns a
+    short description of it. A kind with ``batched`` set is not run a date
+    per thread: ``run_batch`` gets every claimed job of the kind at once.
+    """
+    batched = False
+
+    def day_exists(self, day):
+        """Whether anything (even a partial day) is stored for ``day``"""
+        raise NotImplementedError
+
+    def content_exists(self, day):
+        return self.day_exists(day)
+
+    def generate(self, job, generator, use_cache):
+        raise NotImplementedError
+
+    def run_batch(self, jobs):
+        raise NotImplementedError
+
+
+def register_kind(name, kind):
+    kinds[name] = kind
+
+
+def get_job_model():
+    return apps.get_model(getattr(settings, 'GENERATION_JOB_MODEL', 'trivia.GenerationJob'))
+
+
+def enqueue_jobs(kind, dates, force=False):
+    """
+    Queue a job per date, reusing any pending or running job for the same
+    kind and date. Returns the jobs in date order.
+    """
+    GenerationJob = get_job_model()
+    dates = sorted(set(dates))
+    existing = {
+        job.date: job
+        for job in GenerationJob.objects.filter(
+            kind=kind, date__in=dates, status__in=['pending', 'running']
+        )
+    }
+    if force:
+        GenerationJob.objects.filter(
+            pk__in=[job.pk for job in existing.values()], status='pending'
+        ).update(force=True)
+    new_jobs = GenerationJob.objects.bulk_create([
+        GenerationJob(kind=kind, date=day, force=force)
+        for day in dates if day not in existing
+    ])
+    jobs = list(existing.values()) + new_jobs
+    return sorted(jobs, key=lambda job: job.date)
+
+
+def retry_delay(job, error):
+    delay = min(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1), RETRY_MAX_SECONDS)
+    if isinstance(error, anthropic.RateLimitError):
+        try:
+            delay = max(delay, float(error.response.headers.get('retry-after', 0)))
+        except (TypeError, ValueError):
+            pass
+    # Jitter, so jobs that failed together do not retry together
+    return delay * random.uniform(1, 1.25)
+
+
+def record_outcome(job, result=None, error=None):
+    """
+    Save a job's outcome after an attempt: ``result``, or the ``error`` it
+    raised. An IntegrityError means the day was created meanwhile; if it
+    was not, some other constraint failed, so the job is marked failed and
+    the error raised again.
+    """
+    if isinstance(error, IntegrityError) and not kinds[job.kind].day_exists(job.date):
+        job.status = 'failed'
+        job.last_error = str(error)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'last_error', 'finished_at'])
+        raise error
+    if isinstance(error, (ContentExists, IntegrityError)):
+        job.status = 'skipped'
+        job.result = 'Content already exists for this date'
+        job.finished_at = timezone.now()
+    elif error is not None:
+        job.last_error = str(error)
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        else:
+            job.status = 'pending'
+            job.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(job, error))
+    else:
+        job.status = 'succeeded'
+        job.result = result
+        job.last_error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'attempts', 'last_error', 'result', 'next_attempt_at', 'finished_at'])
+    return job
+
+
+def run_job(job, get_generator):
+    """Run one claimed job and record the outcome"""
+    kind = kinds[job.kind]
+    job.attempts += 1
+    # A forced job replaces the day, and a retry must not replay the reply that failed
+    use_cache = not job.force and job.attempts == 1
+    try:
+        if not job.force and kind.content_exists(job.date):
+            raise ContentExists()
+        result = kind.generate(job, get_generator(job.kind), use_cache)
+    except Exception as e:
+        return record_outcome(job, error=e)
+    return record_outcome(job, result=result)
+
+
+def claim_jobs(limit, ids=None):
+    """Mark up to ``limit`` due jobs (optionally only ``ids``) as running and return them"""
+    GenerationJob = get_job_model()
+    with transaction.atomic():
+        due = GenerationJob.objects.select_for_update(skip_locked=True).filter(
+            status='pending', next_attempt_at__lte=timezone.now()
+        )
+        if ids is not None:
+            due = due.filter(pk__in=ids)
+        jobs = list(due.order_by('date', 'id')[:limit])
+        now = timezone.now()
+        GenerationJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status='running', started_at=now
+        )
+    for job in jobs:
+        job.status = 'running'
+        job.started_at = now
+    return jobs
+
+
+def requeue_stale_jobs():
+    """Put jobs left running by a dead worker back in the queue"""
+    return get_job_model().objects.filter(
+        status='running', started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status='pending', next_attempt_at=timezone.now())
+
+
+def run_jobs(jobs, workers=4):
+    """Run claimed jobs with at most ``workers`` generating at once"""
+    batch_jobs = []
+    for name, kind in kinds.items():
+        if kind.batched:
+            batch_jobs += kind.run_batch([job for job in jobs if job.kind == name])
+    jobs = [job for job in jobs if not kinds[job.kind].batched]
+
+    generators = {}
+    lock = threading.Lock()
+
+    def get_generator(kind):
+        with lock:
+            if kind not in generators:
+                generators[kind] = import_string(GENERATORS[kind])()
+            return generators[kind]
+
+    def run(job):
+        try:
+            return run_job(job, get_generator)
+        finally:
+            # Each pool thread has its own connection
+            connection.close()
+
+    if workers <= 1 or len(jobs) <= 1:
+        return batch_jobs + [run_job(job, get_generator) for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return batch_jobs + list(pool.map(run, jobs))
+
+
+def process_pending_jobs(limit=10, workers=4):
+    """Claim and run due jobs. Returns how many were run."""
+    jobs = claim_jobs(limit)
+    run_jobs(jobs, workers)
+    return len(jobs)
+
+
+def generate_now(kind, dates, force=False, workers=4):
+    """
+    Queue jobs for ``dates`` and run them in this process. Jobs a worker has
+    already picked up are left to it; failures stay queued for retry.
+    Returns the jobs in date order.
+    """
+    jobs = enqueue_jobs(kind, dates, force=force)
+    ids = [job.pk for job in jobs]
+    run_jobs(claim_jobs(len(ids), ids=ids), workers)
+    return list(get_job_model().objects.filter(pk__in=ids).order_by('date'))
+
+
+def write_job_results(command, jobs):
+    """Report generate_now() results from a management command"""
+    succeeded = 0
+    for job in jobs:
+        if job.status == 'succeeded':
+            succeeded += 1
+            command.stdout.write(command.style.SUCCESS(f'Created {job.date}: {job.result}'))
+        elif job.status == 'skipped':
+            command.stdout.write(
+                command.style.WARNING(f'{job.date}: {job.result}. Use --force to regenerate.')
+            )
+        elif job.status == 'running':
+            command.stdout.write(f'{job.date}: already being generated by a worker')
+        else:
+            command.stdout.write(
+                command.style.ERROR(
+                    f'Error generating {job.date}: {job.last_error}'
+                    + (' (queued for retry)' if job.status == 'pending' else '')
+                )
+            )
+
+    command.stdout.write(
+        command.style.SUCCESS(f'\nDone! Generated {succeeded} of {len(jobs)} day(s)')
+    )
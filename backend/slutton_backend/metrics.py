@@ -0,0 +1,34 @@
+"""
+Shared in-process metrics
+"""
+import bisect
+import threading
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram; counts are per bucket (milliseconds)"""
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self._sum_ms = 0.0
+        self._errors = 0
+
+    def observe(self, seconds, error=False):
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self._sum_ms += ms
+            if error:
+                self._errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f'le_{bucket}ms' for bucket in self.BUCKETS_MS] + ['le_inf']
+            return {
+                'buckets': dict(zip(labels, self._counts)),
+                'count': sum(self._counts),
+                'errors': self._errors,
+                'sum_ms': round(self._sum_ms, 3),
+            }
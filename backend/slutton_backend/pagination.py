@@ -0,0 +1,80 @@
+"""
+Shared pagination classes
+"""
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination: seeks on the ordering column instead of OFFSET and
+    runs no COUNT(*), so deep pages cost the same as the first one.
+    The ordering comes from the view's OrderingFilter (or ``ordering``).
+    """
+    ordering = '-created_at'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        """
+        The requested ordering plus ``id`` (in the same direction, so the
+        seek can use an index ending in id). CursorPagination needs a unique
+        ordering; rows that tie on price or name would otherwise be
+        skipped or repeated across pages.
+        """
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+
+class OptionalCursorPagination(BasePagination):
+    """
+    Page-number pagination by default. Clients opt in to keyset pagination
+    with ``?pagination=cursor`` (first page) and then follow the ``next`` /
+    ``previous`` links, which carry a ``cursor`` parameter.
+
+    A view can refuse cursors for some requests (e.g. ranked search results,
+    which have no column to seek on) with ``allows_cursor_pagination(request)``;
+    those requests are paged by number instead.
+    """
+    mode_query_param = 'pagination'
+    page_number_class = PageNumberPagination
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = None
+
+    def get_paginator(self, request, view=None):
+        cursor_class = self.cursor_class
+        allows_cursor = getattr(view, 'allows_cursor_pagination', None)
+        if ((request.query_params.get(self.mode_query_param) == 'cursor'
+                or cursor_class.cursor_query_param in request.query_params)
+                and (allows_cursor is None or allows_cursor(request))):
+            return cursor_class()
+        return self.page_number_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return data['results']
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_class().get_schema_operation_parameters(view)
+            + self.cursor_class().get_schema_operation_parameters(view)
+        )
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
@@ -92,23 +92,46 @@ WSGI_APPLICATION = "slutton_backend.wsgi.application"
 ASGI_APPLICATION = "slutton_backend.asgi.application"
 
 # Channels configuration
-# Use in-memory channel layer for development (no Redis needed)
-# For production, switch to RedisChannelLayer
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
-    },
+# Without CHANNEL_REDIS_URLS the in-memory layer is used: groups only reach
+# sockets on the same process, so it is only suitable for a single
+# development server. CHANNEL_REDIS_URLS is a comma-separated list of Redis
+# URLs; with several, groups are sharded across them by a consistent hash of
+# the group name (see comments/groups.py).
+CHANNEL_REDIS_URLS = [url.strip() for url in os.getenv("CHANNEL_REDIS_URLS", "").split(",") if url.strip()]
+CHANNEL_REDIS_CONFIG = {
+    "prefix": "slutton",
+    # Messages queued per channel before further sends to it are dropped
+    "capacity": int(os.getenv("CHANNEL_LAYER_CAPACITY", 1000)),
+    # Seconds an undelivered message is kept; older comments are stale
+    "expiry": 30,
+    # Seconds a socket stays in a group; sockets open longer stop receiving
+    "group_expiry": 60 * 60 * 24,
 }
+if CHANNEL_REDIS_URLS:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": CHANNEL_REDIS_URLS, **CHANNEL_REDIS_CONFIG},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        },
+    }
 
-# Production Redis configuration (uncomment when Redis is available):
-# CHANNEL_LAYERS = {
-#     "default": {
-#         "BACKEND": "channels_redis.core.RedisChannelLayer",
-#         "CONFIG": {
-#             "hosts": [("127.0.0.1", 6379)],
-#         },
-#     },
-# }
+# Live comment fan-out (see comments/consumers.py)
+COMMENT_BROADCAST_WINDOW = 0.05  # seconds over which updates are coalesced
+COMMENT_BROADCAST_MAX_PENDING = 100  # queued updates before a socket must resync
+# WebSocket handshake user cache (see comments/middleware.py)
+WEBSOCKET_USER_CACHE_TTL = 60  # seconds
+WEBSOCKET_USER_CACHE_SIZE = 10000
+# Sampled WebSocket handshake logging: one in N allowed / rejected is logged
+WEBSOCKET_ALLOWED_LOG_SAMPLE = 100
+WEBSOCKET_REJECTED_LOG_SAMPLE = 10
+# Threads (and so database connections) for live comment writes, per process
+COMMENT_DB_WORKERS = 8
 
 
 # Database
@@ -122,6 +145,45 @@ DATABASES = {
 }
 
 
+# Cache
+# Local-memory cache for development; production uses Redis when available
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+# Catalog API response cache (see products/cache.py)
+CATALOG_CACHE_TIMEOUT = 60 * 15  # seconds
+CATALOG_LOCAL_CACHE_SIZE = 256  # entries in the in-process LRU tier
+
+# Product search (see products/search.py). When unset, Postgres full-text
+# search is used on PostgreSQL and an in-process index everywhere else.
+# PRODUCT_SEARCH_BACKEND = "products.search.PostgresSearchBackend"
+
+# Daily trivia leaderboard (see trivia/leaderboard.py). The in-memory engine
+# is per-process and only suitable for a single development server.
+TRIVIA_LEADERBOARD_BACKEND = "trivia.leaderboard.InMemoryLeaderboard"
+TRIVIA_LEADERBOARD_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Cached "today's trivia" payload (see trivia/cache.py)
+TRIVIA_CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+
+# Queued trivia / memory image generation (see slutton_backend/jobs.py)
+GENERATION_JOB_MAX_ATTEMPTS = 5
+GENERATION_JOB_RETRY_BASE_SECONDS = 30
+GENERATION_JOB_MODEL = "trivia.GenerationJob"
+
+# On-disk cache of Claude replies (see slutton_backend/claude_cache.py)
+CLAUDE_CACHE_DIR = BASE_DIR / ".claude_cache"
+CLAUDE_CACHE_TTL = 60 * 60  # seconds
+CLAUDE_CACHE_MAX_ENTRIES = 200
+# Stream Claude trivia replies, saving each question as it is completed
+CLAUDE_TRIVIA_STREAMING = True
+
+# Pickled index over trivia/question_pool.py (see trivia/pool_index.py)
+QUESTION_POOL_INDEX_PATH = BASE_DIR / ".question_pool_index.pickle"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -205,6 +267,14 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY", "")
 
+# Payment gateway (see orders/payments.py). Use
+# "orders.payments.FakePaymentGateway" to load-test checkout offline.
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "orders.payments.StripePaymentGateway")
+STRIPE_TIMEOUT_SECONDS = 10
+STRIPE_MAX_NETWORK_RETRIES = 2
+PAYMENT_CIRCUIT_FAILURE_THRESHOLD = 5
+PAYMENT_CIRCUIT_RESET_SECONDS = 30
+
 # Media Files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -93,16 +93,28 @@ X_FRAME_OPTIONS = 'DENY'
 # HTTPS
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
-# Channels (WebSockets)
+# Channels (WebSockets). Every Daphne replica must share the layer, or
+# comments only reach sockets on the replica that received them
+CHANNEL_REDIS_URLS = CHANNEL_REDIS_URLS or [os.environ.get('REDIS_URL', 'redis://localhost:6379')]
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {
-            "hosts": [os.environ.get('REDIS_URL', 'redis://localhost:6379')],
-        },
+        "CONFIG": {"hosts": CHANNEL_REDIS_URLS, **CHANNEL_REDIS_CONFIG},
     },
 }
 
+# Shared cache (catalog response cache version must be visible to all workers)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get('REDIS_URL'),
+        },
+    }
+    # Leaderboard ranks must agree across workers
+    TRIVIA_LEADERBOARD_BACKEND = "trivia.leaderboard.RedisLeaderboard"
+    TRIVIA_LEADERBOARD_REDIS_URL = os.environ.get('REDIS_URL')
+
 # Stripe Configuration (ensure they're loaded in production)
 STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', '')
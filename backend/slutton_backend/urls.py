@@ -6,6 +6,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from comments import views as comment_views
 
 def health_check(request):
     """Health check endpoint for Railway"""
@@ -22,6 +23,7 @@ urlpatterns = [
     path('api/orders/', include('orders.urls')),
     path('api/products/<slug:product_slug>/ratings/', include('ratings.urls')),
     path('api/products/<slug:product_slug>/comments/', include('comments.urls')),
+    path('api/websocket/metrics/', comment_views.websocket_metrics, name='websocket-metrics'),
     path('api/games/', include('games.urls')),
     path('api/trivia/', include('trivia.urls')),
 ]
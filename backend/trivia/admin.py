@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.db import transaction
 from django.utils.html import format_html
-from .models import DailyTrivia, TriviaQuestion, TriviaGameSession, TriviaAnswer, UserTriviaStats
+from .cache import bump_trivia_version
+from .leaderboard import get_leaderboard
+from .materialize import build_questions, check_question_count
+from .models import DailyTrivia, TriviaQuestion, TriviaGameSession, TriviaAnswer, UserTriviaStats, GenerationJob
 
 
 class TriviaQuestionInline(admin.TabularInline):
@@ -51,38 +55,27 @@ class DailyTriviaAdmin(admin.ModelAdmin):
                 )
                 continue
 
-            # Delete existing questions
-            trivia.questions.all().delete()
-
-            # Try to generate new questions with Claude
+            # Try to generate new questions with Claude, skipping cached replies
             try:
                 from .claude_service import ClaudeTriviaGenerator
                 generator = ClaudeTriviaGenerator()
-                trivia_data = generator.generate_daily_trivia(trivia.date)
-
-                # Update theme and description
-                trivia.theme = trivia_data['theme']
-                trivia.description = trivia_data['description']
-                trivia.save()
-
-                # Create new questions
-                for q_data in trivia_data['questions']:
-                    generator.validate_question_structure(q_data)
-
-                    options_json = None
-                    if q_data['question_type'] == 'multiple_choice':
-                        options_json = q_data['options']
-
-                    TriviaQuestion.objects.create(
-                        daily_trivia=trivia,
-                        order=q_data['order'],
-                        question_text=q_data['question_text'],
-                        question_type=q_data['question_type'],
-                        difficulty=q_data['difficulty'],
-                        options=options_json,
-                        correct_answer=q_data['correct_answer'],
-                        explanation=q_data['explanation']
-                    )
+                trivia_data = generator.generate_daily_trivia(trivia.date, use_cache=False)
+                check_question_count(trivia_data['questions'])
+                questions = build_questions(
+                    trivia, trivia_data['questions'], validate=generator.validate_question_structure
+                )
+
+                with transaction.atomic():
+                    # Update theme and description
+                    trivia.theme = trivia_data['theme']
+                    trivia.description = trivia_data['description']
+                    trivia.save()
+
+                    # Replace the questions
+                    trivia.questions.all().delete()
+                    TriviaQuestion.objects.bulk_create(questions)
+
+                bump_trivia_version()
 
                 self.message_user(
                     request,
@@ -93,7 +86,7 @@ class DailyTriviaAdmin(admin.ModelAdmin):
             except Exception as e:
                 self.message_user(
                     request,
-                    f"❌ Error regenerating {trivia.date} with Claude: {str(e)}. Questions were deleted but not replaced!",
+                    f"❌ Error regenerating {trivia.date} with Claude: {str(e)}. The existing questions were kept.",
                     level=messages.ERROR
                 )
 
@@ -120,6 +113,7 @@ class DailyTriviaAdmin(admin.ModelAdmin):
 
             # Delete all sessions
             sessions.delete()
+            get_leaderboard().clear(trivia.date)
             total_sessions += session_count
 
             self.message_user(
@@ -156,6 +150,7 @@ class TriviaGameSessionAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
     readonly_fields = ['started_at', 'completed_at', 'final_score']
     date_hierarchy = 'started_at'
+    ordering = ['-final_score', 'time_taken_seconds']
 
 
 @admin.register(TriviaAnswer)
@@ -173,3 +168,10 @@ class UserTriviaStatsAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
     readonly_fields = ['updated_at']
     ordering = ['-available_points']
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'date', 'status', 'attempts', 'result', 'next_attempt_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['attempts', 'last_error', 'result', 'created_at', 'started_at', 'finished_at']
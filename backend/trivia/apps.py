@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TriviaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "trivia"
+
+    def ready(self):
+        from slutton_backend.jobs import register_kind
+        from . import signals  # noqa: F401
+        from .jobs import PoolJobKind, TriviaJobKind
+
+        register_kind('trivia', TriviaJobKind())
+        register_kind('trivia_pool', PoolJobKind())
@@ -0,0 +1,116 @@
+"""
+Cached "today's trivia" payload and answer keys
+
+The serialized question set for a date, and the answer key used to mark
+submitted answers, are built once and stored in an in-process LRU and the
+shared Django cache. Keys embed a trivia version that
+is bumped whenever a DailyTrivia or TriviaQuestion changes (see
+trivia.signals) and by the regenerate/reset paths, so stale payloads are
+never read again.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from products.cache import LRUCache
+from .models import DailyTrivia, TriviaQuestion
+from .serializers import DailyTriviaSerializer
+
+TRIVIA_VERSION_KEY = 'trivia:version'
+TRIVIA_CACHE_TIMEOUT = getattr(settings, 'TRIVIA_CACHE_TIMEOUT', 60 * 60 * 24)
+# Days without an active trivia are cached briefly so the rollover rush
+# before generation finishes does not all reach the database
+TRIVIA_MISSING_CACHE_TIMEOUT = 30
+MISSING = 'missing'
+
+local_cache = LRUCache(16)
+
+
+def get_trivia_version():
+    """Current trivia version (stored in the shared cache)"""
+    version = cache.get(TRIVIA_VERSION_KEY)
+    if version is None:
+        cache.add(TRIVIA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(TRIVIA_VERSION_KEY)
+    return version
+
+
+def _incr_trivia_version():
+    try:
+        cache.incr(TRIVIA_VERSION_KEY)
+    except ValueError:
+        cache.add(TRIVIA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_trivia_version(**kwargs):
+    """
+    Invalidate every cached trivia payload once the current transaction
+    commits (at once outside a transaction), like
+    products.cache.bump_catalog_version. Usable as a signal receiver.
+    """
+    transaction.on_commit(_incr_trivia_version)
+
+
+def _get_or_build(key, build):
+    value = local_cache.get(key)
+    if value is None:
+        value = cache.get(key)
+        if value is None:
+            value = build()
+            cache.set(
+                key,
+                value,
+                TRIVIA_CACHE_TIMEOUT if value != MISSING else TRIVIA_MISSING_CACHE_TIMEOUT
+            )
+        # The local LRU has no TTL, so a missing day is only cached in the
+        # shared cache, where it expires once another process creates it
+        if value != MISSING:
+            local_cache.set(key, value)
+    return value
+
+
+def get_daily_trivia_payload(day):
+    """Serialized active DailyTrivia for ``day``, or None if there is none"""
+    payload = _get_or_build(
+        f'trivia:v{get_trivia_version()}:day:{day.isoformat()}',
+        lambda: build_daily_trivia_payload(day)
+    )
+    return None if payload == MISSING else payload
+
+
+def get_answer_key(daily_trivia_id):
+    """
+    ``{question_id: {...}}`` for every question of a DailyTrivia, with the
+    normalized correct answer, points and explanation
+    """
+    return _get_or_build(
+        f'trivia:v{get_trivia_version()}:answers:{daily_trivia_id}',
+        lambda: build_answer_key(daily_trivia_id)
+    )
+
+
+def build_daily_trivia_payload(day):
+    try:
+        daily_trivia = DailyTrivia.objects.prefetch_related('questions').get(
+            date=day,
+            is_active=True
+        )
+    except DailyTrivia.DoesNotExist:
+        return MISSING
+    return DailyTriviaSerializer(daily_trivia).data
+
+
+def build_answer_key(daily_trivia_id):
+    return {
+        question.id: {
+            'correct_answer': question.correct_answer,
+            'normalized_answer': normalize_answer(question.correct_answer),
+            'explanation': question.explanation,
+            'max_points': question.max_points,
+        }
+        for question in TriviaQuestion.objects.filter(daily_trivia_id=daily_trivia_id)
+    }
+
+
+def normalize_answer(answer):
+    return answer.strip().lower()
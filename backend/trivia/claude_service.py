@@ -5,20 +5,34 @@ import anthropic
 import os
 import json
 from datetime import date
+from slutton_backend.claude_cache import cached_completion, completion_key, response_cache
+from .claude_stream import TriviaStreamParser
+from .duplicates import existing_hashes, question_hash, replace_duplicate_questions
 
 
 class ClaudeTriviaGenerator:
     """Generate daily trivia questions using Claude AI"""
+    QUESTION_COUNT = 15
+    # Follow-up requests for questions that were malformed or duplicates
+    MAX_FOLLOW_UPS = 2
+    MODEL_PARAMS = {
+        'model': "claude-sonnet-4-5-20250929",
+        'max_tokens': 8000,
+        'temperature': 1.0,  # More creative
+    }
 
     def __init__(self):
         self.client = anthropic.Anthropic(
             api_key=os.environ.get('ANTHROPIC_API_KEY')
         )
 
-    def generate_daily_trivia(self, trivia_date=None):
+    def generate_daily_trivia(self, trivia_date=None, use_cache=True):
         """
         Generate 15 witty, sexy, sensual, challenging adult trivia questions
 
+        A reply cached for the same prompt and date is reused unless
+        ``use_cache`` is False (see slutton_backend.claude_cache).
+
         Returns:
             dict: {
                 'theme': str,
@@ -29,7 +43,37 @@ class ClaudeTriviaGenerator:
         if trivia_date is None:
             trivia_date = date.today()
 
-        prompt = f"""You are creating a daily adult trivia game for "Louis Slutton" - a sophisticated, upscale adult products e-commerce platform.
+        prompt = self.build_prompt(trivia_date)
+
+        try:
+            trivia_data = cached_completion(
+                self.client,
+                prompt,
+                trivia_date,
+                self.parse_response,
+                use_cache=use_cache,
+                **self.MODEL_PARAMS
+            )
+
+            # Swap out questions already used on other days
+            trivia_data['questions'] = replace_duplicate_questions(
+                trivia_data['questions'], trivia_date
+            )
+
+            return trivia_data
+
+        except anthropic.RateLimitError:
+            # Left unwrapped so callers can back off (see slutton_backend.jobs)
+            raise
+        except anthropic.APIError as e:
+            raise Exception(f"Claude API error: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON response from Claude: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error generating trivia: {str(e)}")
+
+    def build_prompt(self, trivia_date):
+        return f"""You are creating a daily adult trivia game for "Louis Slutton" - a sophisticated, upscale adult products e-commerce platform.
 
 Generate exactly 15 trivia questions for {trivia_date.strftime('%B %d, %Y')}.
 
@@ -66,44 +110,157 @@ Make each question captivating and worth pondering. This should keep users excit
 
 Return ONLY valid JSON, no other text."""
 
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=8000,
-                temperature=1.0,  # More creative
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+    def build_follow_up_prompt(self, trivia_date, theme, count, existing_questions):
+        """Ask for ``count`` more questions for a day that already has some"""
+        existing = '\n'.join(f"- {text}" for text in existing_questions)
+        return f"""You are adding questions to a daily adult trivia game for "Louis Slutton" - a sophisticated, upscale adult products e-commerce platform.
+
+Today's theme ({trivia_date.strftime('%B %d, %Y')}) is "{theme}". Generate exactly {count} more trivia questions in the same witty, sensual, sophisticated style.
+
+Do NOT repeat or closely paraphrase any of these existing questions:
+{existing}
+
+RESPONSE FORMAT (valid JSON only):
+{{
+  "questions": [
+    {{
+      "question_text": "The question itself",
+      "question_type": "multiple_choice" or "true_false",
+      "difficulty": "easy" or "medium" or "hard",
+      "options": {{"A": "option1", "B": "option2", "C": "option3", "D": "option4"}} (for multiple choice only),
+      "correct_answer": "A" (or "B", "C", "D" for multiple choice) or "True"/"False" (for true/false),
+      "explanation": "Fascinating explanation of the answer with historical/scientific context",
+      "max_points": 10 (easy), 15 (medium), or 20 (hard),
+      "order": 1-{count}
+    }}
+  ]
+}}
 
-            # Extract JSON from response
-            response_text = message.content[0].text.strip()
+Return ONLY valid JSON, no other text."""
 
-            # Remove markdown code blocks if present
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1])
+    def stream_daily_trivia(self, trivia_date=None, theme=None, existing_questions=(), use_cache=True):
+        """
+        Stream a day's trivia, yielding events as the reply is generated:
 
-            # Parse JSON
-            trivia_data = json.loads(response_text)
+            ('header', theme, description)   once, unless ``theme`` is given
+            ('question', question)           each valid, non-duplicate question
 
-            # Validate structure
-            if not all(key in trivia_data for key in ['theme', 'description', 'questions']):
-                raise ValueError("Missing required keys in Claude response")
+        Each question is checked with validate_question_structure and against
+        existing questions as soon as it is complete. Malformed questions and
+        duplicates are dropped, and only the missing count is requested again
+        (up to MAX_FOLLOW_UPS times). Resuming a partly generated day is done
+        by passing its ``theme`` and ``existing_questions`` texts.
+        """
+        if trivia_date is None:
+            trivia_date = date.today()
 
-            if len(trivia_data['questions']) != 15:
-                raise ValueError(f"Expected 15 questions, got {len(trivia_data['questions'])}")
+        prompt = self.build_prompt(trivia_date)
+        cache_key = completion_key(prompt, trivia_date, **self.MODEL_PARAMS)
+        accepted = []
+        seen = {question_hash(text) for text in existing_questions}
+        missing = self.QUESTION_COUNT - len(existing_questions)
+        description = ''
 
-            return trivia_data
+        def accept(question):
+            question['order'] = len(existing_questions) + len(accepted) + 1
+            try:
+                self.validate_question_structure(question)
+                text_hash = question_hash(question['question_text'])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return False
+            if text_hash in seen or existing_hashes([text_hash], exclude_date=trivia_date):
+                return False
+            seen.add(text_hash)
+            accepted.append(question)
+            return True
 
+        try:
+            trivia_data = None
+            cached = response_cache.get(cache_key) if use_cache and theme is None else None
+            if cached is not None:
+                try:
+                    trivia_data = self.parse_response(cached)
+                except ValueError:
+                    trivia_data = None
+
+            if trivia_data is not None:
+                theme, description = trivia_data['theme'], trivia_data['description']
+                yield ('header', theme, description)
+                for question in trivia_data['questions']:
+                    if len(accepted) < missing and accept(question):
+                        yield ('question', question)
+            elif theme is None:
+                parser = TriviaStreamParser()
+                header_sent = False
+                for event in self._stream(prompt, parser):
+                    if not header_sent and all(field in parser.fields for field in ('theme', 'description')):
+                        theme, description = parser.fields['theme'], parser.fields['description']
+                        header_sent = True
+                        yield ('header', theme, description)
+                    if header_sent and event[0] == 'question' and len(accepted) < missing and accept(event[1]):
+                        yield ('question', event[1])
+                if not header_sent:
+                    raise ValueError("Missing theme or description in Claude response")
+
+            for _ in range(self.MAX_FOLLOW_UPS):
+                if len(accepted) >= missing:
+                    break
+                follow_up = self.build_follow_up_prompt(
+                    trivia_date,
+                    theme,
+                    missing - len(accepted),
+                    list(existing_questions) + [q['question_text'] for q in accepted]
+                )
+                for event in self._stream(follow_up, TriviaStreamParser()):
+                    if event[0] == 'question' and len(accepted) < missing and accept(event[1]):
+                        yield ('question', event[1])
+
+            if not existing_questions and len(accepted) == self.QUESTION_COUNT:
+                # A complete day replays like a normal cached reply
+                response_cache.set(cache_key, json.dumps({
+                    'theme': theme,
+                    'description': description,
+                    'questions': accepted,
+                }))
+
+        except anthropic.RateLimitError:
+            # Left unwrapped so callers can back off (see slutton_backend.jobs)
+            raise
         except anthropic.APIError as e:
             raise Exception(f"Claude API error: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise Exception(f"Invalid JSON response from Claude: {str(e)}")
         except Exception as e:
             raise Exception(f"Error generating trivia: {str(e)}")
 
+    def _stream(self, prompt, parser):
+        """Events from ``parser`` as a streamed reply to ``prompt`` arrives"""
+        with self.client.messages.stream(
+            messages=[{"role": "user", "content": prompt}],
+            **self.MODEL_PARAMS
+        ) as stream:
+            for text in stream.text_stream:
+                yield from parser.feed(text)
+
+    def parse_response(self, response_text):
+        """Parse and validate a Claude reply; raises ValueError"""
+        response_text = response_text.strip()
+
+        # Remove markdown code blocks if present
+        if response_text.startswith('```'):
+            lines = response_text.split('\n')
+            response_text = '\n'.join(lines[1:-1])
+
+        # Parse JSON
+        trivia_data = json.loads(response_text)
+
+        # Validate structure
+        if not all(key in trivia_data for key in ['theme', 'description', 'questions']):
+            raise ValueError("Missing required keys in Claude response")
+
+        if len(trivia_data['questions']) != 15:
+            raise ValueError(f"Expected 15 questions, got {len(trivia_data['questions'])}")
+
+        return trivia_data
+
     def validate_question_structure(self, question):
         """Validate a question has all required fields"""
         required_fields = [
@@ -0,0 +1,95 @@
+"""
+Incremental parser for streamed Claude trivia replies
+
+Claude replies with one JSON object:
+
+    {"theme": "...", "description": "...", "questions": [{...}, {...}, ...]}
+
+possibly wrapped in a markdown fence. TriviaStreamParser is fed text as it
+streams in and reports the theme, the description and each question object
+as soon as its closing brace arrives, so questions can be validated and
+saved while the rest of the reply is still being generated. A question that
+is not valid JSON is reported on its own instead of failing the whole reply.
+"""
+import json
+
+HEADER_FIELDS = ('theme', 'description')
+
+
+class TriviaStreamParser:
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.expect_key = False
+        self.last_key = None
+        self.in_questions = False
+        self.question_start = None
+        self.fields = {}
+
+    def feed(self, text):
+        """
+        Consume ``text``. Returns a list of events:
+        ('field', name, value), ('question', dict) and ('invalid', error)
+        """
+        self.buffer += text
+        events = []
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._top_level_string(events)
+            elif char == '"':
+                self.in_string = True
+                self.string_start = self.pos
+            elif char in '{[':
+                self.depth += 1
+                if char == '{' and self.depth == 1:
+                    self.expect_key = True
+                elif char == '[' and self.depth == 2 and self.last_key == 'questions':
+                    self.in_questions = True
+                elif char == '{' and self.depth == 3 and self.in_questions:
+                    self.question_start = self.pos
+            elif char in '}]':
+                if char == '}' and self.depth == 3 and self.question_start is not None:
+                    self._question(events)
+                elif char == ']' and self.depth == 2:
+                    self.in_questions = False
+                self.depth -= 1
+            elif self.depth == 1:
+                if char == ':':
+                    self.expect_key = False
+                elif char == ',':
+                    self.expect_key = True
+            self.pos += 1
+        return events
+
+    def _top_level_string(self, events):
+        value = json.loads(self.buffer[self.string_start:self.pos + 1])
+        if self.expect_key:
+            self.last_key = value
+        elif self.last_key in HEADER_FIELDS:
+            self.fields[self.last_key] = value
+            events.append(('field', self.last_key, value))
+
+    def _question(self, events):
+        text = self.buffer[self.question_start:self.pos + 1]
+        self.question_start = None
+        try:
+            question = json.loads(text)
+        except ValueError as e:
+            events.append(('invalid', str(e)))
+            return
+        if isinstance(question, dict):
+            events.append(('question', question))
+        else:
+            events.append(('invalid', 'Question is not an object'))
@@ -0,0 +1,72 @@
+"""
+Near-duplicate trivia question detection
+
+Question text is normalized (case, accents, punctuation, articles and
+whitespace removed) and hashed; TriviaQuestion.text_hash stores the hash so
+a whole generated day is checked against every existing question with one
+indexed IN query.
+"""
+import hashlib
+import re
+import unicodedata
+
+ARTICLES = {'a', 'an', 'the'}
+
+
+def normalize_question_text(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    return ' '.join(word for word in words if word not in ARTICLES)
+
+
+def question_hash(text):
+    return hashlib.sha1(normalize_question_text(text).encode()).hexdigest()
+
+
+def existing_hashes(hashes, exclude_date=None):
+    """The subset of ``hashes`` already used by a question (outside ``exclude_date``)"""
+    from .models import TriviaQuestion
+
+    questions = TriviaQuestion.objects.filter(text_hash__in=set(hashes))
+    if exclude_date is not None:
+        questions = questions.exclude(daily_trivia__date=exclude_date)
+    return set(questions.values_list('text_hash', flat=True))
+
+
+def replace_duplicate_questions(questions, trivia_date):
+    """
+    Replace questions that repeat an existing question (or each other) with
+    unused questions of the same difficulty from the question pool, rather
+    than paying for another Claude call. Duplicates with no replacement are
+    dropped; callers reject the short day before saving it (see
+    trivia.materialize.check_question_count). ``trivia_date``'s own
+    questions are ignored, since regenerating a day replaces them. Returns
+    the questions renumbered from 1.
+    """
+    from .pool_index import get_pool_index
+
+    index = get_pool_index()
+    pool = list(zip(index.hashes, index.questions))
+    hashes = [question_hash(q['question_text']) for q in questions]
+    used = existing_hashes(hashes + [h for h, _ in pool], exclude_date=trivia_date)
+
+    result = []
+    for text_hash, question in zip(hashes, questions):
+        if text_hash in used:
+            replacement = next(
+                (
+                    (h, q) for h, q in pool
+                    if h not in used and q['difficulty'] == question.get('difficulty')
+                ),
+                None
+            )
+            if replacement is None:
+                continue
+            text_hash, pool_question = replacement
+            question = {**pool_question, 'max_points': question.get('max_points')}
+        used.add(text_hash)
+        result.append(question)
+
+    for order, question in enumerate(result, 1):
+        question['order'] = order
+    return result
@@ -0,0 +1,196 @@
+"""
+Trivia game flow: recording answers and completing a session
+"""
+from datetime import date, timedelta
+from functools import partial
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .cache import get_answer_key, normalize_answer
+from .leaderboard import get_leaderboard
+from .models import TriviaAnswer, TriviaGameSession, UserTriviaStats
+
+PARTICIPATION_POINTS = 10
+PLACEMENT_POINTS = {
+    1: 100,  # 1st place
+    2: 50,   # 2nd place
+    3: 25,   # 3rd place
+}
+PLACEMENT_FIELDS = {
+    1: 'first_place_finishes',
+    2: 'second_place_finishes',
+    3: 'third_place_finishes',
+}
+
+
+class TriviaGameError(Exception):
+    """The request could not be applied; nothing was written"""
+
+
+def record_answers(session, answers):
+    """
+    Mark ``answers`` against the cached answer key, insert them in one
+    statement and add their points and correct count to the session.
+
+    Returns (results, current_score). Raises TriviaGameError.
+    """
+    if not isinstance(answers, list) or not answers:
+        raise TriviaGameError('Answers must be a non-empty list')
+
+    answer_key = get_answer_key(session.daily_trivia_id)
+    results = []
+    rows = []
+    seen = set()
+    for answer in answers:
+        if not isinstance(answer, dict):
+            raise TriviaGameError('Invalid answer')
+        question_id = answer.get('question_id')
+        user_answer = answer.get('answer')
+        try:
+            question_id = int(question_id)
+            key = answer_key[question_id]
+        except (TypeError, ValueError, KeyError):
+            raise TriviaGameError('Invalid session or question')
+        if not isinstance(user_answer, str):
+            raise TriviaGameError('Invalid answer')
+        if question_id in seen:
+            raise TriviaGameError('Question already answered')
+        seen.add(question_id)
+
+        try:
+            time_taken = TriviaGameSession.clamp_time(answer.get('time_taken_seconds') or 0)
+        except (TypeError, ValueError):
+            raise TriviaGameError('Invalid time taken')
+
+        is_correct = normalize_answer(user_answer) == key['normalized_answer']
+        points_earned = key['max_points'] if is_correct else 0
+        rows.append(TriviaAnswer(
+            session=session,
+            question_id=question_id,
+            user_answer=user_answer,
+            is_correct=is_correct,
+            points_earned=points_earned,
+            time_taken_seconds=time_taken
+        ))
+        results.append({
+            'question_id': question_id,
+            'is_correct': is_correct,
+            'points_earned': points_earned,
+            'correct_answer': key['correct_answer'],
+            'explanation': key['explanation']
+        })
+
+    try:
+        with transaction.atomic():
+            # The (session, question) unique constraint rejects answers
+            # that were already submitted
+            TriviaAnswer.objects.bulk_create(rows)
+            updated = TriviaGameSession.objects.filter(
+                pk=session.pk,
+                status='in_progress'
+            ).update(
+                score=F('score') + sum(row.points_earned for row in rows),
+                correct_answers=F('correct_answers') + sum(row.is_correct for row in rows)
+            )
+            if not updated:
+                raise TriviaGameError('Invalid session')
+    except IntegrityError:
+        raise TriviaGameError('Question already answered')
+
+    session.score, session.correct_answers = TriviaGameSession.objects.values_list(
+        'score', 'correct_answers'
+    ).get(pk=session.pk)
+    return results, session.score
+
+
+def complete_session(user, session_id, total_time, answers=None):
+    """
+    Complete ``user``'s in-progress session and award points.
+
+    Runs in one transaction:
+    - locks the session row, so a session is only completed once
+    - records ``answers`` (the whole game may be sent with the completion)
+    - stores the final score and ranks it against the leaderboard
+    - updates UserTriviaStats with a single UPDATE of F() increments
+
+    The score is added to the leaderboard only once the transaction
+    commits, so a rollback leaves no entry behind. Completions committing
+    at the same moment are ranked without each other.
+
+    Returns the completion summary. Raises TriviaGameError (and rolls back).
+    """
+    try:
+        total_time = TriviaGameSession.clamp_time(total_time or 0)
+    except (TypeError, ValueError):
+        raise TriviaGameError('Invalid total time')
+    today = date.today()
+
+    with transaction.atomic():
+        session = TriviaGameSession.objects.select_for_update(of=('self',)).select_related(
+            'daily_trivia'
+        ).filter(
+            id=session_id,
+            user=user,
+            status='in_progress'
+        ).first()
+        if session is None:
+            raise TriviaGameError('Invalid session')
+
+        if answers:
+            record_answers(session, answers)
+
+        session.status = 'completed'
+        session.time_taken_seconds = total_time
+        session.completed_at = timezone.now()
+        session.final_score = session.calculate_final_score()
+
+        # Ranked before the save, so a leaderboard rebuilt here only loads
+        # committed sessions
+        leaderboard = get_leaderboard()
+        rank = leaderboard.rank_for(session.daily_trivia.date, session.final_score, total_time)
+        session.save(update_fields=['status', 'time_taken_seconds', 'completed_at', 'final_score'])
+        transaction.on_commit(partial(
+            leaderboard.add,
+            session.daily_trivia.date,
+            session.user_id,
+            session.final_score,
+            total_time
+        ))
+
+        total_questions = len(get_answer_key(session.daily_trivia_id))
+        perfect_game = total_questions > 0 and session.correct_answers == total_questions
+        placement_points = PLACEMENT_POINTS.get(rank, 0)
+        total_bonus_points = placement_points + PARTICIPATION_POINTS
+
+        # Played yesterday: streak continues. Already played today: unchanged.
+        streak = Case(
+            When(last_played_date=today - timedelta(days=1), then=F('current_streak') + 1),
+            When(last_played_date=today, then=F('current_streak')),
+            default=1
+        )
+        increments = {
+            'total_games_played': F('total_games_played') + 1,
+            'perfect_games': F('perfect_games') + int(perfect_game),
+            'available_points': F('available_points') + total_bonus_points,
+            'total_points_earned': F('total_points_earned') + total_bonus_points,
+            'current_streak': streak,
+            'longest_streak': Greatest(F('longest_streak'), streak),
+            'last_played_date': today,
+            'updated_at': timezone.now(),
+        }
+        if rank in PLACEMENT_FIELDS:
+            field = PLACEMENT_FIELDS[rank]
+            increments[field] = F(field) + 1
+
+        UserTriviaStats.objects.get_or_create(user=user)
+        UserTriviaStats.objects.filter(user=user).update(**increments)
+
+    return {
+        'final_score': session.final_score,
+        'rank': rank,
+        'placement_points': placement_points,
+        'participation_points': PARTICIPATION_POINTS,
+        'total_bonus_points': total_bonus_points,
+        'perfect_game': perfect_game
+    }
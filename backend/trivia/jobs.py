@@ -0,0 +1,175 @@
+"""
+Daily trivia generation jobs (see slutton_backend/jobs.py for the queue)
+
+'trivia' jobs ask Claude for a day, streaming the reply and saving the
+questions as they arrive. trivia_pool jobs need no network and must not
+repeat each other's questions, so a claimed batch of them is sampled and
+written as one range (see run_pool_jobs) rather than a date per thread.
+"""
+import threading
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from slutton_backend.jobs import ContentExists, JobKind, record_outcome
+from .materialize import QUESTION_COUNT, check_question_count, fixed_source, materialize_days, pool_source
+from .models import DailyTrivia, TriviaQuestion
+from .pool_index import PoolSampler, get_pool_index, pool_usage
+
+# Stream Claude trivia replies and save questions as they arrive
+STREAM_TRIVIA = getattr(settings, 'CLAUDE_TRIVIA_STREAMING', True)
+
+# Pool batches in this process run one at a time, so each sees the last
+pool_lock = threading.Lock()
+
+
+class QuestionPoolTriviaGenerator:
+    """
+    Builds a day from the built-in question pool, in the same shape as
+    ClaudeTriviaGenerator. Needs no network, so it can stand in for Claude
+    (GENERATION_JOB_GENERATORS['trivia']) when running the queue offline.
+    """
+
+    def generate_daily_trivia(self, trivia_date, use_cache=True):
+        index = get_pool_index()
+        sampler = PoolSampler(index, seed=trivia_date.toordinal())
+        _, theme, questions = sampler.sample_days(
+            [trivia_date], used=pool_usage(index, [trivia_date], sampler.window)
+        )[0]
+        return {
+            'theme': theme,
+            'description': f"Test your knowledge with today's {theme.lower()} trivia questions",
+            'questions': questions,
+        }
+
+    def validate_question_structure(self, question):
+        return True
+
+
+def partial_trivia(day):
+    """An inactive day left short of questions by an interrupted stream, if any"""
+    return DailyTrivia.objects.filter(date=day, is_active=False).annotate(
+        question_count=Count('questions')
+    ).filter(question_count__lt=QUESTION_COUNT).first()
+
+
+def save_trivia(job, generator, trivia_data):
+    check_question_count(trivia_data['questions'])
+    for q_data in trivia_data['questions']:
+        generator.validate_question_structure(q_data)
+    created, _ = materialize_days(
+        [job.date],
+        fixed_source(trivia_data['theme'], trivia_data['description'], trivia_data['questions']),
+        force=job.force
+    )
+    if not created:
+        raise ContentExists()
+    return f"{trivia_data['theme']} ({len(trivia_data['questions'])} questions)"
+
+
+def save_trivia_stream(job, generator, use_cache=True):
+    """
+    Save questions one by one as Claude streams them. The day stays inactive
+    until it is complete; if the stream fails part way, the retry resumes it
+    and only asks for the missing questions.
+    """
+    daily_trivia = None if job.force else partial_trivia(job.date)
+    existing_questions = list(
+        daily_trivia.questions.values_list('question_text', flat=True)
+    ) if daily_trivia else []
+    question_count = len(existing_questions)
+
+    for event in generator.stream_daily_trivia(
+        job.date,
+        theme=daily_trivia.theme if daily_trivia else None,
+        existing_questions=existing_questions,
+        use_cache=use_cache
+    ):
+        if event[0] == 'header':
+            _, theme, description = event
+            with transaction.atomic():
+                if job.force:
+                    DailyTrivia.objects.filter(date=job.date).delete()
+                daily_trivia = DailyTrivia.objects.create(
+                    date=job.date,
+                    theme=theme,
+                    description=description,
+                    is_active=False
+                )
+        else:
+            q_data = event[1]
+            question_count += 1
+            TriviaQuestion.objects.create(
+                daily_trivia=daily_trivia,
+                order=question_count,
+                question_text=q_data['question_text'],
+                question_type=q_data['question_type'],
+                difficulty=q_data['difficulty'],
+                options=q_data['options'] if q_data['question_type'] == 'multiple_choice' else None,
+                correct_answer=q_data['correct_answer'],
+                explanation=q_data['explanation']
+            )
+
+    if question_count < QUESTION_COUNT:
+        raise ValueError(f'Only {question_count} of {QUESTION_COUNT} valid questions so far; will resume')
+
+    daily_trivia.is_active = True
+    daily_trivia.save(update_fields=['is_active'])
+    return f"{daily_trivia.theme} ({question_count} questions, streamed)"
+
+
+def run_pool_jobs(jobs):
+    """
+    Run claimed trivia_pool jobs as one range per force flag: the days are
+    sampled together, against the questions already stored around them,
+    and written in one transaction, so no two of them repeat within the
+    window however the jobs were queued.
+    """
+    if not jobs:
+        return jobs
+    with pool_lock:
+        for force in (False, True):
+            batch = [job for job in jobs if job.force == force]
+            if not batch:
+                continue
+            for job in batch:
+                job.attempts += 1
+            try:
+                created, _ = materialize_days([job.date for job in batch], pool_source(), force=force)
+            except Exception as e:
+                unexpected = None
+                for job in batch:
+                    try:
+                        record_outcome(job, error=e)
+                    except IntegrityError as raised:
+                        unexpected = raised
+                # Raised again once every job of the batch is recorded
+                if unexpected is not None:
+                    raise unexpected
+                continue
+            created = {daily_trivia.date: daily_trivia for daily_trivia in created}
+            for job in batch:
+                if job.date in created:
+                    record_outcome(job, result=f'{created[job.date].theme} ({QUESTION_COUNT} questions, from the pool)')
+                else:
+                    record_outcome(job, error=ContentExists())
+    return jobs
+
+
+class TriviaJobKind(JobKind):
+    def day_exists(self, day):
+        return DailyTrivia.objects.filter(date=day).exists()
+
+    def content_exists(self, day):
+        return self.day_exists(day) and partial_trivia(day) is None
+
+    def generate(self, job, generator, use_cache):
+        if STREAM_TRIVIA and hasattr(generator, 'stream_daily_trivia'):
+            return save_trivia_stream(job, generator, use_cache=use_cache)
+        return save_trivia(job, generator, generator.generate_daily_trivia(job.date, use_cache=use_cache))
+
+
+class PoolJobKind(TriviaJobKind):
+    batched = True
+
+    def run_batch(self, jobs):
+        return run_pool_jobs(jobs)
@@ -0,0 +1,310 @@
+"""
+Daily trivia leaderboard engine
+
+Completed sessions are kept in one sorted set per DailyTrivia.date, scored
+by a single composite number so that ordering by it is ordering by final
+score (desc) and then time taken (asc):
+
+    composite = final_score * TIME_SCALE + (TIME_SCALE - 1 - time_taken)
+
+Ranks are competition ranks ("1, 2, 2, 4"): a player's rank is one plus the
+number of players with a strictly better composite, so ties share a place.
+
+- RedisLeaderboard: Redis sorted sets (ZADD / ZCOUNT / ZREVRANK / ZREVRANGE),
+  O(log n) per lookup and shared by every worker.
+- InMemoryLeaderboard: a bisect-maintained sorted list per day for
+  development (single process only).
+
+Both are rebuilt from the database on first use of a day (e.g. after a Redis
+flush or a restart), and can be rebuilt explicitly with
+``python manage.py rebuild_trivia_leaderboard``.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+TIME_SCALE = 10 ** 6
+LEADERBOARD_TTL = getattr(settings, 'TRIVIA_LEADERBOARD_TTL', 60 * 60 * 24 * 8)
+REBUILD_BATCH_SIZE = 5000
+
+
+def encode_score(final_score, time_taken_seconds):
+    time_taken = min(max(int(time_taken_seconds), 0), TIME_SCALE - 1)
+    return int(final_score) * TIME_SCALE + (TIME_SCALE - 1 - time_taken)
+
+
+def decode_score(composite):
+    final_score, remainder = divmod(int(composite), TIME_SCALE)
+    return final_score, TIME_SCALE - 1 - remainder
+
+
+def rank_entries(members, first_rank, first_position):
+    """
+    Turn ``[(user_id, composite), ...]`` (best first, starting at 0-based
+    ``first_position``) into entry dicts with competition ranks.
+    """
+    entries = []
+    previous = None
+    rank = first_rank
+    for offset, (user_id, composite) in enumerate(members):
+        if previous is not None and composite != previous:
+            rank = first_position + offset + 1
+        previous = composite
+        final_score, time_taken = decode_score(composite)
+        entries.append({
+            'rank': rank,
+            'user_id': user_id,
+            'final_score': final_score,
+            'time_taken_seconds': time_taken,
+        })
+    return entries
+
+
+def completed_scores(day):
+    """(user_id, final_score, time_taken_seconds) for every completed session of ``day``"""
+    from .models import TriviaGameSession
+
+    sessions = TriviaGameSession.objects.filter(
+        daily_trivia__date=day,
+        status='completed'
+    ).order_by('-final_score', 'time_taken_seconds').values_list(
+        'user_id', 'final_score', 'time_taken_seconds'
+    )
+    return sessions.iterator(chunk_size=REBUILD_BATCH_SIZE)
+
+
+class Leaderboard:
+    """Interface shared by the Redis and in-memory engines"""
+
+    def add(self, day, user_id, final_score, time_taken_seconds):
+        """Record a completion; returns the player's rank"""
+        raise NotImplementedError
+
+    def rank(self, day, user_id):
+        """Competition rank of ``user_id``, or None if they have not completed ``day``"""
+        raise NotImplementedError
+
+    def rank_for(self, day, final_score, time_taken_seconds):
+        """Rank a completion with this score would get, without recording it"""
+        raise NotImplementedError
+
+    def top(self, day, limit):
+        raise NotImplementedError
+
+    def around(self, day, user_id, radius):
+        """Up to ``radius`` entries either side of ``user_id`` (empty if not ranked)"""
+        raise NotImplementedError
+
+    def count(self, day):
+        raise NotImplementedError
+
+    def rebuild(self, day):
+        """Reload ``day`` from the database; returns the number of entries"""
+        raise NotImplementedError
+
+    def clear(self, day):
+        raise NotImplementedError
+
+
+class InMemoryLeaderboard(Leaderboard):
+    """Per-process leaderboard for development; keeps the most recent days only"""
+    MAX_DAYS = 8
+
+    class Day:
+        def __init__(self):
+            self.scores = {}
+            # Sorted (-composite, user_id): best first
+            self.order = []
+
+        def add(self, user_id, composite):
+            old = self.scores.get(user_id)
+            if old is not None:
+                del self.order[bisect.bisect_left(self.order, (-old, user_id))]
+            self.scores[user_id] = composite
+            bisect.insort(self.order, (-composite, user_id))
+
+        def rank_of(self, composite):
+            return bisect.bisect_left(self.order, (-composite,)) + 1
+
+        def slice(self, start, stop):
+            members = [(user_id, -negated) for negated, user_id in self.order[start:stop]]
+            if not members:
+                return []
+            return rank_entries(members, self.rank_of(members[0][1]), start)
+
+    def __init__(self):
+        self._days = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _day(self, day):
+        board = self._days.get(day)
+        if board is None:
+            board = self._load(day)
+        self._days.move_to_end(day)
+        return board
+
+    def _load(self, day):
+        board = self.Day()
+        for user_id, final_score, time_taken in completed_scores(day):
+            board.add(user_id, encode_score(final_score, time_taken))
+        self._days[day] = board
+        while len(self._days) > self.MAX_DAYS:
+            self._days.popitem(last=False)
+        return board
+
+    def add(self, day, user_id, final_score, time_taken_seconds):
+        composite = encode_score(final_score, time_taken_seconds)
+        with self._lock:
+            board = self._day(day)
+            board.add(user_id, composite)
+            return board.rank_of(composite)
+
+    def rank(self, day, user_id):
+        with self._lock:
+            board = self._day(day)
+            composite = board.scores.get(user_id)
+            return None if composite is None else board.rank_of(composite)
+
+    def rank_for(self, day, final_score, time_taken_seconds):
+        with self._lock:
+            return self._day(day).rank_of(encode_score(final_score, time_taken_seconds))
+
+    def top(self, day, limit):
+        with self._lock:
+            return self._day(day).slice(0, limit)
+
+    def around(self, day, user_id, radius):
+        with self._lock:
+            board = self._day(day)
+            composite = board.scores.get(user_id)
+            if composite is None:
+                return []
+            position = bisect.bisect_left(board.order, (-composite, user_id))
+            return board.slice(max(0, position - radius), position + radius + 1)
+
+    def count(self, day):
+        with self._lock:
+            return len(self._day(day).scores)
+
+    def rebuild(self, day):
+        with self._lock:
+            self._days.pop(day, None)
+            return len(self._load(day).scores)
+
+    def clear(self, day):
+        with self._lock:
+            self._days.pop(day, None)
+
+
+class RedisLeaderboard(Leaderboard):
+    """
+    Sorted set ``trivia:leaderboard:<date>`` (member: user id) plus a
+    ``:ready`` marker set once the day has been loaded from the database.
+    """
+    KEY_PREFIX = 'trivia:leaderboard'
+
+    def __init__(self, url=None):
+        import redis
+
+        self.client = redis.Redis.from_url(
+            url or settings.TRIVIA_LEADERBOARD_REDIS_URL,
+            socket_timeout=getattr(settings, 'TRIVIA_LEADERBOARD_REDIS_TIMEOUT', 2),
+        )
+
+    def _key(self, day):
+        return f'{self.KEY_PREFIX}:{day.isoformat()}'
+
+    def _ensure(self, day):
+        if not self.client.exists(f'{self._key(day)}:ready'):
+            self.rebuild(day)
+
+    def _rank_of(self, key, composite):
+        return self.client.zcount(key, f'({composite}', '+inf') + 1
+
+    def _slice(self, key, start, stop):
+        members = [
+            (int(user_id), int(composite))
+            for user_id, composite in self.client.zrevrange(key, start, stop - 1, withscores=True)
+        ]
+        if not members:
+            return []
+        return rank_entries(members, self._rank_of(key, members[0][1]), start)
+
+    def add(self, day, user_id, final_score, time_taken_seconds):
+        self._ensure(day)
+        key = self._key(day)
+        composite = encode_score(final_score, time_taken_seconds)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(key, {user_id: composite})
+        pipe.expire(key, LEADERBOARD_TTL)
+        pipe.zcount(key, f'({composite}', '+inf')
+        return pipe.execute()[-1] + 1
+
+    def rank(self, day, user_id):
+        self._ensure(day)
+        key = self._key(day)
+        composite = self.client.zscore(key, user_id)
+        return None if composite is None else self._rank_of(key, int(composite))
+
+    def rank_for(self, day, final_score, time_taken_seconds):
+        self._ensure(day)
+        return self._rank_of(self._key(day), encode_score(final_score, time_taken_seconds))
+
+    def top(self, day, limit):
+        self._ensure(day)
+        return self._slice(self._key(day), 0, limit)
+
+    def around(self, day, user_id, radius):
+        self._ensure(day)
+        key = self._key(day)
+        position = self.client.zrevrank(key, user_id)
+        if position is None:
+            return []
+        return self._slice(key, max(0, position - radius), position + radius + 1)
+
+    def count(self, day):
+        self._ensure(day)
+        return self.client.zcard(self._key(day))
+
+    def rebuild(self, day):
+        """
+        ZADD every completed session. Scores are deterministic, so this is
+        idempotent and safe to run while completions are still coming in.
+        """
+        key = self._key(day)
+        total = 0
+        batch = {}
+        for user_id, final_score, time_taken in completed_scores(day):
+            batch[user_id] = encode_score(final_score, time_taken)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                self.client.zadd(key, batch)
+                total += len(batch)
+                batch = {}
+        if batch:
+            self.client.zadd(key, batch)
+            total += len(batch)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.expire(key, LEADERBOARD_TTL)
+        pipe.set(f'{key}:ready', 1, ex=LEADERBOARD_TTL)
+        pipe.execute()
+        return total
+
+    def clear(self, day):
+        key = self._key(day)
+        self.client.delete(key, f'{key}:ready')
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard():
+    """Process-wide leaderboard named by settings.TRIVIA_LEADERBOARD_BACKEND"""
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = import_string(settings.TRIVIA_LEADERBOARD_BACKEND)()
+    return _leaderboard
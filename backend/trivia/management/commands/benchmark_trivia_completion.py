@@ -0,0 +1,109 @@
+"""
+Management command to benchmark trivia completion under concurrent finishers
+Run: python manage.py benchmark_trivia_completion --players 500 --workers 16
+
+Players, sessions and a trivia day are created on a synthetic date far in
+the past and deleted afterwards (along with that day's leaderboard), so the
+command is safe to run against a development database.
+"""
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import connection
+from trivia.game import complete_session
+from trivia.leaderboard import get_leaderboard
+from trivia.models import DailyTrivia, TriviaGameSession, TriviaQuestion, UserTriviaStats
+from users.models import CustomUser
+
+BENCHMARK_DAY = date(1970, 1, 2)
+QUESTIONS = 15
+
+
+class Command(BaseCommand):
+    help = 'Benchmark p95 latency of trivia completion with concurrent finishers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--players',
+            type=int,
+            default=500,
+            help='Players finishing at once (default: 500)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Concurrent threads completing sessions (default: 16)',
+        )
+
+    def handle(self, *args, **options):
+        self.cleanup()
+        try:
+            sessions = self.create_sessions(options['players'])
+            questions = list(
+                TriviaQuestion.objects.filter(daily_trivia__date=BENCHMARK_DAY)
+                .values_list('id', 'correct_answer')
+            )
+            rng = random.Random(0)
+
+            def finish(session):
+                user, session_id = session
+                answers = [
+                    {
+                        'question_id': question_id,
+                        'answer': correct_answer if rng.random() < 0.7 else 'wrong',
+                        'time_taken_seconds': rng.randint(2, 20),
+                    }
+                    for question_id, correct_answer in questions
+                ]
+                try:
+                    start = time.perf_counter()
+                    complete_session(user, session_id, rng.randint(30, 300), answers=answers)
+                    return (time.perf_counter() - start) * 1000
+                finally:
+                    connection.close()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                timings = sorted(pool.map(finish, sessions))
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{len(timings)} completions with {options["workers"]} workers in {elapsed:.2f} s'
+                f' | mean {statistics.mean(timings):.2f} ms'
+                f', p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms'
+                f', max {timings[-1]:.2f} ms'
+            )
+        finally:
+            self.cleanup()
+
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    def create_sessions(self, players):
+        daily_trivia = DailyTrivia.objects.create(date=BENCHMARK_DAY, theme='Benchmark')
+        TriviaQuestion.objects.bulk_create([
+            TriviaQuestion(
+                daily_trivia=daily_trivia,
+                order=order,
+                question_text=f'Benchmark question {order}',
+                correct_answer='A',
+            )
+            for order in range(1, QUESTIONS + 1)
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'trivia-bench-{i}', email=f'trivia-bench-{i}@example.com')
+            for i in range(players)
+        ])
+        UserTriviaStats.objects.bulk_create([UserTriviaStats(user=user) for user in users])
+        sessions = TriviaGameSession.objects.bulk_create([
+            TriviaGameSession(user=user, daily_trivia=daily_trivia) for user in users
+        ])
+        return [(session.user, session.pk) for session in sessions]
+
+    def cleanup(self):
+        DailyTrivia.objects.filter(date=BENCHMARK_DAY).delete()
+        CustomUser.objects.filter(username__startswith='trivia-bench-').delete()
+        get_leaderboard().clear(BENCHMARK_DAY)
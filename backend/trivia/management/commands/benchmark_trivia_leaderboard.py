@@ -0,0 +1,103 @@
+"""
+Management command to load-test the trivia leaderboard at the daily reset
+Run: python manage.py benchmark_trivia_leaderboard --completions 5000 --workers 16
+
+Completions are recorded against a synthetic day far in the past that has no
+sessions, and that day is cleared afterwards, so the command is safe to run
+against a development database or a shared Redis.
+"""
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from django.core.management.base import BaseCommand
+from trivia.leaderboard import get_leaderboard
+
+BENCHMARK_DAY = date(1970, 1, 1)
+
+
+class Command(BaseCommand):
+    help = 'Load-test leaderboard completions, rank lookups and top-N reads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completions',
+            type=int,
+            default=5000,
+            help='Completions to record (default: 5000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Concurrent threads recording completions (default: 16)',
+        )
+
+    def handle(self, *args, **options):
+        board = get_leaderboard()
+        self.stdout.write(f'Leaderboard engine: {board.__class__.__name__}')
+        board.clear(BENCHMARK_DAY)
+
+        rng = random.Random(0)
+        players = [
+            (user_id, rng.randint(0, 350), rng.randint(20, 300))
+            for user_id in range(1, options['completions'] + 1)
+        ]
+
+        def complete(player):
+            user_id, final_score, time_taken = player
+            start = time.perf_counter()
+            board.add(BENCHMARK_DAY, user_id, final_score, time_taken)
+            board.top(BENCHMARK_DAY, 50)
+            return (time.perf_counter() - start) * 1000
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                timings = sorted(pool.map(complete, players))
+            elapsed = time.perf_counter() - start
+
+            lookups = []
+            for user_id, _, _ in rng.sample(players, min(500, len(players))):
+                lookup_start = time.perf_counter()
+                board.rank(BENCHMARK_DAY, user_id)
+                board.around(BENCHMARK_DAY, user_id, 5)
+                lookups.append((time.perf_counter() - lookup_start) * 1000)
+            lookups.sort()
+
+            self.check_ranks(board, players)
+        finally:
+            board.clear(BENCHMARK_DAY)
+
+        self.stdout.write(
+            f'{len(players)} completions in {elapsed:.2f} s '
+            f'({len(players) / elapsed * 60:,.0f}/min) | '
+            f'complete + top 50: mean {statistics.mean(timings):.2f} ms, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms'
+        )
+        self.stdout.write(
+            f'rank + around: mean {statistics.mean(lookups):.2f} ms, '
+            f'p95 {lookups[int(len(lookups) * 0.95) - 1]:.2f} ms'
+        )
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    def check_ranks(self, board, players):
+        """Compare engine ranks with ranks computed by sorting every player"""
+        ordered = sorted(players, key=lambda p: (-p[1], p[2]))
+        expected = {}
+        for position, (user_id, final_score, time_taken) in enumerate(ordered):
+            previous = ordered[position - 1] if position else None
+            if previous and previous[1:] == (final_score, time_taken):
+                expected[user_id] = expected[previous[0]]
+            else:
+                expected[user_id] = position + 1
+
+        if board.count(BENCHMARK_DAY) != len(players):
+            self.stdout.write(self.style.ERROR('Player count mismatch'))
+        mismatches = [
+            user_id for user_id, _, _ in players[:1000]
+            if board.rank(BENCHMARK_DAY, user_id) != expected[user_id]
+        ]
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{len(mismatches)} rank mismatches'))
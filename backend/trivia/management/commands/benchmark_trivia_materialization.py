@@ -0,0 +1,82 @@
+"""
+Management command to benchmark writing a year of trivia days
+Run: python manage.py benchmark_trivia_materialization --days 365
+
+Days are sampled from the question pool once and then written twice: with
+one objects.create per row, as the generation commands used to, and with
+trivia.materialize's bulk inserts. They go on synthetic dates far in the
+past that are deleted before and after each run, so the command is safe to
+run against a development database.
+"""
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from trivia.materialize import date_range, materialize_days
+from trivia.models import DailyTrivia, TriviaQuestion
+from trivia.pool_index import PoolSampler
+
+BENCHMARK_START = date(1971, 1, 1)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-row vs bulk creation of trivia days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Days to generate (default: 365)',
+        )
+
+    def handle(self, *args, **options):
+        dates = date_range(BENCHMARK_START, options['days'])
+        planned = [
+            {'date': day, 'theme': theme, 'description': 'Benchmark', 'questions': questions}
+            for day, theme, questions in PoolSampler(seed=0).sample_days(dates)
+        ]
+
+        def per_row():
+            for day in planned:
+                if DailyTrivia.objects.filter(date=day['date']).exists():
+                    continue
+                with transaction.atomic():
+                    daily_trivia = DailyTrivia.objects.create(
+                        date=day['date'], theme=day['theme'], description=day['description']
+                    )
+                    for q_data in day['questions']:
+                        TriviaQuestion.objects.create(
+                            daily_trivia=daily_trivia,
+                            order=q_data['order'],
+                            question_text=q_data['question_text'],
+                            question_type=q_data['question_type'],
+                            difficulty=q_data['difficulty'],
+                            options=q_data['options'],
+                            correct_answer=q_data['correct_answer'],
+                            explanation=q_data['explanation']
+                        )
+
+        def bulk():
+            materialize_days(dates, lambda wanted: planned)
+
+        try:
+            for name, write in [('objects.create per row', per_row), ('materialize_days', bulk)]:
+                self.cleanup(dates)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    write()
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{name:<24} {len(dates)} days, '
+                    f'{TriviaQuestion.objects.filter(daily_trivia__date__in=dates).count()} questions'
+                    f' | {elapsed:.2f} s, {len(queries)} queries'
+                )
+        finally:
+            self.cleanup(dates)
+
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
+
+    def cleanup(self, dates):
+        DailyTrivia.objects.filter(date__in=dates).delete()
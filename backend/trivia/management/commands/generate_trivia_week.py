@@ -1,11 +1,15 @@
 """
 Management command to generate trivia for the next 7 days
 Run: python manage.py generate_trivia_week
+
+Days are drawn from the question pool index (see trivia.pool_index) with a
+5/5/5 easy/medium/hard mix and no repeats within --window days, and written
+in bulk by trivia.materialize, so --days 365 is cheap.
 """
 from django.core.management.base import BaseCommand
-from datetime import date, timedelta
-from trivia.models import DailyTrivia, TriviaQuestion
-import random
+from datetime import date
+from trivia.materialize import date_range, materialize_days, pool_source
+from trivia.pool_index import DEFAULT_WINDOW
 
 
 class Command(BaseCommand):
@@ -18,68 +22,29 @@ class Command(BaseCommand):
             default=7,
             help='Number of days ahead to generate (default: 7)',
         )
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=DEFAULT_WINDOW,
+            help=f'Days within which no question repeats (default: {DEFAULT_WINDOW})',
+        )
 
     def handle(self, *args, **options):
-        days_ahead = options['days']
-
-        # Pool of themes
-        themes = [
-            "Sensual Knowledge",
-            "Lingerie Legends",
-            "Fashion & Desire",
-            "Intimate History",
-            "Seductive Science",
-            "Luxury & Lace",
-            "Passion & Style"
-        ]
-
-        # Base question templates (15 questions)
-        question_templates = self.get_question_templates()
+        try:
+            source = pool_source(window=options['window'])
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
 
-        created_count = 0
-        for day_offset in range(days_ahead):
-            trivia_date = date.today() + timedelta(days=day_offset)
+        created, skipped = materialize_days(date_range(date.today(), options['days']), source)
 
-            # Check if already exists
-            if DailyTrivia.objects.filter(date=trivia_date).exists():
-                self.stdout.write(f"Trivia already exists for {trivia_date}")
-                continue
-
-            # Create DailyTrivia with random theme
-            theme = random.choice(themes)
-            daily_trivia = DailyTrivia.objects.create(
-                date=trivia_date,
-                theme=theme,
-                description=f"Test your knowledge with today's {theme.lower()} trivia questions",
-                is_active=True
-            )
-
-            # Randomly select 15 questions from the pool
-            questions = random.sample(question_templates, 15)
-
-            # Create questions
-            for order, q_data in enumerate(questions, 1):
-                TriviaQuestion.objects.create(
-                    daily_trivia=daily_trivia,
-                    order=order,
-                    question_text=q_data["question_text"],
-                    question_type=q_data["question_type"],
-                    difficulty=q_data["difficulty"],
-                    options=q_data["options"],
-                    correct_answer=q_data["correct_answer"],
-                    explanation=q_data["explanation"]
-                )
-
-            created_count += 1
+        for trivia_date in skipped:
+            self.stdout.write(f"Trivia already exists for {trivia_date}")
+        for daily_trivia in created:
             self.stdout.write(
-                self.style.SUCCESS(f"Created trivia for {trivia_date}: {theme}")
+                self.style.SUCCESS(f"Created trivia for {daily_trivia.date}: {daily_trivia.theme}")
             )
 
         self.stdout.write(
-            self.style.SUCCESS(f"\nDone! Generated trivia for {created_count} day(s)")
+            self.style.SUCCESS(f"\nDone! Generated trivia for {len(created)} day(s)")
         )
-
-    def get_question_templates(self):
-        """Return pool of 100+ trivia questions"""
-        from trivia.question_pool import QUESTION_POOL
-        return QUESTION_POOL
@@ -0,0 +1,47 @@
+"""
+Background worker that runs queued trivia / memory image generation jobs
+Run: python manage.py process_generation_jobs --workers 4
+"""
+import time
+from django.core.management.base import BaseCommand
+from slutton_backend.jobs import process_pending_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued generation jobs (daily trivia and memory game images)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run due jobs once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls when idle (default: 5)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Dates generated concurrently (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
+
+            processed = process_pending_jobs(limit=workers * 2, workers=workers)
+            if processed:
+                self.stdout.write(f'Ran {processed} generation job(s)')
+
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
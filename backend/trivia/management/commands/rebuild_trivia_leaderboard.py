@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the daily trivia leaderboard from the database
+Run: python manage.py rebuild_trivia_leaderboard --date 2026-01-31
+"""
+from datetime import date
+from django.core.management.base import BaseCommand
+from trivia.leaderboard import get_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trivia leaderboard for a day from completed sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Date to rebuild (YYYY-MM-DD). Defaults to today.',
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                trivia_date = date.fromisoformat(options['date'])
+            except ValueError:
+                self.stdout.write(
+                    self.style.ERROR('Invalid date format. Use YYYY-MM-DD')
+                )
+                return
+        else:
+            trivia_date = date.today()
+
+        board = get_leaderboard()
+        count = board.rebuild(trivia_date)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {board.__class__.__name__} for {trivia_date}: {count} players'
+            )
+        )
@@ -2,10 +2,14 @@
 Management command to reset and regenerate trivia questions
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import date, timedelta
 from trivia.models import DailyTrivia, TriviaQuestion
 from trivia.claude_service import ClaudeTriviaGenerator
+from trivia.cache import bump_trivia_version
+from trivia.leaderboard import get_leaderboard
+from trivia.materialize import build_questions, check_question_count
 
 
 class Command(BaseCommand):
@@ -22,6 +26,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Force reset even if users have already played (deletes their sessions)',
         )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Always call Claude, even if a reply for this date is cached',
+        )
         parser.add_argument(
             '--keep-sessions',
             action='store_true',
@@ -82,6 +91,7 @@ class Command(BaseCommand):
 
             # Delete sessions
             trivia.sessions.all().delete()
+            get_leaderboard().clear(trivia.date)
 
             self.stdout.write(
                 self.style.SUCCESS(f'Deleted {session_count} sessions and {total_answers} answers')
@@ -96,43 +106,32 @@ class Command(BaseCommand):
                 )
             )
 
-        # Delete existing questions
-        question_count = trivia.questions.count()
-        trivia.questions.all().delete()
-        self.stdout.write(f'Deleted {question_count} existing questions')
-
         # Generate new questions with Claude
         self.stdout.write(f'Generating new questions with Claude AI...')
 
         try:
             generator = ClaudeTriviaGenerator()
-            trivia_data = generator.generate_daily_trivia(trivia_date)
-
-            # Update theme and description
-            trivia.theme = trivia_data['theme']
-            trivia.description = trivia_data['description']
-            trivia.save()
-
-            # Create questions
-            questions_created = 0
-            for q_data in trivia_data['questions']:
-                generator.validate_question_structure(q_data)
-
-                options_json = None
-                if q_data['question_type'] == 'multiple_choice':
-                    options_json = q_data['options']
-
-                TriviaQuestion.objects.create(
-                    daily_trivia=trivia,
-                    order=q_data['order'],
-                    question_text=q_data['question_text'],
-                    question_type=q_data['question_type'],
-                    difficulty=q_data['difficulty'],
-                    options=options_json,
-                    correct_answer=q_data['correct_answer'],
-                    explanation=q_data['explanation']
-                )
-                questions_created += 1
+            trivia_data = generator.generate_daily_trivia(trivia_date, use_cache=not options['no_cache'])
+            check_question_count(trivia_data['questions'])
+            questions = build_questions(
+                trivia, trivia_data['questions'], validate=generator.validate_question_structure
+            )
+
+            with transaction.atomic():
+                # Delete existing questions
+                question_count = trivia.questions.count()
+                trivia.questions.all().delete()
+
+                # Update theme and description
+                trivia.theme = trivia_data['theme']
+                trivia.description = trivia_data['description']
+                trivia.save()
+
+                # Create questions
+                questions_created = len(TriviaQuestion.objects.bulk_create(questions))
+            self.stdout.write(f'Deleted {question_count} existing questions')
+
+            bump_trivia_version()
 
             self.stdout.write(
                 self.style.SUCCESS(
@@ -147,7 +146,7 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(
                     f'\nError generating trivia: {str(e)}\n'
-                    f'   Questions were deleted but not replaced!\n'
+                    f'   The existing questions were kept.\n'
                     f'   You may need to manually create questions or fix the API key.'
                 )
             )
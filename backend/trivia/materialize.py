@@ -0,0 +1,180 @@
+"""
+Writing whole trivia days to the database
+
+materialize_days() is the one path the generation commands and scripts use
+to turn a date range and a question source into DailyTrivia and
+TriviaQuestion rows. Existing dates are fetched with a single query and
+each batch of days is written with one bulk insert per table inside its
+own transaction, so a year of pool trivia costs a handful of queries
+instead of several per question.
+
+A source is a callable taking the list of dates still to create and
+returning ``{'date', 'theme', 'description', 'questions'}`` dicts, where
+questions are in the shape ClaudeTriviaGenerator returns. pool_source(),
+existing_question_source() and fixed_source() cover the commands in this
+app.
+"""
+import random
+from datetime import timedelta
+from django.db import transaction
+from .cache import bump_trivia_version
+from .duplicates import question_hash
+from .models import DailyTrivia, TriviaQuestion
+
+QUESTION_COUNT = 15
+# A whole year (leap years included) is written in one transaction
+BATCH_DAYS = 366
+QUESTION_FIELDS = (
+    'question_text', 'question_type', 'difficulty', 'options', 'correct_answer', 'explanation'
+)
+
+
+def check_question_count(questions):
+    """
+    Raise ValueError unless there is a full day of questions. Duplicate
+    removal (see trivia.duplicates) can leave a generated day short.
+    """
+    if len(questions) < QUESTION_COUNT:
+        raise ValueError(f'Only {len(questions)} of {QUESTION_COUNT} questions were usable')
+
+
+def build_questions(daily_trivia, questions, validate=None):
+    """
+    Unsaved TriviaQuestion rows for ``daily_trivia``. bulk_create skips
+    TriviaQuestion.save(), so text_hash is set here.
+    """
+    rows = []
+    for order, q_data in enumerate(questions, 1):
+        if validate:
+            validate(q_data)
+        question_type = q_data.get('question_type', 'multiple_choice')
+        rows.append(TriviaQuestion(
+            daily_trivia=daily_trivia,
+            order=q_data.get('order', order),
+            question_text=q_data['question_text'],
+            question_type=question_type,
+            difficulty=q_data.get('difficulty', 'medium'),
+            options=q_data.get('options') if question_type == 'multiple_choice' else None,
+            correct_answer=q_data['correct_answer'],
+            explanation=q_data.get('explanation', ''),
+            text_hash=question_hash(q_data['question_text'])
+        ))
+    return rows
+
+
+def materialize_days(dates, source, force=False, is_active=True, batch_days=BATCH_DAYS):
+    """
+    Create trivia for each of ``dates`` from ``source``. Dates that already
+    have trivia are skipped, or replaced with ``force``.
+
+    Returns ``(created, skipped)``: the new DailyTrivia rows and the dates
+    left alone.
+    """
+    dates = sorted(set(dates))
+    existing = set(
+        DailyTrivia.objects.filter(date__in=dates).values_list('date', flat=True)
+    )
+    skipped = [] if force else sorted(existing)
+    wanted = dates if force else [day for day in dates if day not in existing]
+    if not wanted:
+        return [], skipped
+
+    planned = list(source(wanted))
+    created = []
+    for start in range(0, len(planned), batch_days):
+        batch = planned[start:start + batch_days]
+        with transaction.atomic():
+            if force:
+                DailyTrivia.objects.filter(
+                    date__in=[day['date'] for day in batch if day['date'] in existing]
+                ).delete()
+            days = DailyTrivia.objects.bulk_create([
+                DailyTrivia(
+                    date=day['date'],
+                    theme=day['theme'],
+                    description=day['description'],
+                    is_active=is_active
+                )
+                for day in batch
+            ])
+            TriviaQuestion.objects.bulk_create([
+                question
+                for daily_trivia, day in zip(days, batch)
+                for question in build_questions(daily_trivia, day['questions'])
+            ], batch_size=1000)
+            # bulk_create sends no signals
+            bump_trivia_version()
+        created.extend(days)
+    return created, skipped
+
+
+def pool_source(window=None, seed=None):
+    """
+    Days from the built-in question pool (see trivia.pool_index). Only the
+    dates still to create are sampled; the questions stored on days around
+    them count towards the repeat window.
+    """
+    from .pool_index import DEFAULT_WINDOW, PoolSampler, get_pool_index, pool_usage
+
+    index = get_pool_index()
+    sampler = PoolSampler(index, window=window or DEFAULT_WINDOW, seed=seed)
+
+    def source(dates):
+        sampled = sampler.sample_days(dates, used=pool_usage(index, dates, sampler.window))
+        return [
+            {
+                'date': day,
+                'theme': theme,
+                'description': f"Test your knowledge with today's {theme.lower()} trivia questions",
+                'questions': questions,
+            }
+            for day, theme, questions in sampled
+        ]
+
+    return source
+
+
+def existing_question_source(theme, description, seed=None):
+    """
+    Days of QUESTION_COUNT questions picked at random from the questions
+    already in the database, each distinct question counted once. Raises
+    ValueError when there are too few.
+    """
+    rng = random.Random(seed)
+
+    def source(dates):
+        questions = list({
+            row['text_hash'] or question_hash(row['question_text']): row
+            for row in TriviaQuestion.objects.values('text_hash', *QUESTION_FIELDS)
+        }.values())
+        if len(questions) < QUESTION_COUNT:
+            raise ValueError(
+                f'Not enough questions in database. Found {len(questions)}, need at least {QUESTION_COUNT}'
+            )
+        return [
+            {
+                'date': day,
+                'theme': theme,
+                'description': description,
+                'questions': rng.sample(questions, QUESTION_COUNT),
+            }
+            for day in dates
+        ]
+
+    return source
+
+
+def fixed_source(theme, description, questions):
+    """The same questions on every date"""
+
+    def source(dates):
+        return [
+            {'date': day, 'theme': theme, 'description': description, 'questions': questions}
+            for day in dates
+        ]
+
+    return source
+
+
+def date_range(start_date, days):
+    return [start_date + timedelta(days=offset) for offset in range(days)]
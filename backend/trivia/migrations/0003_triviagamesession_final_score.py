@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:25
+
+from django.db import migrations, models
+from django.db.models.functions import Greatest
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_final_scores(apps, schema_editor):
+    TriviaGameSession = apps.get_model("trivia", "TriviaGameSession")
+    completed = TriviaGameSession.objects.filter(status="completed").order_by()
+    last_pk = completed.aggregate(last=models.Max("pk"))["last"] or 0
+    # Same formula as TriviaGameSession.final_score_for
+    final_score = models.F("score") + Greatest(
+        models.Value(0), models.Value(50) - models.F("time_taken_seconds") / 6
+    )
+    for start in range(0, last_pk, BACKFILL_BATCH_SIZE):
+        completed.filter(
+            pk__gt=start, pk__lte=start + BACKFILL_BATCH_SIZE
+        ).update(final_score=final_score)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trivia", "0002_triviaquestion_options"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="triviagamesession",
+            options={},
+        ),
+        migrations.AddField(
+            model_name="triviagamesession",
+            name="final_score",
+            field=models.IntegerField(
+                default=0, help_text="Score plus time bonus, set on completion"
+            ),
+        ),
+        migrations.RunPython(backfill_final_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="triviagamesession",
+            index=models.Index(
+                fields=["daily_trivia", "status", "-final_score", "time_taken_seconds"],
+                name="trivia_session_leaderboard_idx",
+            ),
+        ),
+    ]
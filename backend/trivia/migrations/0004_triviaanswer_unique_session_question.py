@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+def remove_duplicate_answers(apps, schema_editor):
+    """Keep the first answer to each question before adding the constraint"""
+    TriviaAnswer = apps.get_model("trivia", "TriviaAnswer")
+    duplicates = (
+        TriviaAnswer.objects.order_by()
+        .values("session", "question")
+        .annotate(first=models.Min("pk"), total=models.Count("pk"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        TriviaAnswer.objects.filter(
+            session=duplicate["session"], question=duplicate["question"]
+        ).exclude(pk=duplicate["first"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trivia", "0003_triviagamesession_final_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_answers, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="triviaanswer",
+            unique_together={("session", "question")},
+        ),
+    ]
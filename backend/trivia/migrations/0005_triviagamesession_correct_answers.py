@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-17 16:55
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_correct_answers(apps, schema_editor):
+    TriviaGameSession = apps.get_model("trivia", "TriviaGameSession")
+    TriviaAnswer = apps.get_model("trivia", "TriviaAnswer")
+    correct = (
+        TriviaAnswer.objects.filter(session=models.OuterRef("pk"), is_correct=True)
+        .order_by()
+        .values("session")
+        .annotate(total=models.Count("id"))
+        .values("total")
+    )
+    TriviaGameSession.objects.update(
+        correct_answers=Coalesce(models.Subquery(correct), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trivia", "0004_triviaanswer_unique_session_question"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="triviagamesession",
+            name="correct_answers",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_correct_answers, migrations.RunPython.noop),
+    ]
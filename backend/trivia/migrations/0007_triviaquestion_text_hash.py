@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-17 17:20
+
+import hashlib
+import re
+import unicodedata
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def question_hash(text):
+    # Frozen copy of trivia.duplicates.question_hash
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    normalized = " ".join(word for word in words if word not in {"a", "an", "the"})
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def backfill_text_hashes(apps, schema_editor):
+    TriviaQuestion = apps.get_model("trivia", "TriviaQuestion")
+    batch = []
+    for question in TriviaQuestion.objects.only("id", "question_text").iterator(
+        chunk_size=BACKFILL_BATCH_SIZE
+    ):
+        question.text_hash = question_hash(question.question_text)
+        batch.append(question)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            TriviaQuestion.objects.bulk_update(batch, ["text_hash"])
+            batch = []
+    if batch:
+        TriviaQuestion.objects.bulk_update(batch, ["text_hash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("trivia", "0006_generationjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="triviaquestion",
+            name="text_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="Hash of the normalized question text, for duplicate detection",
+                max_length=40,
+            ),
+        ),
+        migrations.RunPython(backfill_text_hashes, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from users.models import CustomUser
 import random
+from .duplicates import question_hash
 
 
 class DailyTrivia(models.Model):
@@ -57,6 +58,8 @@ class TriviaQuestion(models.Model):
     points_hard = models.IntegerField(default=30)
 
     order = models.IntegerField(default=0, help_text="Question order in the game")
+    text_hash = models.CharField(max_length=40, blank=True, db_index=True, editable=False,
+                                 help_text="Hash of the normalized question text, for duplicate detection")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -65,6 +68,10 @@ class TriviaQuestion(models.Model):
     def __str__(self):
         return f"Q{self.order}: {self.question_text[:50]}"
 
+    def save(self, *args, **kwargs):
+        self.text_hash = question_hash(self.question_text)
+        super().save(*args, **kwargs)
+
     @property
     def max_points(self):
         """Get max points for this question based on difficulty"""
@@ -83,6 +90,7 @@ class TriviaGameSession(models.Model):
         ('completed', 'Completed'),
         ('abandoned', 'Abandoned'),
     ]
+    MAX_TIME_SECONDS = 24 * 60 * 60
 
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='trivia_sessions')
     daily_trivia = models.ForeignKey(DailyTrivia, on_delete=models.CASCADE, related_name='sessions')
@@ -90,6 +98,8 @@ class TriviaGameSession(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
     score = models.IntegerField(default=0)
     time_taken_seconds = models.IntegerField(default=0, help_text="Total time taken in seconds")
+    final_score = models.IntegerField(default=0, help_text="Score plus time bonus, set on completion")
+    correct_answers = models.IntegerField(default=0)
 
     # Timestamps
     started_at = models.DateTimeField(auto_now_add=True)
@@ -97,25 +107,33 @@ class TriviaGameSession(models.Model):
 
     class Meta:
         unique_together = ['user', 'daily_trivia']
-        ordering = ['-score', 'time_taken_seconds']
+        indexes = [
+            models.Index(
+                fields=['daily_trivia', 'status', '-final_score', 'time_taken_seconds'],
+                name='trivia_session_leaderboard_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.daily_trivia.date} - Score: {self.score}"
 
-    def calculate_final_score(self):
-        """Calculate final score with time bonus"""
-        # Base score from correct answers
-        base_score = self.score
+    @classmethod
+    def clamp_time(cls, seconds):
+        """Client-reported time limited to 0..MAX_TIME_SECONDS"""
+        return min(max(int(seconds), 0), cls.MAX_TIME_SECONDS)
 
+    @staticmethod
+    def final_score_for(score, time_taken_seconds):
+        """Final score for a raw score and total time"""
         # Time bonus: faster players get more points (max 50 bonus points)
         # 5 minutes = 300 seconds, bonus = 50 - (time_taken / 6)
-        time_bonus = max(0, 50 - (self.time_taken_seconds // 6))
+        time_bonus = max(0, 50 - (time_taken_seconds // 6))
 
-        return base_score + time_bonus
+        return score + time_bonus
 
-    @property
-    def final_score(self):
-        return self.calculate_final_score()
+    def calculate_final_score(self):
+        """Calculate final score with time bonus"""
+        return self.final_score_for(self.score, self.time_taken_seconds)
 
 
 class TriviaAnswer(models.Model):
@@ -132,6 +150,7 @@ class TriviaAnswer(models.Model):
 
     class Meta:
         ordering = ['answered_at']
+        unique_together = ['session', 'question']
 
     def __str__(self):
         return f"{self.session.user.username} - Q{self.question.order} - {'✓' if self.is_correct else '✗'}"
@@ -180,3 +199,44 @@ class UserTriviaStats(models.Model):
             self.save()
             return True
         return False
+
+
+class GenerationJob(models.Model):
+    """
+    Queued content generation for one date, run by the
+    process_generation_jobs worker (see slutton_backend.jobs).
+    """
+    KIND_CHOICES = [
+        ('trivia', 'Daily trivia (Claude)'),
+        ('trivia_pool', 'Daily trivia (question pool)'),
+        ('memory_images', 'Memory game images (Claude)'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    date = models.DateField()
+    force = models.BooleanField(default=False, help_text="Replace existing content for the date")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    result = models.CharField(max_length=255, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='generation_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.date} ({self.status})"
@@ -0,0 +1,223 @@
+"""
+Precompiled index over the built-in question pool
+
+The index buckets QUESTION_POOL by difficulty and topic and stores each
+question's duplicate-detection hash. It is built once, pickled to
+settings.QUESTION_POOL_INDEX_PATH and reused until question_pool.py
+changes, so callers neither re-import the pool literal nor re-hash it.
+
+PoolSampler draws days from it with a fixed difficulty mix (5 easy,
+5 medium, 5 hard, as ClaudeTriviaGenerator asks for) and never repeats a
+question within ``window`` consecutive days, counting days that are
+already in the database on either side of the ones being drawn.
+"""
+import bisect
+import hashlib
+import os
+import pickle
+import random
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from .duplicates import question_hash
+
+POOL_SOURCE = Path(__file__).with_name('question_pool.py')
+INDEX_PATH = Path(getattr(
+    settings, 'QUESTION_POOL_INDEX_PATH', Path(settings.BASE_DIR) / '.question_pool_index.pickle'
+))
+DIFFICULTY_MIX = {'easy': 5, 'medium': 5, 'hard': 5}
+DEFAULT_WINDOW = 3
+
+THEMES = [
+    "Sensual Knowledge",
+    "Lingerie Legends",
+    "Fashion & Desire",
+    "Intimate History",
+    "Seductive Science",
+    "Luxury & Lace",
+    "Passion & Style"
+]
+
+
+class PoolIndex:
+    def __init__(self, questions, source_hash):
+        self.source_hash = source_hash
+        self.questions = [dict(question) for question in questions]
+        self.hashes = [question_hash(question['question_text']) for question in questions]
+        self.by_difficulty = defaultdict(list)
+        self.by_topic = defaultdict(list)
+        for position, question in enumerate(questions):
+            self.by_difficulty[question['difficulty']].append(position)
+            self.by_topic[question.get('topic', '')].append(position)
+        self.by_difficulty = dict(self.by_difficulty)
+        self.by_topic = dict(self.by_topic)
+        self.position_of_hash = {text_hash: position for position, text_hash in enumerate(self.hashes)}
+
+
+def _source_hash():
+    return hashlib.sha1(POOL_SOURCE.read_bytes()).hexdigest()
+
+
+def _load_index():
+    source_hash = _source_hash()
+    try:
+        with open(INDEX_PATH, 'rb') as f:
+            index = pickle.load(f)
+        if isinstance(index, PoolIndex) and index.source_hash == source_hash:
+            return index
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        pass
+
+    from .question_pool import QUESTION_POOL
+
+    index = PoolIndex(QUESTION_POOL, source_hash)
+    try:
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=INDEX_PATH.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, INDEX_PATH)
+    except OSError:
+        # A read-only filesystem only costs a rebuild per process
+        pass
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_pool_index():
+    """Process-wide PoolIndex, loaded from the pickle when it is current"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _load_index()
+    return _index
+
+
+def pool_usage(index, dates, window):
+    """
+    ``{position: {date, ...}}`` for pool questions on days already in the
+    database within ``window - 1`` days either side of ``dates``. The dates
+    themselves are left out, since they are about to be (re)generated.
+    """
+    from .models import TriviaQuestion
+
+    dates = sorted(dates)
+    used = TriviaQuestion.objects.filter(
+        daily_trivia__date__gte=dates[0] - timedelta(days=window - 1),
+        daily_trivia__date__lte=dates[-1] + timedelta(days=window - 1),
+        text_hash__in=index.hashes
+    ).exclude(daily_trivia__date__in=dates).values_list('text_hash', 'daily_trivia__date')
+    usage = defaultdict(set)
+    for text_hash, day in used:
+        usage[index.position_of_hash[text_hash]].add(day)
+    return dict(usage)
+
+
+class PoolSampler:
+    """
+    Draws days of questions from the pool.
+
+    The most constrained day (the fewest questions left that are not used
+    within the window around it) is drawn first, so days next to existing
+    ones are settled before the days between them. Within each difficulty
+    it prefers, in order: questions not used within the window, questions
+    whose use blocks the fewest of the days still to draw, the least
+    recently used, and topics not yet used that day. When the days around
+    have used more of a difficulty than the pool can spare, the questions
+    used furthest away are repeated rather than the day coming up short.
+    """
+
+    def __init__(self, index=None, window=DEFAULT_WINDOW, mix=DIFFICULTY_MIX, seed=None):
+        self.index = index or get_pool_index()
+        self.window = window
+        self.mix = mix
+        self.rng = random.Random(seed)
+        for difficulty, count in mix.items():
+            available = len(self.index.by_difficulty.get(difficulty, []))
+            if available < count * window:
+                raise ValueError(
+                    f'The pool has {available} {difficulty} questions; '
+                    f'{count} a day without repeats over {window} days needs {count * window}'
+                )
+
+    def sample_days(self, dates, used=None):
+        """
+        ``[(date, theme, questions), ...]`` for each of ``dates``, in date
+        order. ``used`` (``{position: {date, ...}}``, e.g. from pool_usage())
+        holds questions on days that already exist, before or after the
+        sampled dates.
+        """
+        used = defaultdict(list, {position: sorted(days) for position, days in (used or {}).items()})
+
+        def distance(position, day):
+            # Days to the nearest other use of the question
+            days = used[position]
+            after = bisect.bisect_left(days, day)
+            nearest = float('inf')
+            if after < len(days):
+                nearest = (days[after] - day).days
+            if after:
+                nearest = min(nearest, (day - days[after - 1]).days)
+            return nearest
+
+        def slack(day):
+            return min(
+                sum(distance(position, day) >= self.window for position in self.index.by_difficulty[difficulty])
+                - count
+                for difficulty, count in self.mix.items()
+            )
+
+        def neighbours(day):
+            return [
+                day + timedelta(days=offset)
+                for offset in range(1 - self.window, self.window)
+                if offset and day + timedelta(days=offset) in remaining
+            ]
+
+        remaining = {day: None for day in sorted(set(dates))}
+        for day in remaining:
+            remaining[day] = slack(day)
+        sampled = {}
+        while remaining:
+            day = min(remaining, key=lambda other: (remaining[other], other))
+            del remaining[day]
+            nearby = neighbours(day)
+            picked = []
+            topics = defaultdict(int)
+
+            def preference(position):
+                nearest = distance(position, day)
+                return (
+                    max(self.window - nearest, 0),
+                    sum(distance(position, other) >= self.window for other in nearby),
+                    -nearest,
+                    topics[self.index.questions[position].get('topic', '')]
+                )
+
+            for difficulty, count in self.mix.items():
+                candidates = list(self.index.by_difficulty[difficulty])
+                self.rng.shuffle(candidates)
+                for _ in range(count):
+                    best = min(candidates, key=preference)
+                    candidates.remove(best)
+                    picked.append(best)
+                    topics[self.index.questions[best].get('topic', '')] += 1
+            for position in picked:
+                bisect.insort(used[position], day)
+            for other in nearby:
+                remaining[other] = slack(other)
+
+            self.rng.shuffle(picked)
+            questions = [
+                {**self.index.questions[position], 'order': order}
+                for order, position in enumerate(picked, 1)
+            ]
+            sampled[day] = (day, self.rng.choice(THEMES), questions)
+        return [sampled[day] for day in sorted(sampled)]
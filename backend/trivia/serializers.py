@@ -34,7 +34,8 @@ class DailyTriviaSerializer(serializers.ModelSerializer):
         fields = ['id', 'date', 'theme', 'description', 'questions', 'question_count']
 
     def get_question_count(self, obj):
-        return obj.questions.count()
+        # len() uses the prefetched questions instead of another COUNT
+        return len(obj.questions.all())
 
 
 class TriviaAnswerSerializer(serializers.ModelSerializer):
@@ -63,7 +64,16 @@ class TriviaGameSessionSerializer(serializers.ModelSerializer):
             'status', 'score', 'final_score', 'time_taken_seconds',
             'started_at', 'completed_at', 'answers'
         ]
-        read_only_fields = ['user', 'score', 'started_at', 'completed_at']
+        read_only_fields = ['user', 'score', 'final_score', 'started_at', 'completed_at']
+
+
+class CompleteSessionSerializer(serializers.Serializer):
+    """Completion request; the reported total time is clamped (see TriviaGameSession.clamp_time)"""
+    session_id = serializers.IntegerField()
+    total_time_seconds = serializers.IntegerField(required=False, default=0)
+
+    def validate_total_time_seconds(self, value):
+        return TriviaGameSession.clamp_time(value)
 
 
 class LeaderboardSerializer(serializers.ModelSerializer):
@@ -0,0 +1,10 @@
+"""
+Trivia signal receivers: cache versioning for the daily payload
+"""
+from django.db.models.signals import post_save, post_delete
+from .cache import bump_trivia_version
+from .models import DailyTrivia, TriviaQuestion
+
+for model in (DailyTrivia, TriviaQuestion):
+    post_save.connect(bump_trivia_version, sender=model, dispatch_uid=f'trivia_version_save_{model.__name__}')
+    post_delete.connect(bump_trivia_version, sender=model, dispatch_uid=f'trivia_version_delete_{model.__name__}')
@@ -1,3 +1,443 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
+import anthropic
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from slutton_backend.jobs import claim_jobs, enqueue_jobs, generate_now, run_jobs
+from .cache import get_daily_trivia_payload, get_trivia_version, local_cache
+from .claude_service import ClaudeTriviaGenerator
+from .claude_stream import TriviaStreamParser
+from .game import complete_session
+from .leaderboard import InMemoryLeaderboard
+from .materialize import build_questions, date_range, materialize_days, pool_source
+from .models import DailyTrivia, GenerationJob, TriviaAnswer, TriviaGameSession, TriviaQuestion
+from .pool_index import DEFAULT_WINDOW, get_pool_index
 
-# Create your tests here.
+START = date(2030, 1, 1)
+
+
+def stored_hashes(day):
+    return set(TriviaQuestion.objects.filter(daily_trivia__date=day).values_list('text_hash', flat=True))
+
+
+class PoolSourceTests(TestCase):
+    def test_days_around_existing_day_do_not_repeat_its_questions(self):
+        materialize_days([START + timedelta(days=1)], pool_source(seed=1))
+
+        created, skipped = materialize_days(date_range(START, 3), pool_source(seed=2))
+
+        self.assertEqual(skipped, [START + timedelta(days=1)])
+        self.assertEqual([day.date for day in created], [START, START + timedelta(days=2)])
+        middle = stored_hashes(START + timedelta(days=1))
+        self.assertFalse(stored_hashes(START) & middle)
+        self.assertFalse(stored_hashes(START + timedelta(days=2)) & middle)
+
+    def test_history_with_too_many_hard_questions_falls_back(self):
+        # Days made before the 5/5/5 mix could use every hard question
+        index = get_pool_index()
+        hard = [index.questions[position] for position in index.by_difficulty['hard']]
+        for offset in (1, 2):
+            daily_trivia = DailyTrivia.objects.create(date=START - timedelta(days=offset), theme='Old')
+            TriviaQuestion.objects.bulk_create(build_questions(daily_trivia, hard))
+
+        created, _ = materialize_days([START], pool_source(seed=0))
+
+        questions = TriviaQuestion.objects.filter(daily_trivia=created[0])
+        self.assertEqual(questions.count(), 15)
+        self.assertEqual(questions.filter(difficulty='hard').count(), 5)
+
+    def test_year_is_written_in_one_batch(self):
+        with mock.patch('trivia.materialize.bump_trivia_version') as bump:
+            created, _ = materialize_days(date_range(START, 366), pool_source(seed=0))
+
+        self.assertEqual(len(created), 366)
+        bump.assert_called_once()
+
+
+FENCED_REPLY = r'''Here you go:
+```json
+{
+  "theme": "Braces {and} \"quotes\"",
+  "description": "Tricky [strings]: \\ backslash",
+  "questions": [
+    {"question_text": "Is {} an empty \"object\"?", "correct_answer": "True"},
+    {"question_text": "Broken" "correct_answer": "False"},
+    {"question_text": "Ends with a backslash \\", "options": ["A}", "B]"], "correct_answer": "A}"}
+  ]
+}
+```'''
+
+
+class TriviaStreamParserTests(TestCase):
+    def events(self, chunks):
+        parser = TriviaStreamParser()
+        return [event for chunk in chunks for event in parser.feed(chunk)]
+
+    def test_same_events_whatever_the_chunking(self):
+        events = self.events([FENCED_REPLY])
+
+        self.assertEqual(events[:2], [
+            ('field', 'theme', 'Braces {and} "quotes"'),
+            ('field', 'description', 'Tricky [strings]: \\ backslash'),
+        ])
+        self.assertEqual(events[2], ('question', {'question_text': 'Is {} an empty "object"?', 'correct_answer': 'True'}))
+        self.assertEqual(events[3][0], 'invalid')
+        self.assertEqual(events[4], ('question', {
+            'question_text': 'Ends with a backslash \\', 'options': ['A}', 'B]'], 'correct_answer': 'A}'
+        }))
+        self.assertEqual(len(events), 5)
+        # One character at a time, and chunks split inside strings and escapes
+        self.assertEqual(self.events(list(FENCED_REPLY)), events)
+        self.assertEqual(self.events([FENCED_REPLY[:40], FENCED_REPLY[40:95], FENCED_REPLY[95:]]), events)
+
+
+class StubClaudeTriviaGenerator(ClaudeTriviaGenerator):
+    """ClaudeTriviaGenerator with canned replies instead of API calls"""
+    error = None
+    question_count = 15
+    calls = []
+
+    def __init__(self):
+        self.client = None
+
+    def reply(self, trivia_date):
+        if self.error is not None:
+            raise self.error
+        return {
+            'theme': 'Stubbed',
+            'description': 'Canned questions',
+            'questions': [
+                {
+                    'question_text': f'Stub question {number} for {trivia_date}?',
+                    'question_type': 'true_false',
+                    'difficulty': 'easy',
+                    'correct_answer': 'True',
+                    'explanation': 'Canned.',
+                    'max_points': 10,
+                    'order': number,
+                }
+                for number in range(1, self.question_count + 1)
+            ],
+        }
+
+    def generate_daily_trivia(self, trivia_date=None, use_cache=True):
+        self.calls.append(use_cache)
+        return self.reply(trivia_date)
+
+    def stream_daily_trivia(self, trivia_date=None, theme=None, existing_questions=(), use_cache=True):
+        self.calls.append(use_cache)
+        trivia_data = self.reply(trivia_date)
+        if theme is None:
+            yield ('header', trivia_data['theme'], trivia_data['description'])
+        for question in trivia_data['questions'][len(existing_questions):]:
+            yield ('question', question)
+
+
+def rate_limit_error(retry_after):
+    response = mock.Mock(status_code=429, headers={'retry-after': str(retry_after)})
+    return anthropic.RateLimitError('Rate limited', response=response, body=None)
+
+
+@mock.patch.dict('slutton_backend.jobs.GENERATORS', {'trivia': 'trivia.tests.StubClaudeTriviaGenerator'})
+class GenerationJobTests(TestCase):
+    def tearDown(self):
+        StubClaudeTriviaGenerator.error = None
+        StubClaudeTriviaGenerator.question_count = 15
+        StubClaudeTriviaGenerator.calls = []
+
+    def test_generates_each_date(self):
+        for streaming in (False, True):
+            dates = date_range(START + timedelta(days=10 * streaming), 3)
+            with mock.patch('trivia.jobs.STREAM_TRIVIA', streaming):
+                jobs = generate_now('trivia', dates, workers=1)
+
+            self.assertEqual([job.status for job in jobs], ['succeeded'] * 3)
+            for day in dates:
+                self.assertTrue(DailyTrivia.objects.get(date=day).is_active)
+                self.assertEqual(TriviaQuestion.objects.filter(daily_trivia__date=day).count(), 15)
+
+    def test_existing_date_is_skipped_unless_forced(self):
+        generate_now('trivia', [START], workers=1)
+
+        self.assertEqual(generate_now('trivia', [START], workers=1)[0].status, 'skipped')
+        self.assertEqual(generate_now('trivia', [START], force=True, workers=1)[0].status, 'succeeded')
+
+    def test_failed_job_is_retried_with_backoff(self):
+        StubClaudeTriviaGenerator.error = ValueError('Bad reply')
+
+        job = generate_now('trivia', [START], workers=1)[0]
+
+        self.assertEqual((job.status, job.attempts, job.last_error), ('pending', 1, 'Bad reply'))
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertFalse(DailyTrivia.objects.filter(date=START).exists())
+
+    @mock.patch('trivia.jobs.STREAM_TRIVIA', False)
+    def test_short_day_is_not_saved_and_retry_skips_cache(self):
+        StubClaudeTriviaGenerator.question_count = 12
+
+        job = generate_now('trivia', [START], workers=1)[0]
+
+        self.assertEqual(job.status, 'pending')
+        self.assertIn('12 of 15', job.last_error)
+        self.assertFalse(DailyTrivia.objects.filter(date=START).exists())
+
+        StubClaudeTriviaGenerator.question_count = 15
+        GenerationJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        run_jobs(claim_jobs(1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(StubClaudeTriviaGenerator.calls, [True, False])
+
+    @mock.patch('trivia.jobs.STREAM_TRIVIA', True)
+    def test_streamed_retry_skips_cache(self):
+        StubClaudeTriviaGenerator.error = ValueError('Bad reply')
+        job = generate_now('trivia', [START], workers=1)[0]
+        self.assertEqual(job.status, 'pending')
+
+        StubClaudeTriviaGenerator.error = None
+        GenerationJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        run_jobs(claim_jobs(1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(StubClaudeTriviaGenerator.calls, [True, False])
+
+    def test_integrity_error_for_existing_day_is_skipped(self):
+        DailyTrivia.objects.create(date=START, theme='Existing')
+        StubClaudeTriviaGenerator.error = IntegrityError('UNIQUE constraint failed: trivia_dailytrivia.date')
+
+        job = generate_now('trivia', [START], force=True, workers=1)[0]
+
+        self.assertEqual(job.status, 'skipped')
+
+    def test_other_integrity_error_fails_job(self):
+        StubClaudeTriviaGenerator.error = IntegrityError('NOT NULL constraint failed: trivia_triviaquestion.order')
+
+        with self.assertRaises(IntegrityError):
+            generate_now('trivia', [START], workers=1)
+
+        job = GenerationJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('NOT NULL', job.last_error)
+
+    def test_rate_limited_job_waits_for_retry_after(self):
+        StubClaudeTriviaGenerator.error = rate_limit_error(600)
+
+        job = generate_now('trivia', [START], workers=1)[0]
+
+        self.assertEqual(job.status, 'pending')
+        self.assertGreaterEqual(job.next_attempt_at, timezone.now() + timedelta(seconds=590))
+
+
+@mock.patch('trivia.claude_service.ClaudeTriviaGenerator', StubClaudeTriviaGenerator)
+@mock.patch('trivia.admin.DailyTriviaAdmin.message_user')
+class RegenerateQuestionsAdminTests(TestCase):
+    def setUp(self):
+        from django.contrib.admin.sites import site
+        from .admin import DailyTriviaAdmin
+
+        self.admin = DailyTriviaAdmin(DailyTrivia, site)
+        self.request = mock.Mock(user=mock.Mock(is_superuser=True))
+        materialize_days([START], pool_source(seed=0))
+
+    def tearDown(self):
+        StubClaudeTriviaGenerator.question_count = 15
+        StubClaudeTriviaGenerator.calls = []
+
+    def test_regenerate_bypasses_reply_cache(self, message_user):
+        self.admin.regenerate_questions(self.request, DailyTrivia.objects.filter(date=START))
+
+        self.assertEqual(StubClaudeTriviaGenerator.calls, [False])
+        self.assertEqual(DailyTrivia.objects.get(date=START).theme, 'Stubbed')
+
+    def test_short_reply_keeps_existing_questions(self, message_user):
+        StubClaudeTriviaGenerator.question_count = 12
+        before = stored_hashes(START)
+
+        self.admin.regenerate_questions(self.request, DailyTrivia.objects.filter(date=START))
+
+        self.assertEqual(stored_hashes(START), before)
+        self.assertIn('12 of 15', message_user.call_args.args[1])
+
+
+class PoolJobTests(TestCase):
+    def test_queued_week_does_not_repeat_within_window(self):
+        dates = date_range(START, 7)
+        materialize_days([START + timedelta(days=3)], pool_source(seed=1))
+        enqueue_jobs('trivia_pool', dates)
+
+        jobs = run_jobs(claim_jobs(10), workers=4)
+
+        self.assertEqual(
+            sorted(job.status for job in jobs), ['skipped'] + ['succeeded'] * 6
+        )
+        for day in dates:
+            for offset in range(1, DEFAULT_WINDOW):
+                self.assertFalse(stored_hashes(day) & stored_hashes(day + timedelta(days=offset)))
+        self.assertEqual(GenerationJob.objects.filter(status='succeeded').count(), 6)
+
+
+class SubmitAnswersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.today = date.today()
+        materialize_days([self.today - timedelta(days=1), self.today], pool_source(seed=0))
+        self.daily_trivia = DailyTrivia.objects.get(date=self.today)
+        self.questions = list(self.daily_trivia.questions.order_by('order'))
+        self.user = get_user_model().objects.create_user('player', 'player@example.com', 'password')
+        self.session = TriviaGameSession.objects.create(user=self.user, daily_trivia=self.daily_trivia)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def submit(self, questions, answer=None):
+        return self.client.post('/api/trivia/submit_answers/', {
+            'session_id': self.session.id,
+            'answers': [
+                {
+                    'question_id': question.id,
+                    'answer': question.correct_answer if answer is None else answer,
+                    'time_taken_seconds': 5,
+                }
+                for question in questions
+            ],
+        }, format='json')
+
+    def test_answers_are_inserted_in_one_statement(self):
+        # Warm the cached answer key, so only the writes are counted
+        self.submit(self.questions[:1])
+        TriviaAnswer.objects.all().delete()
+        TriviaGameSession.objects.filter(pk=self.session.pk).update(score=0, correct_answers=0)
+
+        # Session lookup, savepoint, INSERT, UPDATE, release and the score read
+        with self.assertNumQueries(6):
+            response = self.submit(self.questions)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), len(self.questions))
+        self.assertEqual(TriviaAnswer.objects.filter(session=self.session).count(), len(self.questions))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.correct_answers, len(self.questions))
+        self.assertEqual(response.data['current_score'], self.session.score)
+
+    def test_replayed_answer_is_rejected(self):
+        self.assertEqual(self.submit(self.questions[:2]).status_code, 200)
+        self.session.refresh_from_db()
+        score = self.session.score
+
+        response = self.submit(self.questions[1:3], answer='wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Question already answered')
+        # The whole request is rolled back, including the new answer
+        self.assertEqual(TriviaAnswer.objects.filter(session=self.session).count(), 2)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.score, score)
+
+    def test_duplicate_in_one_request_is_rejected(self):
+        response = self.submit([self.questions[0], self.questions[0]])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(TriviaAnswer.objects.exists())
+
+    def test_question_from_another_day_is_refused(self):
+        yesterday = DailyTrivia.objects.get(date=self.today - timedelta(days=1))
+
+        response = self.submit([self.questions[0], yesterday.questions.first()])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Invalid session or question')
+        self.assertFalse(TriviaAnswer.objects.exists())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.score, 0)
+
+
+class CompleteSessionTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        materialize_days([self.today], pool_source(seed=0))
+        self.user = get_user_model().objects.create_user('player', 'player@example.com', 'password')
+        self.session = TriviaGameSession.objects.create(
+            user=self.user, daily_trivia=DailyTrivia.objects.get(date=self.today)
+        )
+        self.leaderboard = InMemoryLeaderboard()
+        patcher = mock.patch('trivia.game.get_leaderboard', return_value=self.leaderboard)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def complete(self, total_time):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(
+            '/api/trivia/complete/',
+            {'session_id': self.session.id, 'total_time_seconds': total_time},
+            format='json'
+        )
+        self.session.refresh_from_db()
+        return response
+
+    def test_score_is_ranked_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            result = complete_session(self.user, self.session.id, 60)
+            self.assertEqual(self.leaderboard.count(self.today), 0)
+
+        self.assertEqual(result['rank'], 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.leaderboard.rank(self.today, self.user.id), 1)
+
+    def test_rolled_back_completion_is_not_ranked(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with mock.patch('trivia.game.UserTriviaStats.objects.get_or_create', side_effect=DatabaseError):
+                with self.assertRaises(DatabaseError):
+                    complete_session(self.user, self.session.id, 60)
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.leaderboard.count(self.today), 0)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, 'in_progress')
+
+    def test_negative_time_earns_no_extra_bonus(self):
+        self.assertEqual(self.complete(-10 ** 9).status_code, 200)
+
+        self.assertEqual(self.session.time_taken_seconds, 0)
+        self.assertEqual(self.session.final_score, 50)
+
+    def test_huge_time_is_clamped(self):
+        self.assertEqual(self.complete(10 ** 12).status_code, 200)
+
+        self.assertEqual(self.session.time_taken_seconds, TriviaGameSession.MAX_TIME_SECONDS)
+        self.assertEqual(self.session.final_score, 0)
+
+    def test_non_numeric_time_is_rejected(self):
+        self.assertEqual(self.complete('soon').status_code, 400)
+
+        self.assertEqual(self.session.status, 'in_progress')
+
+
+class TriviaCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_version_is_bumped_after_commit(self):
+        version = get_trivia_version()
+        with transaction.atomic():
+            DailyTrivia.objects.create(date=START, theme='New')
+            self.assertEqual(get_trivia_version(), version)
+            # A read before the commit caches under the old version only
+            get_daily_trivia_payload(START)
+        self.assertNotEqual(get_trivia_version(), version)
+        self.assertEqual(get_daily_trivia_payload(START)['theme'], 'New')
+
+    def test_missing_day_is_not_cached_in_process(self):
+        self.assertIsNone(get_daily_trivia_payload(START))
+
+        # Another process creates the day once the shared entry has expired
+        cache.delete(f'trivia:v{get_trivia_version()}:day:{START.isoformat()}')
+        DailyTrivia.objects.bulk_create([DailyTrivia(date=START, theme='Late')])
+
+        self.assertEqual(get_daily_trivia_payload(START)['theme'], 'Late')
@@ -2,13 +2,16 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.utils import timezone
 from django.db.models import F
 from datetime import date, timedelta
 import os
-from .models import DailyTrivia, TriviaQuestion, TriviaGameSession, TriviaAnswer, UserTriviaStats
+from slutton_backend.jobs import enqueue_jobs
+from .cache import get_daily_trivia_payload
+from .game import TriviaGameError, complete_session, record_answers
+from .leaderboard import get_leaderboard
+from .models import DailyTrivia, TriviaGameSession, UserTriviaStats
 from .serializers import (
-    DailyTriviaSerializer,
+    CompleteSessionSerializer,
     TriviaGameSessionSerializer,
     TriviaAnswerSerializer,
     UserTriviaStatsSerializer,
@@ -20,35 +23,32 @@ from .serializers import (
 class TriviaViewSet(viewsets.ViewSet):
     """Trivia game viewset"""
     permission_classes = [IsAuthenticated]
+    LEADERBOARD_SIZE = 50
 
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def today(self, request):
         """Get today's trivia game"""
         today = date.today()
 
-        try:
-            daily_trivia = DailyTrivia.objects.prefetch_related('questions').get(
-                date=today,
-                is_active=True
-            )
-        except DailyTrivia.DoesNotExist:
+        trivia = get_daily_trivia_payload(today)
+        if trivia is None:
             return Response(
                 {'error': 'No trivia game available for today'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Check if user already played today (only for authenticated users)
+        # Check if user already played today (only for authenticated users);
+        # a single lookup on the (user, daily_trivia) unique index
         has_played = False
         if request.user.is_authenticated:
             has_played = TriviaGameSession.objects.filter(
                 user=request.user,
-                daily_trivia=daily_trivia,
+                daily_trivia_id=trivia['id'],
                 status__in=['completed', 'in_progress']
             ).exists()
 
-        serializer = DailyTriviaSerializer(daily_trivia)
         return Response({
-            'trivia': serializer.data,
+            'trivia': trivia,
             'has_played': has_played,
             'time_limit_seconds': 300  # 5 minutes
         })
@@ -98,161 +98,83 @@ class TriviaViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['post'])
     def submit_answer(self, request):
         """Submit an answer to a question"""
-        session_id = request.data.get('session_id')
-        question_id = request.data.get('question_id')
-        user_answer = request.data.get('answer')
-        time_taken = request.data.get('time_taken_seconds', 0)
-
-        try:
-            session = TriviaGameSession.objects.get(
-                id=session_id,
-                user=request.user,
-                status='in_progress'
-            )
-            question = TriviaQuestion.objects.get(id=question_id)
-        except (TriviaGameSession.DoesNotExist, TriviaQuestion.DoesNotExist):
+        session = self._get_in_progress_session(request)
+        if session is None:
             return Response(
                 {'error': 'Invalid session or question'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if already answered
-        if TriviaAnswer.objects.filter(session=session, question=question).exists():
+        try:
+            results, current_score = record_answers(session, [request.data])
+        except TriviaGameError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({**results[0], 'current_score': current_score})
+
+    @action(detail=False, methods=['post'])
+    def submit_answers(self, request):
+        """Submit several answers at once"""
+        session = self._get_in_progress_session(request)
+        if session is None:
             return Response(
-                {'error': 'Question already answered'},
+                {'error': 'Invalid session'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check answer
-        is_correct = user_answer.strip().lower() == question.correct_answer.strip().lower()
-        points_earned = question.max_points if is_correct else 0
-
-        # Create answer record
-        answer = TriviaAnswer.objects.create(
-            session=session,
-            question=question,
-            user_answer=user_answer,
-            is_correct=is_correct,
-            points_earned=points_earned,
-            time_taken_seconds=time_taken
-        )
-
-        # Update session score
-        session.score += points_earned
-        session.save()
+        try:
+            results, current_score = record_answers(session, request.data.get('answers'))
+        except TriviaGameError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            'is_correct': is_correct,
-            'points_earned': points_earned,
-            'correct_answer': question.correct_answer,
-            'explanation': question.explanation,
-            'current_score': session.score
-        })
+        return Response({'results': results, 'current_score': current_score})
 
     @action(detail=False, methods=['post'])
     def complete(self, request):
         """Complete the game session"""
-        session_id = request.data.get('session_id')
-        total_time = request.data.get('total_time_seconds', 0)
-
+        serializer = CompleteSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         try:
-            session = TriviaGameSession.objects.get(
-                id=session_id,
-                user=request.user,
-                status='in_progress'
+            result = complete_session(
+                request.user,
+                serializer.validated_data['session_id'],
+                serializer.validated_data['total_time_seconds'],
+                answers=request.data.get('answers')
             )
-        except TriviaGameSession.DoesNotExist:
-            return Response(
-                {'error': 'Invalid session'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Mark session as completed
-        session.status = 'completed'
-        session.time_taken_seconds = total_time
-        session.completed_at = timezone.now()
-        session.save()
+        except TriviaGameError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update user stats
-        stats, created = UserTriviaStats.objects.get_or_create(user=request.user)
-        stats.total_games_played += 1
-        stats.last_played_date = date.today()
-
-        # Update streak
-        if stats.last_played_date:
-            days_diff = (date.today() - stats.last_played_date).days
-            if days_diff == 1:
-                stats.current_streak += 1
-            elif days_diff > 1:
-                stats.current_streak = 1
-        else:
-            stats.current_streak = 1
-
-        if stats.current_streak > stats.longest_streak:
-            stats.longest_streak = stats.current_streak
-
-        # Check for perfect game
-        total_questions = session.daily_trivia.questions.count()
-        correct_answers = session.answers.filter(is_correct=True).count()
-        if correct_answers == total_questions and total_questions > 0:
-            stats.perfect_games += 1
-
-        stats.save()
-
-        # Calculate rank and award placement points
-        rank = self._calculate_rank(session)
-        placement_points = self._get_placement_points(rank)
-        participation_points = 10
-
-        total_bonus_points = placement_points + participation_points
-        stats.add_points(total_bonus_points)
-
-        # Update placement stats
-        if rank == 1:
-            stats.first_place_finishes += 1
-        elif rank == 2:
-            stats.second_place_finishes += 1
-        elif rank == 3:
-            stats.third_place_finishes += 1
-        stats.save()
-
-        return Response({
-            'final_score': session.final_score,
-            'rank': rank,
-            'placement_points': placement_points,
-            'participation_points': participation_points,
-            'total_bonus_points': total_bonus_points,
-            'perfect_game': correct_answers == total_questions
-        })
+        return Response(result)
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
         """Get today's leaderboard"""
         today = date.today()
 
-        try:
-            daily_trivia = DailyTrivia.objects.get(date=today)
-        except DailyTrivia.DoesNotExist:
+        if not DailyTrivia.objects.filter(date=today).exists():
             return Response([])
 
-        # Get completed sessions, ordered by final_score (desc) then time (asc)
-        sessions = TriviaGameSession.objects.filter(
-            daily_trivia=daily_trivia,
-            status='completed'
-        ).select_related('user').order_by('-score', 'time_taken_seconds')[:50]
+        entries = get_leaderboard().top(today, self.LEADERBOARD_SIZE)
+        return Response(self._leaderboard_data(today, entries))
 
-        # Add rank
-        leaderboard_data = []
-        for rank, session in enumerate(sessions, 1):
-            leaderboard_data.append({
-                'rank': rank,
-                'username': session.user.username,
-                'final_score': session.final_score,
-                'time_taken_seconds': session.time_taken_seconds,
-                'completed_at': session.completed_at
-            })
+    @action(detail=False, methods=['get'])
+    def my_rank(self, request):
+        """Get the user's rank today and the players just above and below them"""
+        today = date.today()
+        board = get_leaderboard()
+
+        try:
+            radius = min(max(int(request.query_params.get('radius', 5)), 0), self.LEADERBOARD_SIZE)
+        except ValueError:
+            radius = 5
 
-        return Response(leaderboard_data)
+        rank = board.rank(today, request.user.id)
+        entries = board.around(today, request.user.id, radius) if rank else []
+        return Response({
+            'rank': rank,
+            'total_players': board.count(today),
+            'entries': self._leaderboard_data(today, entries)
+        })
 
     @action(detail=False, methods=['get'])
     def my_stats(self, request):
@@ -261,38 +183,40 @@ class TriviaViewSet(viewsets.ViewSet):
         serializer = UserTriviaStatsSerializer(stats)
         return Response(serializer.data)
 
-    def _calculate_rank(self, session):
-        """Calculate user's rank for the day"""
-        better_sessions = TriviaGameSession.objects.filter(
-            daily_trivia=session.daily_trivia,
-            status='completed'
-        ).filter(
-            score__gt=session.score
-        ).count()
-
-        # For ties, check time
-        tie_sessions = TriviaGameSession.objects.filter(
-            daily_trivia=session.daily_trivia,
-            status='completed',
-            score=session.score,
-            time_taken_seconds__lt=session.time_taken_seconds
-        ).count()
-
-        return better_sessions + tie_sessions + 1
-
-    def _get_placement_points(self, rank):
-        """Get bonus points for placement"""
-        placement_rewards = {
-            1: 100,  # 1st place
-            2: 50,   # 2nd place
-            3: 25,   # 3rd place
+    def _leaderboard_data(self, day, entries):
+        """Attach usernames and completion times to leaderboard entries"""
+        if not entries:
+            return []
+        sessions = {
+            user_id: (username, completed_at)
+            for user_id, username, completed_at in TriviaGameSession.objects.filter(
+                daily_trivia__date=day,
+                user_id__in=[entry['user_id'] for entry in entries]
+            ).values_list('user_id', 'user__username', 'completed_at')
         }
-        return placement_rewards.get(rank, 0)
+        leaderboard_data = []
+        for entry in entries:
+            username, completed_at = sessions.get(entry['user_id'], ('', None))
+            leaderboard_data.append({
+                'rank': entry['rank'],
+                'username': username,
+                'final_score': entry['final_score'],
+                'time_taken_seconds': entry['time_taken_seconds'],
+                'completed_at': completed_at
+            })
+        return leaderboard_data
+
+    def _get_in_progress_session(self, request):
+        return TriviaGameSession.objects.filter(
+            id=request.data.get('session_id'),
+            user=request.user,
+            status='in_progress'
+        ).first()
 
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def generate_daily(self, request):
         """
-        Endpoint to generate trivia for next 7 days
+        Endpoint to queue trivia generation for the next 7 days
         Can be called by external cron service
         Requires secret key for security
         """
@@ -305,22 +229,10 @@ class TriviaViewSet(viewsets.ViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        from django.core.management import call_command
-        from io import StringIO
-        import sys
-
-        # Capture command output
-        out = StringIO()
-        try:
-            call_command('generate_trivia_week', '--days', '7', stdout=out)
-            output = out.getvalue()
-            return Response({
-                'success': True,
-                'message': 'Trivia generation completed',
-                'output': output
-            })
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Generation runs in the process_generation_jobs worker, not in this request
+        jobs = enqueue_jobs('trivia_pool', [date.today() + timedelta(days=offset) for offset in range(7)])
+        return Response({
+            'success': True,
+            'message': 'Trivia generation queued',
+            'jobs': [{'id': job.id, 'date': job.date, 'status': job.status} for job in jobs]
+        }, status=status.HTTP_202_ACCEPTED)
@@ -147,6 +147,23 @@ export default function ProductDetailPage() {
 
     console.log('Connecting to WebSocket:', wsUrl);
 
+    const applyCommentUpdate = (data: any) => {
+      if (data.action === 'new') {
+        // Add new comment to the list
+        setComments((prev) => [data.comment, ...prev]);
+      } else if (data.action === 'edit') {
+        // Update edited comment
+        setComments((prev) =>
+          prev.map((comment) =>
+            comment.id === data.comment.id ? data.comment : comment
+          )
+        );
+      } else if (data.action === 'delete') {
+        // Remove deleted comment
+        setComments((prev) => prev.filter((comment) => comment.id !== data.comment_id));
+      }
+    };
+
     wsRef.current = new WebSocket(wsUrl);
 
     wsRef.current.onopen = () => {
@@ -163,19 +180,14 @@ export default function ProductDetailPage() {
         return;
       }
 
-      if (data.action === 'new') {
-        // Add new comment to the list
-        setComments((prev) => [data.comment, ...prev]);
-      } else if (data.action === 'edit') {
-        // Update edited comment
-        setComments((prev) =>
-          prev.map((comment) =>
-            comment.id === data.comment.id ? data.comment : comment
-          )
-        );
-      } else if (data.action === 'delete') {
-        // Remove deleted comment
-        setComments((prev) => prev.filter((comment) => comment.id !== data.comment_id));
+      if (data.action === 'batch') {
+        // Several updates coalesced into one frame, oldest first
+        data.events.forEach(applyCommentUpdate);
+      } else if (data.action === 'resync') {
+        // Too many updates were missed; reload the list instead
+        fetchComments();
+      } else {
+        applyCommentUpdate(data);
       }
     };
 